@@ -1,5 +1,9 @@
 from crewai import Agent
-from typing import Dict, List
+from scripts.prompt_encoder import TranscriptPromptEncoder
+from scripts.llm_cache import LLMResponseCache, get_llm_cache
+from scripts.llm_scheduler import LLMScheduler, get_scheduler
+from scripts.llm_backend import run_agent_task
+from typing import Dict, List, Optional
 
 decision_extractor = Agent(
     name="Decision Extractor",
@@ -12,11 +16,20 @@ decision_extractor = Agent(
 )
 
 class DecisionExtractorAgent:
-    def __init__(self, llm_model: str = "gpt-4"):
+    def __init__(
+        self,
+        llm_model: str = "gpt-4",
+        encoder: Optional[TranscriptPromptEncoder] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
         """Initialize the decision extractor agent.
         
         Args:
             llm_model: LLM model to use for decision extraction
+            encoder: Transcript prompt encoder (shared between agents)
+            cache: LLM response cache (default: the process-wide one)
+            scheduler: LLM request scheduler (default: the process-wide one)
         """
         self.agent = Agent(
             role="Decision Extractor",
@@ -27,6 +40,34 @@ class DecisionExtractorAgent:
             verbose=True,
             llm_model=llm_model
         )
+        self.llm_model = llm_model
+        self.encoder = encoder or TranscriptPromptEncoder(llm_model)
+        self.cache = cache or get_llm_cache()
+        self.scheduler = scheduler or get_scheduler()
+        
+    def build_prompt(self, transcript: Dict) -> str:
+        """Build the task description sent to the model.
+        
+        Args:
+            transcript: Formatted transcript with speaker turns
+            
+        Returns:
+            Task description including the transcript
+        """
+        # One line per speaker turn, fitted to the model's token budget
+        context = self.encoder.encode(transcript)
+        
+        return f"""Analyze this meeting transcript and extract all decisions made.
+        For each decision, identify:
+        1. The specific decision made
+        2. Who made the decision
+        3. The context and reasoning behind it
+        4. Any conditions or caveats attached
+        
+        Format each decision as a JSON object with these fields.
+        
+        Transcript:
+{context}"""
         
     def extract_decisions(self, transcript: Dict) -> List[Dict]:
         """Extract decisions from the meeting transcript.
@@ -37,30 +78,22 @@ class DecisionExtractorAgent:
         Returns:
             List of decisions with context
         """
-        # Prepare context for the agent
-        context = {
-            "full_text": transcript["full_text"],
-            "speakers": transcript["speakers"],
-            "segments": transcript["segments"]
-        }
-        
         # Create task for the agent
         task = self.agent.create_task(
-            description=f"""Analyze this meeting transcript and extract all decisions made.
-            For each decision, identify:
-            1. The specific decision made
-            2. Who made the decision
-            3. The context and reasoning behind it
-            4. Any conditions or caveats attached
-            
-            Format each decision as a JSON object with these fields.
-            
-            Transcript: {context}""",
+            description=self.build_prompt(transcript),
             expected_output="A list of decision objects in JSON format"
         )
         
-        # Execute task and get decisions
-        decisions = self.agent.execute_task(task)
+        # Execute task and get decisions, reusing the response to an identical task
+        decisions = self.cache.cached_call(
+            self.llm_model,
+            [self.agent.role, task.description, task.expected_output],
+            None,
+            lambda: self.scheduler.run(
+                lambda: run_agent_task(self.agent, task, self.llm_model),
+                tokens=self.encoder.count_tokens(task.description) + 1000
+            )
+        )
         return decisions
 
 def main():
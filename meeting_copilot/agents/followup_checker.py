@@ -1,5 +1,9 @@
 from crewai import Agent
-from typing import Dict, List
+from scripts.prompt_encoder import TranscriptPromptEncoder
+from scripts.llm_cache import LLMResponseCache, get_llm_cache
+from scripts.llm_scheduler import LLMScheduler, get_scheduler
+from scripts.llm_backend import run_agent_task
+from typing import Dict, List, Optional
 
 followup_checker = Agent(
     name="Follow-up Analyzer",
@@ -12,11 +16,20 @@ followup_checker = Agent(
 )
 
 class FollowupCheckerAgent:
-    def __init__(self, llm_model: str = "gpt-4"):
+    def __init__(
+        self,
+        llm_model: str = "gpt-4",
+        encoder: Optional[TranscriptPromptEncoder] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
         """Initialize the follow-up checker agent.
         
         Args:
             llm_model: LLM model to use for follow-up analysis
+            encoder: Transcript prompt encoder (shared between agents)
+            cache: LLM response cache (default: the process-wide one)
+            scheduler: LLM request scheduler (default: the process-wide one)
         """
         self.agent = Agent(
             role="Follow-up Analyzer",
@@ -27,6 +40,35 @@ class FollowupCheckerAgent:
             verbose=True,
             llm_model=llm_model
         )
+        self.llm_model = llm_model
+        self.encoder = encoder or TranscriptPromptEncoder(llm_model)
+        self.cache = cache or get_llm_cache()
+        self.scheduler = scheduler or get_scheduler()
+        
+    def build_prompt(self, transcript: Dict) -> str:
+        """Build the task description sent to the model.
+        
+        Args:
+            transcript: Formatted transcript with speaker turns
+            
+        Returns:
+            Task description including the transcript
+        """
+        # One line per speaker turn, fitted to the model's token budget
+        context = self.encoder.encode(transcript)
+        
+        return f"""Analyze this meeting transcript and identify topics that need follow-up.
+        For each follow-up item, identify:
+        1. The topic or issue that needs follow-up
+        2. Why it needs follow-up (e.g., unresolved, needs clarification)
+        3. Who should be involved in the follow-up
+        4. Suggested timing or urgency
+        5. Any specific questions or points to address
+        
+        Format each follow-up item as a JSON object with these fields.
+        
+        Transcript:
+{context}"""
         
     def check_followups(self, transcript: Dict) -> List[Dict]:
         """Extract follow-up items from the meeting transcript.
@@ -37,31 +79,22 @@ class FollowupCheckerAgent:
         Returns:
             List of follow-up items with details
         """
-        # Prepare context for the agent
-        context = {
-            "full_text": transcript["full_text"],
-            "speakers": transcript["speakers"],
-            "segments": transcript["segments"]
-        }
-        
         # Create task for the agent
         task = self.agent.create_task(
-            description=f"""Analyze this meeting transcript and identify topics that need follow-up.
-            For each follow-up item, identify:
-            1. The topic or issue that needs follow-up
-            2. Why it needs follow-up (e.g., unresolved, needs clarification)
-            3. Who should be involved in the follow-up
-            4. Suggested timing or urgency
-            5. Any specific questions or points to address
-            
-            Format each follow-up item as a JSON object with these fields.
-            
-            Transcript: {context}""",
+            description=self.build_prompt(transcript),
             expected_output="A list of follow-up item objects in JSON format"
         )
         
-        # Execute task and get follow-up items
-        followups = self.agent.execute_task(task)
+        # Execute task and get follow-up items, reusing the response to an identical task
+        followups = self.cache.cached_call(
+            self.llm_model,
+            [self.agent.role, task.description, task.expected_output],
+            None,
+            lambda: self.scheduler.run(
+                lambda: run_agent_task(self.agent, task, self.llm_model),
+                tokens=self.encoder.count_tokens(task.description) + 1000
+            )
+        )
         return followups
 
 def main():
@@ -1,5 +1,9 @@
 from crewai import Agent
-from typing import Dict
+from scripts.prompt_encoder import TranscriptPromptEncoder
+from scripts.llm_cache import LLMResponseCache, get_llm_cache
+from scripts.llm_scheduler import LLMScheduler, get_scheduler
+from scripts.llm_backend import run_agent_task
+from typing import Dict, Optional
 
 summarizer = Agent(
     name="Summarizer",
@@ -12,11 +16,20 @@ summarizer = Agent(
 )
 
 class SummarizerAgent:
-    def __init__(self, llm_model: str = "gpt-4"):
+    def __init__(
+        self,
+        llm_model: str = "gpt-4",
+        encoder: Optional[TranscriptPromptEncoder] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
         """Initialize the summarizer agent.
         
         Args:
             llm_model: LLM model to use for summarization
+            encoder: Transcript prompt encoder (shared between agents)
+            cache: LLM response cache (default: the process-wide one)
+            scheduler: LLM request scheduler (default: the process-wide one)
         """
         self.agent = Agent(
             role="Meeting Summarizer",
@@ -27,6 +40,32 @@ class SummarizerAgent:
             verbose=True,
             llm_model=llm_model
         )
+        self.llm_model = llm_model
+        self.encoder = encoder or TranscriptPromptEncoder(llm_model)
+        self.cache = cache or get_llm_cache()
+        self.scheduler = scheduler or get_scheduler()
+        
+    def build_prompt(self, transcript: Dict) -> str:
+        """Build the task description sent to the model.
+        
+        Args:
+            transcript: Formatted transcript with speaker turns
+            
+        Returns:
+            Task description including the transcript
+        """
+        # One line per speaker turn, fitted to the model's token budget
+        context = self.encoder.encode(transcript)
+        
+        return f"""Analyze this meeting transcript and create a comprehensive summary.
+        Focus on:
+        1. Main topics discussed
+        2. Key points raised by each speaker
+        3. Overall meeting flow and progression
+        4. Important context and background information
+        
+        Transcript:
+{context}"""
         
     def summarize(self, transcript: Dict) -> str:
         """Generate a summary of the meeting transcript.
@@ -37,28 +76,22 @@ class SummarizerAgent:
         Returns:
             Meeting summary
         """
-        # Prepare context for the agent
-        context = {
-            "full_text": transcript["full_text"],
-            "speakers": transcript["speakers"],
-            "segments": transcript["segments"]
-        }
-        
         # Create task for the agent
         task = self.agent.create_task(
-            description=f"""Analyze this meeting transcript and create a comprehensive summary.
-            Focus on:
-            1. Main topics discussed
-            2. Key points raised by each speaker
-            3. Overall meeting flow and progression
-            4. Important context and background information
-            
-            Transcript: {context}""",
+            description=self.build_prompt(transcript),
             expected_output="A well-structured summary of the meeting in markdown format"
         )
         
-        # Execute task and get summary
-        summary = self.agent.execute_task(task)
+        # Execute task and get summary, reusing the response to an identical task
+        summary = self.cache.cached_call(
+            self.llm_model,
+            [self.agent.role, task.description, task.expected_output],
+            None,
+            lambda: self.scheduler.run(
+                lambda: run_agent_task(self.agent, task, self.llm_model),
+                tokens=self.encoder.count_tokens(task.description) + 1000
+            )
+        )
         return summary
 
 def main():
@@ -1,12 +1,20 @@
 import os
+import json
+import time
 import argparse
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
-from scripts.whisper_transcribe import WhisperTranscriber
+from scripts.whisper_transcribe import WhisperTranscriber, build_transcription
 from scripts.format_transcript import TranscriptFormatter
+from scripts.transcript_store import CompactTranscript
 from scripts.run_crewai_agents import MeetingAnalyzer
+from scripts.llm_cache import get_llm_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,6 +22,115 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".webm"}
+
+# Approximate resident memory of one transcription worker per Whisper model, in MB
+WORKER_MEMORY_MB = {
+    "tiny": 1500,
+    "base": 1500,
+    "small": 2500,
+    "medium": 5000,
+    "large-v2": 8000,
+    "large-v3": 8000
+}
+
+# CPU threads each transcription worker is expected to keep busy
+THREADS_PER_WORKER = 4
+
+def recommended_workers(whisper_model: str, device: Optional[str] = None) -> int:
+    """Size the transcription pool to the available CPU cores and RAM.
+    
+    Args:
+        whisper_model: Whisper model each worker loads
+        device: Device to run Whisper on (cuda/cpu)
+        
+    Returns:
+        Number of transcription worker processes
+    """
+    if device and device.startswith("cuda"):
+        return 1
+    by_cpu = (os.cpu_count() or 1) // THREADS_PER_WORKER
+    try:
+        available_mb = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+        by_ram = available_mb // WORKER_MEMORY_MB.get(whisper_model, 8000)
+    except (ValueError, OSError, AttributeError):
+        by_ram = by_cpu
+    return max(1, min(by_cpu, by_ram))
+
+class BatchManifest:
+    def __init__(self, path: Path):
+        """Track per-file progress of a batch run on disk.
+        
+        Args:
+            path: Manifest JSON file; an existing manifest is resumed
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path) as f:
+                self.files = json.load(f).get("files", {})
+        else:
+            self.files = {}
+            
+    def status(self, name: str) -> Optional[str]:
+        """Get the recorded status of a file."""
+        return self.files.get(name, {}).get("status")
+        
+    def get(self, name: str) -> Dict:
+        """Get the manifest entry of a file."""
+        return dict(self.files.get(name, {}))
+        
+    def update(self, name: str, **fields):
+        """Update a file's entry and persist the manifest atomically."""
+        with self._lock:
+            entry = self.files.setdefault(name, {})
+            entry.update(fields)
+            entry["updated_at"] = datetime.now().isoformat()
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"files": self.files}, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+# Per-process state of batch transcription workers
+_worker_transcriber = None
+_worker_formatter = None
+
+def _init_transcription_worker(
+    whisper_model: str,
+    device: Optional[str],
+    output_dir: str,
+    cpu_threads: int
+):
+    """Load the Whisper model once when a worker process starts."""
+    global _worker_transcriber, _worker_formatter
+    _worker_transcriber = WhisperTranscriber(
+        model_name=whisper_model,
+        device=device,
+        cpu_threads=cpu_threads
+    )
+    _worker_formatter = TranscriptFormatter(output_dir=output_dir)
+
+def _transcribe_in_worker(audio_path: str) -> Dict:
+    """Transcribe and format one file inside a worker process.
+    
+    The analysis stage reads the transcript back from the compact file.
+    """
+    start = time.perf_counter()
+    transcription = _worker_transcriber.transcribe(audio_path)
+    formatted_transcript = _worker_formatter.format_transcript(transcription)
+    _worker_formatter.save_transcript(
+        formatted_transcript,
+        f"{Path(audio_path).stem}_transcript.json"
+    )
+    transcript_path = _worker_formatter.save_compact(
+        transcription["segments"],
+        f"{Path(audio_path).stem}_transcript.mct"
+    )
+    return {
+        "transcript_path": transcript_path,
+        "transcribe_seconds": round(time.perf_counter() - start, 2)
+    }
+
 class MeetingCopilot:
     def __init__(
         self,
@@ -42,17 +159,24 @@ class MeetingCopilot:
         self.audio_dir.mkdir(parents=True, exist_ok=True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize components
-        self.transcriber = WhisperTranscriber(
-            model_name=whisper_model,
-            device=device
-        )
+        # Initialize components (the transcriber loads on first use)
+        self._transcriber = None
         self.formatter = TranscriptFormatter(output_dir=output_dir)
         self.analyzer = MeetingAnalyzer(
             output_dir=output_dir,
             llm_model=llm_model
         )
         
+    @property
+    def transcriber(self) -> WhisperTranscriber:
+        """Whisper transcriber, created on first use."""
+        if self._transcriber is None:
+            self._transcriber = WhisperTranscriber(
+                model_name=self.whisper_model,
+                device=self.device
+            )
+        return self._transcriber
+        
     def process_meeting(self, audio_file: str) -> str:
         """Process a meeting audio file through the full pipeline.
         
@@ -79,6 +203,7 @@ class MeetingCopilot:
             formatted_transcript,
             f"{audio_path.stem}_transcript.json"
         )
+        self.formatter.save_compact(transcription["segments"], f"{audio_path.stem}_transcript.mct")
         
         # Step 3: Analyze meeting
         logger.info("Analyzing meeting...")
@@ -90,6 +215,116 @@ class MeetingCopilot:
         
         logger.info(f"Meeting processing complete. Analysis saved to: {analysis_path}")
         return analysis_path
+        
+    def _analyze_saved_transcript(self, transcript_path: str, stem: str) -> str:
+        """Analyze a transcript saved by a transcription worker (compact or JSON)."""
+        if transcript_path.endswith(".mct"):
+            with CompactTranscript.load(transcript_path) as transcript:
+                formatted_transcript = self.formatter.format_transcript(build_transcription(transcript))
+        else:
+            with open(transcript_path) as f:
+                formatted_transcript = json.load(f)
+        analysis = self.analyzer.analyze_meeting(formatted_transcript)
+        return self.analyzer.save_analysis(analysis, f"{stem}_analysis.json")
+        
+    def process_batch(
+        self,
+        workers: Optional[int] = None,
+        analysis_workers: int = 4
+    ) -> Dict[str, Dict]:
+        """Process every audio file in the audio directory.
+        
+        Transcription runs in a process pool with one preloaded model per
+        worker. Each finished transcript is handed to a separate thread pool
+        for LLM analysis, so both stages run concurrently. Progress is kept in
+        output_dir/batch_manifest.json and finished files are skipped on rerun.
+        
+        Args:
+            workers: Transcription processes (sized to CPU and RAM by default)
+            analysis_workers: Concurrent LLM analysis threads
+            
+        Returns:
+            Manifest entries of the processed files
+        """
+        manifest = BatchManifest(self.output_dir / "batch_manifest.json")
+        audio_files = sorted(
+            path for path in self.audio_dir.iterdir()
+            if path.suffix.lower() in AUDIO_EXTENSIONS
+        )
+        pending = [path for path in audio_files if manifest.status(path.name) != "done"]
+        logger.info(
+            f"Batch: {len(audio_files)} files, "
+            f"{len(audio_files) - len(pending)} already done"
+        )
+        if not pending:
+            return {}
+        
+        workers = workers or recommended_workers(self.whisper_model, self.device)
+        
+        def analyze(path: Path):
+            start = time.perf_counter()
+            try:
+                analysis_path = self._analyze_saved_transcript(
+                    manifest.get(path.name)["transcript_path"],
+                    path.stem
+                )
+            except Exception as e:
+                logger.error(f"Analysis failed for {path.name}: {e}")
+                manifest.update(path.name, status="failed", stage="analysis", error=str(e))
+                return
+            manifest.update(
+                path.name,
+                status="done",
+                analysis_path=analysis_path,
+                analyze_seconds=round(time.perf_counter() - start, 2),
+                error=None
+            )
+            logger.info(f"Finished {path.name}")
+        
+        with ThreadPoolExecutor(max_workers=analysis_workers) as analysis_pool:
+            analysis_futures = []
+            
+            # Files transcribed by an earlier run only need analysis
+            to_transcribe = []
+            for path in pending:
+                entry = manifest.get(path.name)
+                if entry.get("transcript_path") and Path(entry["transcript_path"]).exists():
+                    analysis_futures.append(analysis_pool.submit(analyze, path))
+                else:
+                    to_transcribe.append(path)
+            
+            if to_transcribe:
+                workers = min(workers, len(to_transcribe))
+                logger.info(f"Transcribing {len(to_transcribe)} files with {workers} workers")
+                
+                # Split the cores between workers instead of oversubscribing them
+                cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_transcription_worker,
+                    initargs=(self.whisper_model, self.device, str(self.output_dir), cpu_threads)
+                ) as transcription_pool:
+                    futures = {}
+                    for path in to_transcribe:
+                        manifest.update(path.name, status="transcribing", error=None)
+                        futures[transcription_pool.submit(_transcribe_in_worker, str(path))] = path
+                    
+                    for future in as_completed(futures):
+                        path = futures[future]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logger.error(f"Transcription failed for {path.name}: {e}")
+                            manifest.update(path.name, status="failed", stage="transcription", error=str(e))
+                            continue
+                        manifest.update(path.name, status="transcribed", **result)
+                        analysis_futures.append(analysis_pool.submit(analyze, path))
+            
+            for future in analysis_futures:
+                future.result()
+        
+        return {path.name: manifest.get(path.name) for path in pending}
 
 def main():
     """Command-line interface for the meeting copilot."""
@@ -98,8 +333,19 @@ def main():
     )
     parser.add_argument(
         "audio_file",
+        nargs="?",
         help="Audio file to process (will be copied to audio directory)"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Process every audio file in the audio directory"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Transcription worker processes for --batch (default: sized to CPU and RAM)"
+    )
     parser.add_argument(
         "--whisper-model",
         default="large-v2",
@@ -114,8 +360,17 @@ def main():
         "--device",
         help="Device to run Whisper on (cuda/cpu)"
     )
+    parser.add_argument(
+        "--refresh-llm-cache",
+        action="store_true",
+        help="Call the LLM even if a cached response exists"
+    )
     
     args = parser.parse_args()
+    if not args.batch and not args.audio_file:
+        parser.error("audio_file is required unless --batch is given")
+    if args.refresh_llm_cache:
+        get_llm_cache().bypass = True
     
     # Initialize copilot
     copilot = MeetingCopilot(
@@ -124,6 +379,14 @@ def main():
         device=args.device
     )
     
+    if args.batch:
+        results = copilot.process_batch(workers=args.workers)
+        failed = [name for name, entry in results.items() if entry.get("status") != "done"]
+        print(f"\nBatch complete: {len(results) - len(failed)} processed, {len(failed)} failed")
+        for name in failed:
+            print(f"  {name}: {results[name].get('error')}")
+        return
+    
     # Process meeting
     try:
         analysis_path = copilot.process_meeting(args.audio_file)
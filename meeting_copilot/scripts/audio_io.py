@@ -0,0 +1,301 @@
+import os
+import tempfile
+import threading
+import subprocess
+import logging
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# WhisperX and pyannote both expect 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Frame length used when searching for pauses to cut at
+VAD_FRAME_SECONDS = 0.03
+
+# Where decoded audio is kept as .npy files (empty disables the cache)
+DECODED_AUDIO_DIR = os.getenv("DECODED_AUDIO_DIR", ".cache/audio")
+DECODED_AUDIO_MB = int(os.getenv("DECODED_AUDIO_MB", "4096"))
+
+
+def open_pcm_stream(audio_path: str) -> subprocess.Popen:
+    """Start an ffmpeg process decoding audio to 16 kHz mono s16le on stdout.
+
+    Args:
+        audio_path: Path to any audio file ffmpeg can read
+
+    Returns:
+        Running ffmpeg process
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", audio_path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-"
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def pcm16_to_float(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1]."""
+    return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+class PCM16Decoder:
+    def __init__(self):
+        """Decode a raw 16-bit PCM stream whose chunks may split a sample.
+
+        Same interface as StreamDecoder: a trailing odd byte is kept and
+        prepended to the next chunk instead of failing the conversion.
+        """
+        self._pending = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """Feed PCM bytes and return the complete samples so far.
+
+        Args:
+            data: Next chunk of the stream
+
+        Returns:
+            Float32 samples (may be empty)
+        """
+        data = self._pending + data
+        cut = len(data) - len(data) % 2
+        self._pending = data[cut:]
+        return pcm16_to_float(data[:cut])
+
+    def close(self) -> np.ndarray:
+        """Finish the stream; a dangling half sample is dropped."""
+        if self._pending:
+            logger.warning("PCM stream ended with an incomplete sample; dropping 1 byte")
+            self._pending = b""
+        return np.zeros(0, dtype=np.float32)
+
+
+class StreamDecoder:
+    def __init__(self, input_format: Optional[str] = None):
+        """Decode a compressed audio stream (e.g. Opus in WebM/Ogg) on the fly.
+
+        Encoded bytes are written to an ffmpeg process as they arrive, and
+        decoded 16 kHz mono samples are collected by a reader thread.
+
+        Args:
+            input_format: ffmpeg input format, or None to let ffmpeg probe it
+        """
+        cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+        if input_format:
+            cmd += ["-f", input_format]
+        cmd += ["-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        for block in iter(lambda: self.process.stdout.read(4096), b""):
+            with self._lock:
+                self._chunks.append(block)
+
+    def _take(self) -> np.ndarray:
+        with self._lock:
+            data = b"".join(self._chunks)
+            # Keep a trailing odd byte for the next call
+            cut = len(data) - len(data) % 2
+            self._chunks = [data[cut:]] if cut < len(data) else []
+        return pcm16_to_float(data[:cut])
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """Feed encoded bytes and return the samples decoded so far.
+
+        Args:
+            data: Next chunk of the encoded stream
+
+        Returns:
+            Newly decoded float32 samples (may be empty)
+        """
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+        return self._take()
+
+    def close(self) -> np.ndarray:
+        """Finish the stream and return the remaining decoded samples."""
+        self.process.stdin.close()
+        self._reader.join()
+        self.process.wait()
+        return self._take()
+
+
+def find_pause(audio: np.ndarray, search_from: int, min_pause_seconds: float = 0.5) -> int:
+    """Find the quietest point after search_from to cut audio at.
+
+    A simple energy VAD: frame energies are smoothed over min_pause_seconds and
+    the centre of the quietest stretch is returned.
+
+    Args:
+        audio: Float32 samples
+        search_from: First sample index to consider
+        min_pause_seconds: Length of the pause to look for
+
+    Returns:
+        Sample index to cut at
+    """
+    frame = int(VAD_FRAME_SECONDS * SAMPLE_RATE)
+    region = audio[search_from:]
+    n_frames = len(region) // frame
+    if n_frames == 0:
+        return len(audio)
+
+    energy = np.square(region[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+    width = max(1, int(min_pause_seconds / VAD_FRAME_SECONDS))
+    if n_frames > width:
+        energy = np.convolve(energy, np.ones(width) / width, mode="valid")
+        quietest = int(np.argmin(energy)) + width // 2
+    else:
+        quietest = int(np.argmin(energy))
+    return search_from + quietest * frame
+
+
+def iter_audio_windows(
+    audio_path: str,
+    window_seconds: float = 300.0,
+    search_seconds: float = 30.0,
+    read_seconds: float = 10.0
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """Decode an audio file incrementally and yield pause-bounded windows.
+
+    Only one window plus one read block is held in memory at a time, so
+    memory use does not grow with the length of the recording.
+
+    Args:
+        audio_path: Path to audio file
+        window_seconds: Target window length
+        search_seconds: How far before the target length to look for a pause
+        read_seconds: Amount of audio read from ffmpeg per read
+
+    Yields:
+        Tuples of (window start in seconds, float32 samples)
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    search = int(min(search_seconds, window_seconds / 2) * SAMPLE_RATE)
+    read_bytes = int(read_seconds * SAMPLE_RATE) * 2
+
+    process = open_pcm_stream(audio_path)
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0
+    try:
+        while True:
+            data = process.stdout.read(read_bytes)
+            if data:
+                buffer = np.concatenate([buffer, pcm16_to_float(data)])
+            while len(buffer) >= window:
+                cut = find_pause(buffer[:window], window - search)
+                yield offset / SAMPLE_RATE, buffer[:cut]
+                offset += cut
+                buffer = buffer[cut:]
+            if not data:
+                break
+        if process.wait() != 0 and offset == 0 and not len(buffer):
+            raise RuntimeError(f"Failed to decode audio: {audio_path}")
+        if len(buffer):
+            yield offset / SAMPLE_RATE, buffer
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def decode_audio(audio_path: str) -> np.ndarray:
+    """Decode a whole audio file to 16 kHz mono float32 samples.
+
+    Args:
+        audio_path: Path to any audio file ffmpeg can read
+
+    Returns:
+        Float32 samples in [-1, 1]
+    """
+    process = open_pcm_stream(audio_path)
+    data = process.stdout.read()
+    process.stdout.close()
+    if process.wait() != 0 and not data:
+        raise RuntimeError(f"Failed to decode audio: {audio_path}")
+    return pcm16_to_float(data)
+
+
+def load_audio(
+    audio_path: str,
+    audio_hash: Optional[str] = None,
+    cache_dir: str = DECODED_AUDIO_DIR,
+    max_cache_mb: int = DECODED_AUDIO_MB
+) -> np.ndarray:
+    """Decode an audio file once and share the samples between consumers.
+
+    When a content hash is given, the decoded samples are kept as a .npy file
+    and later calls memory-map it instead of running ffmpeg again.
+
+    Args:
+        audio_path: Path to audio file
+        audio_hash: Content hash of the file, used as the cache key
+        cache_dir: Directory for decoded .npy files (empty disables caching)
+        max_cache_mb: Maximum size of the decoded audio cache in MB
+
+    Returns:
+        Float32 samples, memory-mapped read-only when served from the cache
+    """
+    if not audio_hash or not cache_dir:
+        return decode_audio(audio_path)
+
+    cache_path = Path(cache_dir) / f"{audio_hash}.npy"
+    if cache_path.exists():
+        os.utime(cache_path)
+        return np.load(cache_path, mmap_mode="r")
+
+    audio = decode_audio(audio_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, audio)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    _evict_decoded(cache_path.parent, max_cache_mb * 1024 * 1024)
+    return np.load(cache_path, mmap_mode="r")
+
+
+def _evict_decoded(cache_dir: Path, max_bytes: int):
+    """Remove least recently used decoded files over the size limit."""
+    entries = []
+    for path in cache_dir.glob("*.npy"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    # The newest file is the one just written, so it is evicted last
+    for _, size, path in sorted(entries)[:-1]:
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
@@ -0,0 +1,112 @@
+import time
+import random
+import logging
+from typing import Dict, List, Tuple
+
+from scripts.transcript_alignment import TranscriptAligner
+
+logging.basicConfig(level=logging.WARNING)
+
+VOCABULARY_SIZE = 5000
+FILLER = ["we", "the", "so", "and", "I", "think", "that", "it", "is", "to", "a", "of"]
+
+
+def make_transcript(n_segments: int, seed: int = 0) -> List[Dict]:
+    """Generate a synthetic transcript with Zipf-like word frequencies."""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    segments = []
+    for i in range(n_segments):
+        words = rng.choices(vocabulary, weights, k=rng.randint(6, 25))
+        words += rng.choices(FILLER, k=len(words) // 2)
+        rng.shuffle(words)
+        segments.append({"start": i * 5.0, "end": i * 5.0 + 4.5, "text": " ".join(words)})
+    return segments
+
+
+def make_items(segments: List[Dict], n_items: int, seed: int = 1) -> List[Tuple[Dict, int]]:
+    """Extract items from random segments; half verbatim, half paraphrased."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(n_items):
+        index = rng.randrange(len(segments))
+        words = segments[index]["text"].split()
+        if i % 2:
+            # Paraphrase: drop and reorder words, add new ones
+            words = rng.sample(words, max(3, len(words) * 2 // 3)) + ["agreed", "team"]
+        else:
+            start = rng.randrange(max(1, len(words) - 5))
+            words = words[start:start + 5]
+        items.append(({"text": " ".join(words)}, index))
+    return items
+
+
+def naive_align(segments: List[Dict], items: List[Dict]):
+    """The previous /upload matching: substring search of every item in every segment."""
+    for segment in segments:
+        text = segment["text"].lower()
+        for item in items:
+            if item["text"].lower() in text:
+                item["start_time"] = segment["start"]
+                item["end_time"] = segment["end"]
+
+
+def run(n_segments: int, n_items: int) -> Dict:
+    """Time both approaches and measure how many items land on the right segment."""
+    segments = make_transcript(n_segments)
+    labelled = make_items(segments, n_items)
+
+    naive_items = [dict(item) for item, _ in labelled]
+    start = time.perf_counter()
+    naive_align(segments, naive_items)
+    naive_seconds = time.perf_counter() - start
+
+    indexed_items = [dict(item) for item, _ in labelled]
+    start = time.perf_counter()
+    aligner = TranscriptAligner(segments)
+    index_seconds = time.perf_counter() - start
+    aligner.annotate({"decisions": indexed_items})
+    indexed_seconds = time.perf_counter() - start
+
+    def accuracy(items):
+        hits = sum(
+            1 for item, (_, index) in zip(items, labelled)
+            if item.get("start_time") == segments[index]["start"]
+        )
+        return hits / len(items)
+
+    return {
+        "segments": n_segments,
+        "items": n_items,
+        "naive_seconds": naive_seconds,
+        "indexed_seconds": indexed_seconds,
+        "index_build_seconds": index_seconds,
+        "naive_accuracy": accuracy(naive_items),
+        "indexed_accuracy": accuracy(indexed_items)
+    }
+
+
+def main():
+    """Benchmark transcript alignment on long synthetic transcripts."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark decision/action item alignment")
+    parser.add_argument("--segments", default="1000,5000,20000", help="Comma-separated transcript sizes")
+    parser.add_argument("--items", type=int, default=200, help="Extracted items per transcript")
+
+    args = parser.parse_args()
+
+    print(f"{'segments':>9} {'items':>6} {'naive s':>9} {'indexed s':>10} {'(build)':>8} {'naive acc':>10} {'indexed acc':>12}")
+    for n_segments in [int(n) for n in args.segments.split(",")]:
+        result = run(n_segments, args.items)
+        print(
+            f"{result['segments']:>9} {result['items']:>6} "
+            f"{result['naive_seconds']:>9.3f} {result['indexed_seconds']:>10.3f} "
+            f"{result['index_build_seconds']:>8.3f} "
+            f"{result['naive_accuracy']:>10.2f} {result['indexed_accuracy']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import time
+import random
+import logging
+import tempfile
+import threading
+from typing import Dict, List
+
+from openai.types import CreateEmbeddingResponse
+
+from scripts.embedding_cache import EmbeddingCache
+from scripts.embeddings import OPENAI_EMBEDDING_MODEL, ScheduledEmbeddingFunction
+from scripts.llm_scheduler import LLMScheduler
+from scripts.stub_llm_server import count_tokens, embed
+from scripts.vector_memory import MeetingMemory, RUN_METADATA_KEYS
+
+logging.basicConfig(level=logging.WARNING)
+
+PHRASES = [
+    "go with the new vendor for storage",
+    "send the revised contract",
+    "review the budget for next quarter",
+    "rerun the latency numbers after the migration",
+    "revisit the hiring plan",
+    "confirm the launch date with marketing",
+    "clear the support backlog",
+    "move the roadmap review"
+]
+SPEAKERS = ["Alice", "Bob", "Carol", "Dave", "Erin"]
+
+
+class SimulatedEmbeddingClient:
+    def __init__(self, latency: float):
+        """In-process embeddings client answering like the stub LLM server after a delay."""
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.embeddings = self
+
+    def create(self, model: str, input: List[str]):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        tokens = sum(count_tokens(text) for text in input)
+        return CreateEmbeddingResponse.model_validate({
+            "object": "list",
+            "model": model,
+            "data": [{"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(input)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+
+def make_analysis(rng: random.Random, items: int) -> Dict:
+    """Synthetic meeting analysis with about items decisions, action items and follow-ups in total."""
+    def item(fields: Dict) -> Dict:
+        return {**fields, "context": f"{rng.choice(PHRASES)} ({rng.randrange(10 ** 6)})"}
+
+    counts = [items // 3, items // 3, items - 2 * (items // 3)]
+    return {
+        "summary": f"Discussed {', '.join(rng.sample(PHRASES, 3))}.",
+        "decisions": [item({"decision": rng.choice(PHRASES), "speaker": rng.choice(SPEAKERS)}) for _ in range(counts[0])],
+        "action_items": [item({"task": rng.choice(PHRASES), "owner": rng.choice(SPEAKERS)}) for _ in range(counts[1])],
+        "follow_ups": [item({"topic": rng.choice(PHRASES)}) for _ in range(counts[2])],
+        "agent_timings": {"summary": 1.0}
+    }
+
+
+def add_meeting_per_item(memory: MeetingMemory, summary_json: Dict, meeting_id: str):
+    """The previous add_meeting: one insert, and so one embedding request, per item."""
+    for section, content in summary_json.items():
+        if section in RUN_METADATA_KEYS or content is None:
+            continue
+        for item in content if isinstance(content, list) else [content]:
+            speaker = (item.get("speaker") or item.get("owner") or "Unknown") if isinstance(content, list) else "general"
+            memory.collection.add(
+                documents=[str(item)],
+                metadatas=[{"meeting_id": meeting_id, "section": section, "speaker": speaker,
+                            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}],
+                ids=[f"{meeting_id}_{section}_{hash(str(item)) % 100000}"]
+            )
+
+
+def main():
+    """Benchmark adding meetings to memory one item at a time vs. in bulk."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark per-item vs. batched meeting memory ingestion")
+    parser.add_argument("--meetings", type=int, default=20, help="Meetings to add")
+    parser.add_argument("--items", type=int, default=30, help="Extracted items per meeting")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated seconds per embedding request")
+
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    meetings = {f"meeting_{i:04d}": make_analysis(rng, args.items) for i in range(args.meetings)}
+
+    workdir = tempfile.TemporaryDirectory()
+    client = SimulatedEmbeddingClient(args.latency)
+    memory = MeetingMemory(workdir.name, ScheduledEmbeddingFunction(
+        client,
+        OPENAI_EMBEDDING_MODEL,
+        # Rate limits well above what the simulated requests need
+        LLMScheduler(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+    ))
+    # Period summaries and speaker profiles are made in the background and are not measured here
+    memory.rollup.complete = memory.profiles.complete = lambda messages: "summary"
+
+    print(f"{args.meetings} meetings x {args.items} items, {args.latency:g}s per embedding request\n")
+    print(f"{'path':<28} {'seconds':>8} {'requests':>9} {'documents':>10}")
+
+    def report(name: str, ingest):
+        memory.clear()
+        # A fresh embedding cache, so every path pays for its embeddings
+        memory.embedding_function.cache = EmbeddingCache(f"{workdir.name}/{name.split()[0]}_embeddings.db")
+        requests = client.requests
+        start = time.perf_counter()
+        ingest()
+        print(f"{name:<28} {time.perf_counter() - start:>8.2f} {client.requests - requests:>9} "
+              f"{memory.collection.count():>10}")
+
+    report("per item", lambda: [add_meeting_per_item(memory, analysis, meeting_id)
+                                for meeting_id, analysis in meetings.items()])
+    report("add_meeting (batched)", lambda: [memory.add_meeting(analysis, meeting_id)
+                                             for meeting_id, analysis in meetings.items()])
+    report("add_meetings (bulk)", lambda: memory.add_meetings(meetings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import time
+import random
+import logging
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+
+from scripts.benchmark_memory_ingest import PHRASES, SimulatedEmbeddingClient, make_analysis
+from scripts.embedding_cache import EmbeddingCache
+from scripts.embeddings import (
+    OPENAI_EMBEDDING_MODEL,
+    HashedEmbeddingFunction,
+    ScheduledEmbeddingFunction,
+    SentenceTransformerEmbeddingFunction,
+    sentence_transformers_available
+)
+from scripts.llm_backend import LLM_BACKEND, get_llm_client
+from scripts.llm_scheduler import LLMScheduler
+from scripts.vector_memory import MeetingMemory
+
+logging.basicConfig(level=logging.WARNING)
+
+BACKENDS = ("openai-simulated", "openai", "local", "hashed")
+
+
+def make_queries(rng: random.Random, count: int) -> List[str]:
+    """Distinct queries, so none is answered from the embedding cache."""
+    return [f"{rng.choice(PHRASES)} {rng.choice(['status', 'owner', 'deadline', 'risks'])} {i}" for i in range(count)]
+
+
+def run(memory: MeetingMemory, meetings: Dict[str, Dict], queries: List[str], before_queries=None) -> Dict:
+    """Fill memory, then time search_meetings for each query."""
+    start = time.perf_counter()
+    memory.add_meetings(meetings)
+    ingest = time.perf_counter() - start
+    if before_queries:
+        before_queries()
+    latencies = []
+    for query in queries:
+        query_start = time.perf_counter()
+        memory.search_meetings(query)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+    return {
+        "documents": memory.collection.count(),
+        "ingest": ingest,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99))
+    }
+
+
+def main():
+    """Benchmark memory search latency with API and local embedding backends."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark p50/p99 memory search latency per embedding backend")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["openai-simulated", "local", "hashed"],
+                        help="openai-simulated answers like the stub server after --api-latency; "
+                             "openai uses the LLM_BACKEND client")
+    parser.add_argument("--meetings", type=int, default=200, help="Meetings in memory")
+    parser.add_argument("--items", type=int, default=30, help="Extracted items per meeting")
+    parser.add_argument("--queries", type=int, default=200, help="Timed searches per backend")
+    parser.add_argument("--api-latency", type=float, default=0.15, help="Simulated seconds per embedding request")
+
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    meetings = {f"meeting_{i:04d}": make_analysis(rng, args.items) for i in range(args.meetings)}
+    queries = make_queries(rng, args.queries)
+    scheduler = LLMScheduler(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+
+    print(f"{args.meetings} meetings x {args.items} items, {args.queries} searches per backend "
+          f"(MeetingMemory.search_meetings, the work behind /search)\n")
+    print(f"{'backend':<18} {'model':<24} {'documents':>10} {'ingest s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends:
+            cache = EmbeddingCache(os.path.join(workdir, f"{backend}_embeddings.db"))
+            before_queries = None
+            if backend == "openai-simulated":
+                client = SimulatedEmbeddingClient(0.0)
+                function = ScheduledEmbeddingFunction(client, OPENAI_EMBEDDING_MODEL, scheduler, cache)
+
+                def before_queries(client=client):
+                    client.latency = args.api_latency
+            elif backend == "openai":
+                function = ScheduledEmbeddingFunction(get_llm_client(), OPENAI_EMBEDDING_MODEL, scheduler, cache,
+                                                      backend=LLM_BACKEND)
+            elif backend == "local":
+                if not sentence_transformers_available():
+                    print(f"{backend:<18} skipped: pip install sentence-transformers")
+                    continue
+                function = SentenceTransformerEmbeddingFunction()
+                # Load the model before timing anything
+                function(["warm up"])
+            else:
+                function = HashedEmbeddingFunction()
+
+            memory = MeetingMemory(os.path.join(workdir, backend), function)
+            # Period summaries and speaker profiles are made in the background and are not measured here
+            memory.rollup.complete = memory.profiles.complete = lambda messages: "summary"
+            result = run(memory, meetings, queries, before_queries)
+            memory.wait_for_background()
+            print(f"{backend:<18} {function.model_name:<24} {result['documents']:>10} {result['ingest']:>9.1f} "
+                  f"{result['p50']:>8.1f} {result['p99']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import sys
+import json
+import time
+import logging
+import tempfile
+import subprocess
+from typing import Dict
+
+import numpy as np
+
+from scripts.vector_memory import MeetingMemory
+
+logging.basicConfig(level=logging.WARNING)
+
+DIMENSIONS = 1536
+SECTIONS = ["summary", "decisions", "action_items", "follow_ups"]
+
+
+def fill(memory: MeetingMemory, documents: int, batch_size: int = 5000) -> float:
+    """Insert documents with random unit embeddings; return seconds taken."""
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for offset in range(0, documents, batch_size):
+        count = min(batch_size, documents - offset)
+        embeddings = rng.standard_normal((count, DIMENSIONS), dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        ids = range(offset, offset + count)
+        memory.collection.add(
+            ids=[f"doc_{i}" for i in ids],
+            embeddings=embeddings.tolist(),
+            documents=[f"item {i} of meeting {i // 30}" for i in ids],
+            metadatas=[{"meeting_id": f"meeting_{i // 30}", "section": SECTIONS[i % 4], "speaker": "Unknown"} for i in ids]
+        )
+    return time.perf_counter() - start
+
+
+def probe(data_dir: str, queries: int) -> Dict:
+    """Open a store as a fresh process would and time startup and queries."""
+    start = time.perf_counter()
+    memory = MeetingMemory(data_dir)
+    created = time.perf_counter()
+    count = memory.collection.count()
+    opened = time.perf_counter()
+
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((queries + 1, DIMENSIONS), dtype=np.float32).tolist()
+    memory.collection.query(query_embeddings=[vectors[0]], n_results=5)
+    first_query = time.perf_counter()
+
+    latencies = []
+    for vector in vectors[1:]:
+        query_start = time.perf_counter()
+        memory.collection.query(query_embeddings=[vector], n_results=5)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+    return {
+        "documents": count,
+        "init_ms": (created - start) * 1000,
+        "open_ms": (opened - created) * 1000,
+        "first_query_ms": (first_query - opened) * 1000,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+
+def main():
+    """Benchmark startup and query latency of the on-disk meeting memory."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark persistent meeting memory startup and queries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Documents per run")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries per run")
+    parser.add_argument("--probe", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.probe:
+        print(json.dumps(probe(args.probe, args.queries)))
+        return
+
+    print(f"{DIMENSIONS}-dimensional embeddings, {args.queries} queries per run; "
+          "startup measured in a new process\n")
+    print(f"{'documents':>10} {'ingest s':>9} {'init ms':>8} {'open ms':>8} "
+          f"{'1st query ms':>13} {'p50 ms':>7} {'p99 ms':>7}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            ingest = fill(MeetingMemory(data_dir), size)
+            output = subprocess.run(
+                [sys.executable, "-m", "scripts.benchmark_memory_store", "--probe", data_dir,
+                 "--queries", str(args.queries)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{result['documents']:>10} {ingest:>9.1f} {result['init_ms']:>8.1f} {result['open_ms']:>8.1f} "
+                  f"{result['first_query_ms']:>13.1f} {result['p50_ms']:>7.2f} {result['p99_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
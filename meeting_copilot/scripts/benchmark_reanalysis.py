@@ -0,0 +1,142 @@
+import os
+import time
+import random
+import logging
+import tempfile
+import threading
+from typing import Dict
+
+from openai.types.chat import ChatCompletion
+
+from scripts.fused_extraction import FusedExtractor
+from scripts.hierarchical_analysis import HierarchicalAnalyzer
+from scripts.llm_cache import LLMResponseCache
+from scripts.stub_llm_server import count_tokens, reply_for
+from scripts.transcript_edits import apply_edits
+from scripts.transcription_cache import TranscriptionCache
+
+logging.basicConfig(level=logging.WARNING)
+
+PHRASES = [
+    "we agreed to go with the new vendor for storage",
+    "I will send the revised contract by friday",
+    "what about the budget for next quarter?",
+    "the latency numbers look better after the migration",
+    "let's revisit the hiring plan next week",
+    "marketing needs the launch date confirmed",
+    "can someone check the support backlog?",
+    "the roadmap review is moving to thursday"
+]
+
+
+class SimulatedClient:
+    def __init__(self, latency: float):
+        """In-process chat completions client answering like the stub LLM server after a delay."""
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        content = reply_for(kwargs)
+        prompt_tokens = sum(count_tokens(str(message.get("content", ""))) for message in kwargs["messages"])
+        return ChatCompletion.model_validate({
+            "id": "simulated",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": kwargs["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": count_tokens(content),
+                "total_tokens": prompt_tokens + count_tokens(content)
+            }
+        })
+
+
+def make_meeting(rng: random.Random, minutes: int) -> Dict:
+    """Synthetic formatted transcript with a segment every few seconds."""
+    segments = []
+    clock = 0.0
+    while clock < minutes * 60:
+        duration = rng.uniform(2.0, 8.0)
+        segments.append({
+            "speaker": f"SPEAKER_{rng.randrange(5):02d}",
+            "start": round(clock, 2),
+            "end": round(clock + duration, 2),
+            "text": f"{rng.choice(PHRASES)} (item {len(segments)})"
+        })
+        # Occasional long pauses mark topic changes
+        clock += duration + (rng.uniform(3.0, 6.0) if rng.random() < 0.05 else rng.uniform(0.1, 1.0))
+    return {"segments": segments, "speakers": sorted({segment["speaker"] for segment in segments})}
+
+
+def run(analyzer: HierarchicalAnalyzer, client: SimulatedClient, transcript: Dict) -> Dict:
+    """Analyze and report requests made, chunks reused and seconds taken."""
+    requests = client.requests
+    start = time.perf_counter()
+    analysis = analyzer.analyze(transcript)
+    chunks = analysis["llm_usage"]["chunks"]
+    return {
+        "seconds": time.perf_counter() - start,
+        "requests": client.requests - requests,
+        "chunks": len(chunks),
+        "reused": sum(1 for chunk in chunks if chunk["cached"])
+    }
+
+
+def main():
+    """Benchmark re-analysis of a long meeting after small transcript corrections."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark incremental re-analysis after transcript edits")
+    parser.add_argument("--minutes", type=int, default=120, help="Meeting length")
+    parser.add_argument("--latency", type=float, default=1.0, help="Simulated seconds per LLM request")
+    parser.add_argument("--chunk-tokens", type=int, default=3000, help="Transcript tokens per chunk")
+
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    transcript = make_meeting(rng, args.minutes)
+    middle = len(transcript["segments"]) // 2
+
+    with tempfile.TemporaryDirectory() as workdir:
+        client = SimulatedClient(args.latency)
+        extractor = FusedExtractor(
+            client=client,
+            cache=LLMResponseCache(os.path.join(workdir, "llm.db"), bypass=True)
+        )
+        analyzer = HierarchicalAnalyzer(
+            extractor,
+            chunk_tokens=args.chunk_tokens,
+            cache=TranscriptionCache(os.path.join(workdir, "chunks"))
+        )
+
+        print(f"{len(transcript['segments'])} segments, {args.minutes} minutes, "
+              f"{args.latency:g}s per request\n")
+        print(f"{'scenario':<34} {'seconds':>8} {'requests':>9} {'chunks reused':>14}")
+
+        def report(name: str, result: Dict):
+            print(f"{name:<34} {result['seconds']:>8.1f} {result['requests']:>9} "
+                  f"{result['reused']:>6} / {result['chunks']:<6}")
+
+        report("full analysis", run(analyzer, client, transcript))
+
+        fixed_text = apply_edits(transcript, [{"index": middle, "text": "we decided to keep the current vendor"}])
+        report("one misheard sentence fixed", run(analyzer, client, fixed_text))
+
+        fixed_speaker = apply_edits(fixed_text, [{"index": middle + 1, "speaker": "SPEAKER_04"}])
+        report("one speaker label fixed", run(analyzer, client, fixed_speaker))
+
+        renames = {"SPEAKER_01": "Alice"}
+        renamed = apply_edits(fixed_speaker, speaker_renames=renames)
+        analyzer.relabel_speakers(fixed_speaker, renames)
+        report("speaker renamed everywhere", run(analyzer, client, renamed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import time
+import random
+import itertools
+import logging
+import tempfile
+from typing import Dict, List
+
+from scripts.transcript_index import TranscriptIndex
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger("scripts.transcript_index").setLevel(logging.WARNING)
+
+VOCABULARY_SIZE = 20000
+FILLER = ["we", "the", "so", "and", "I", "think", "that", "it", "is", "to", "a", "of"]
+
+QUERIES = [
+    '"word10 word11"',
+    "word5",
+    "word250 word3",
+    "word1234",
+    "word12*",
+    '"word2 word7" word40'
+]
+
+
+def make_meeting(rng: random.Random, vocabulary: List[str], cum_weights: List[float], n_segments: int) -> List[Dict]:
+    """Generate one synthetic meeting with Zipf-like word frequencies."""
+    segments = []
+    for i in range(n_segments):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(6, 25))
+        words += rng.choices(FILLER, k=len(words) // 2)
+        rng.shuffle(words)
+        segments.append({
+            "start": i * 5.0,
+            "end": i * 5.0 + 4.5,
+            "speaker": f"SPEAKER_{rng.randrange(6):02d}",
+            "text": " ".join(words)
+        })
+    return segments
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    """Benchmark full-text search over many synthetic meetings."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the transcript full-text index")
+    parser.add_argument("--meetings", type=int, default=2000, help="Number of meetings to index")
+    parser.add_argument("--segments", type=int, default=300, help="Segments per meeting")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY_SIZE)))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        index = TranscriptIndex(os.path.join(workdir, "transcripts.db"))
+
+        start = time.perf_counter()
+        for meeting in range(args.meetings):
+            index.index_transcript(f"meeting_{meeting}", make_meeting(rng, vocabulary, cum_weights, args.segments))
+        seconds = time.perf_counter() - start
+        stats = index.stats()
+        print(f"Indexed {stats['meetings']} meetings / {stats['segments']} segments "
+              f"in {seconds:.1f}s ({seconds / args.meetings * 1000:.1f} ms per meeting)")
+        print(f"Index size: {os.path.getsize(os.path.join(workdir, 'transcripts.db')) / 1e6:.1f} MB\n")
+
+        print(f"{'query':<26} {'results':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = index.search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{query:<26} {len(results):>8} {percentile(timings, 0.5):>8.2f} {percentile(timings, 0.99):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
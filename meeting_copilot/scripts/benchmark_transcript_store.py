@@ -0,0 +1,127 @@
+import os
+import gc
+import json
+import time
+import random
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from scripts.format_transcript import TranscriptFormatter
+from scripts.transcript_store import CompactTranscript
+
+WORDS = ("we should ship the release next week budget review roadmap customer "
+         "feedback hiring plan sounds good agreed let me check on that").split()
+
+
+def make_transcription(n_segments: int, seed: int = 0) -> Dict:
+    """Generate a raw transcription the size of a long meeting."""
+    rng = random.Random(seed)
+    segments = [
+        {
+            "start": i * 2.0,
+            "end": i * 2.0 + 1.8,
+            "speaker": f"SPEAKER_{rng.randrange(8):02d}",
+            "text": " " + " ".join(rng.choices(WORDS, k=rng.randint(5, 30)))
+        }
+        for i in range(n_segments)
+    ]
+    return {
+        "segments": segments,
+        "speakers": sorted({segment["speaker"] for segment in segments}),
+        "text": " ".join(segment["text"].strip() for segment in segments)
+    }
+
+
+def measure(fn: Callable) -> Tuple[float, int, object]:
+    """Run fn and return wall time, peak traced allocation and its result."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def concat_text(segments: List[Dict]) -> str:
+    """Text rendering with repeated string concatenation, as format_transcript() did."""
+    formatted = ""
+    for seg in segments:
+        formatted += f"[{float(seg['start']):.2f}s - {float(seg['end']):.2f}s] {seg.get('speaker', 'Unknown')}: {seg['text']}\n"
+    return formatted
+
+
+def parse_time(formatted: str) -> float:
+    """Parse TranscriptFormatter's H:MM:SS time strings back to seconds."""
+    hours, minutes, seconds = formatted.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def run(n_segments: int, workdir: str) -> List[Tuple[str, float, int]]:
+    """Benchmark the dict/JSON path against the compact format."""
+    transcription = make_transcription(n_segments)
+    formatter = TranscriptFormatter(output_dir=workdir)
+    json_name = f"bench_{n_segments}.json"
+    compact_name = f"bench_{n_segments}.mct"
+    rows = []
+
+    def record(label, fn):
+        seconds, peak, result = measure(fn)
+        rows.append((label, seconds, peak))
+        return result
+
+    record("save json", lambda: formatter.save_transcript(formatter.format_transcript(transcription), json_name))
+    record("save compact", lambda: formatter.save_compact(transcription["segments"], compact_name))
+
+    def load_json():
+        with open(os.path.join(workdir, json_name)) as f:
+            return json.load(f)
+
+    loaded = record("load json", load_json)
+    compact = record("load compact (mmap)", lambda: CompactTranscript.load(os.path.join(workdir, compact_name)))
+
+    middle = float(n_segments)
+    record("slice 10 min json", lambda: [
+        segment for segment in loaded["segments"]
+        if middle <= parse_time(segment["start_time"]) < middle + 600
+    ])
+    record("slice 10 min compact", lambda: list(compact.between(middle, middle + 600)))
+
+    record("render text (+=)", lambda: len(concat_text(transcription["segments"])))
+    record("render text (compact stream)", lambda: sum(len(line) for line in compact.iter_text()))
+    record("render json (json.dumps)", lambda: len(json.dumps(loaded, indent=2)))
+    record("render json (compact stream)", lambda: sum(len(chunk) for chunk in compact.iter_json()))
+
+    sizes = (
+        os.path.getsize(os.path.join(workdir, json_name)),
+        os.path.getsize(os.path.join(workdir, compact_name))
+    )
+    compact.close()
+    rows.append(("file size json / compact", sizes[0], sizes[1]))
+    return rows
+
+
+def main():
+    """Compare the dict/JSON transcript path with the compact binary format."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark compact transcript storage")
+    parser.add_argument("--segments", default="2000,10000,40000", help="Comma-separated transcript sizes")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_segments in [int(n) for n in args.segments.split(",")]:
+            print(f"\n{n_segments} segments")
+            print(f"  {'operation':<30} {'seconds':>9} {'peak MB':>9}")
+            for label, seconds, peak in run(n_segments, workdir):
+                if label.startswith("file size"):
+                    print(f"  {label:<30} {seconds / 1e6:>8.2f}M {peak / 1e6:>8.2f}M")
+                else:
+                    print(f"  {label:<30} {seconds:>9.4f} {peak / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
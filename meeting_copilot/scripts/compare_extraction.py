@@ -0,0 +1,170 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+import tiktoken
+
+from scripts.run_crewai_agents import MeetingAnalyzer
+from scripts.transcript_alignment import ALIGNED_SECTIONS, item_text, tokenize
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_encoding(model: str):
+    """tiktoken encoding for a model, falling back to cl100k_base."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def as_items(value) -> List:
+    """Normalize an analysis section to a list of items.
+
+    Agents may return JSON text or plain text rather than parsed lists.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [line.strip("-* ").strip() for line in value.splitlines() if line.strip("-* ").strip()]
+    if isinstance(value, dict):
+        return [value]
+    return list(value) if isinstance(value, list) else [value]
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the stemmed content words of two texts."""
+    tokens_a, tokens_b = set(tokenize(a)), set(tokenize(b))
+    if not tokens_a and not tokens_b:
+        return 1.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def item_agreement(reference: List, candidate: List, threshold: float = 0.5) -> Dict:
+    """Greedily match items across two runs and report precision/recall/F1."""
+    reference_texts = [item_text(item) for item in reference]
+    unmatched = [item_text(item) for item in candidate]
+    matched = 0
+    for text in reference_texts:
+        scores = [similarity(text, other) for other in unmatched]
+        if scores and max(scores) >= threshold:
+            unmatched.pop(scores.index(max(scores)))
+            matched += 1
+    precision = matched / len(candidate) if candidate else float(not reference)
+    recall = matched / len(reference) if reference else float(not candidate)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "agents": len(reference),
+        "fused": len(candidate),
+        "matched": matched,
+        "f1": round(f1, 3)
+    }
+
+
+def agent_tokens(analyzer: MeetingAnalyzer, transcript: Dict, analysis: Dict, encoding) -> Dict:
+    """Estimate token use of the per-agent run from its prompts and outputs.
+
+    crewai adds its own system prompt and reasoning scaffolding around each
+    task, so these counts are a lower bound.
+    """
+    agents = [analyzer.summarizer, analyzer.decision_extractor, analyzer.action_tracker, analyzer.followup_checker]
+    prompt_tokens = sum(len(encoding.encode(agent.build_prompt(transcript))) for agent in agents)
+    completion_tokens = sum(
+        len(encoding.encode(json.dumps(analysis.get(section), default=str)))
+        for section in ("summary",) + ALIGNED_SECTIONS
+    )
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "requests": len(agents)}
+
+
+def compare(transcript_path: Path, agents: MeetingAnalyzer, fused: MeetingAnalyzer, encoding) -> Dict:
+    """Run both modes on one saved transcript."""
+    with open(transcript_path) as f:
+        transcript = json.load(f)
+
+    agent_analysis = agents.analyze_meeting(transcript)
+    fused_analysis = fused.analyze_meeting(transcript)
+
+    return {
+        "transcript": str(transcript_path),
+        "agents": {
+            "seconds": agent_analysis["agent_timings"]["total"],
+            "errors": agent_analysis.get("agent_errors", {}),
+            **agent_tokens(agents, transcript, agent_analysis, encoding)
+        },
+        "fused": {
+            "seconds": fused_analysis["agent_timings"]["total"],
+            "errors": fused_analysis.get("agent_errors", {}),
+            **{
+                key: value for key, value in fused_analysis.get("llm_usage", {}).items()
+                if key != "seconds"
+            }
+        },
+        "agreement": {
+            "summary_similarity": round(similarity(
+                str(agent_analysis.get("summary") or ""),
+                str(fused_analysis.get("summary") or "")
+            ), 3),
+            **{
+                section: item_agreement(
+                    as_items(agent_analysis.get(section)),
+                    as_items(fused_analysis.get(section))
+                )
+                for section in ALIGNED_SECTIONS
+            }
+        }
+    }
+
+
+def main():
+    """Compare per-agent and fused extraction on saved transcripts."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare per-agent and fused meeting extraction")
+    parser.add_argument("transcripts", nargs="*", help="Formatted transcript JSON files (default: output/*_formatted.json)")
+    parser.add_argument("--model", default="gpt-4", help="LLM model to use")
+    parser.add_argument("--report", help="Write the full comparison as JSON to this path")
+
+    args = parser.parse_args()
+
+    paths = [Path(path) for path in args.transcripts] or sorted(Path("output").glob("*_formatted.json"))
+    if not paths:
+        parser.error("No transcripts given and none found in output/")
+
+    encoding = get_encoding(args.model)
+    agents = MeetingAnalyzer(llm_model=args.model, mode="agents")
+    fused = MeetingAnalyzer(llm_model=args.model, mode="fused")
+
+    results = []
+    for path in paths:
+        logger.info(f"Comparing extraction modes on {path}")
+        results.append(compare(path, agents, fused, encoding))
+
+    print(f"\n{'transcript':<36} {'mode':<7} {'seconds':>8} {'prompt tok':>11} {'output tok':>11} {'requests':>9}")
+    for result in results:
+        name = Path(result["transcript"]).name
+        for mode in ("agents", "fused"):
+            run = result[mode]
+            print(
+                f"{name:<36} {mode:<7} {run['seconds']:>8.1f} {run.get('prompt_tokens', 0):>11} "
+                f"{run.get('completion_tokens', 0):>11} {run.get('requests', 0):>9}"
+                + (f"  errors: {', '.join(run['errors'])}" if run["errors"] else "")
+            )
+        agreement = result["agreement"]
+        print(
+            f"{'':<36} agreement: summary {agreement['summary_similarity']:.2f}, "
+            + ", ".join(f"{section} F1 {agreement[section]['f1']:.2f}" for section in ALIGNED_SECTIONS)
+        )
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Comparison saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
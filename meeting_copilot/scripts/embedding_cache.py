@@ -0,0 +1,206 @@
+import os
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.db")
+DEFAULT_MAX_SIZE_MB = int(os.getenv("EMBEDDING_CACHE_MB", "1024"))
+# Hashes per SQL statement, under SQLite's limit on bound parameters
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT,
+    text_hash TEXT,
+    accessed REAL,
+    size INTEGER,
+    vector BLOB,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed);
+"""
+
+
+def text_hash(text: str) -> str:
+    """Content hash identifying a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_size_mb: int = DEFAULT_MAX_SIZE_MB):
+        """Initialize the on-disk cache of embedding vectors.
+
+        Vectors are keyed on model and a hash of the text, and stored as
+        float32. Embeddings do not change for a model, so entries never
+        expire; the least recently used ones are evicted when the cache
+        grows beyond max_size_mb.
+
+        Args:
+            path: SQLite database file
+            max_size_mb: Maximum total size of cached vectors in MB
+        """
+        self.path = path
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Look up cached embeddings.
+
+        Args:
+            model: Embedding model
+            texts: Texts to look up
+
+        Returns:
+            Text hash -> embedding, for the texts that are cached
+        """
+        keys = [text_hash(text) for text in texts]
+        hashes = list(dict.fromkeys(keys))
+        found = {}
+        conn = self._connect()
+        try:
+            for offset in range(0, len(hashes), LOOKUP_BATCH):
+                batch = hashes[offset:offset + LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({', '.join('?' * len(batch))})",
+                    [model] + batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                with conn:
+                    conn.executemany(
+                        "UPDATE embeddings SET accessed = ? WHERE model = ? AND text_hash = ?",
+                        [(time.time(), model, key) for key in found]
+                    )
+        finally:
+            conn.close()
+
+        with self._lock:
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """Store embeddings and evict entries over the size limit.
+
+        Args:
+            model: Embedding model
+            texts: Embedded texts
+            embeddings: Their embeddings, in the same order
+        """
+        now = time.time()
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            blob = array("f", embedding).tobytes()
+            rows.append((model, text_hash(text), now, len(blob), blob))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries over the size limit."""
+        with conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+            if total <= self.max_size_bytes:
+                return
+            evicted = 0
+            for model, key, size in conn.execute(
+                "SELECT model, text_hash, size FROM embeddings ORDER BY accessed"
+            ).fetchall():
+                if total <= self.max_size_bytes:
+                    break
+                conn.execute("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", (model, key))
+                total -= size
+                evicted += 1
+        logger.info(f"Evicted {evicted} embeddings over the {self.max_size_bytes // (1024 * 1024)} MB limit")
+
+    def clear(self):
+        """Remove all cached embeddings."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM embeddings")
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """Report hit rate and cache size."""
+        conn = self._connect()
+        try:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+            ).fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "size_mb": round(size / (1024 * 1024), 2)
+            }
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+def main():
+    """Inspect or clear the embedding cache."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embedding cache")
+    parser.add_argument("action", choices=["stats", "clear"], help="Show cache size or remove all entries")
+    parser.add_argument("--path", default=DEFAULT_CACHE_PATH, help="Cache database path")
+
+    args = parser.parse_args()
+    cache = EmbeddingCache(args.path)
+
+    if args.action == "clear":
+        cache.clear()
+        print(f"Cleared {args.path}")
+    else:
+        stats = cache.stats()
+        print(f"{stats['entries']} cached embeddings, {stats['size_mb']} MB in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
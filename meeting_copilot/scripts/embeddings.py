@@ -0,0 +1,199 @@
+import os
+import re
+import zlib
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from scripts.llm_scheduler import LLMScheduler, get_scheduler
+from scripts.llm_backend import LLM_BACKEND, get_llm_client
+from scripts.embedding_cache import EmbeddingCache, get_embedding_cache, text_hash
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# openai (LLM_BACKEND embeddings API), local (sentence-transformers on CPU,
+# hashed if it is not installed) or hashed (n-gram feature hashing)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+EMBEDDING_BACKENDS = ("openai", "local", "hashed")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+HASHED_EMBEDDING_DIMENSIONS = int(os.getenv("HASHED_EMBEDDING_DIMENSIONS", "512"))
+# Texts per embedding request (the OpenAI API accepts up to 2048)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "512"))
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class ScheduledEmbeddingFunction(EmbeddingFunction):
+    def __init__(
+        self,
+        client,
+        model_name: str,
+        scheduler: LLMScheduler,
+        cache: Optional[EmbeddingCache] = None,
+        backend: str = "openai"
+    ):
+        """Embedding function whose API requests go through the LLM scheduler.
+
+        Texts already in the embedding cache are not sent again. Vectors from
+        a backend other than OpenAI (the stub server's are fake) are cached
+        and stored under their own space, "<backend>/<model>", so they never
+        mix with real ones.
+
+        Args:
+            client: OpenAI-compatible client of the LLM backend
+            model_name: Embedding model
+            scheduler: Scheduler applying rate limits and priorities
+            cache: Embedding cache (default: the process-wide one)
+            backend: LLM backend the client talks to
+        """
+        self.client = client
+        self.model_name = model_name
+        self.scheduler = scheduler
+        self.cache = cache or get_embedding_cache()
+        self.space = model_name if backend == "openai" else f"{backend}/{model_name}"
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        found = self.cache.get_many(self.space, texts)
+        # Each distinct uncached text is embedded once
+        missing = list(dict.fromkeys(text for text in texts if text_hash(text) not in found))
+        for offset in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+            batch = missing[offset:offset + EMBEDDING_BATCH_SIZE]
+            response = self.scheduler.run(
+                lambda: self.client.embeddings.create(model=self.model_name, input=batch),
+                tokens=sum(len(text) for text in batch) // 4 + 1
+            )
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            self.cache.put_many(self.space, batch, embeddings)
+            found.update(zip((text_hash(text) for text in batch), embeddings))
+        return [found[text_hash(text)] for text in texts]
+
+
+class HashedEmbeddingFunction(EmbeddingFunction):
+    def __init__(self, dimensions: int = HASHED_EMBEDDING_DIMENSIONS, min_n: int = 3, max_n: int = 5):
+        """Embedding by feature hashing of words and character n-grams.
+
+        Needs no model and no network: each word and each n-gram of
+        " word " (so "vendor" also matches "vendors") is hashed to a signed
+        dimension, and the counts are L2-normalized. Similarity reflects
+        shared wording rather than meaning, which is usually enough to find
+        items of past meetings by their names, owners and topics.
+
+        Args:
+            dimensions: Vector size
+            min_n: Shortest character n-gram
+            max_n: Longest character n-gram
+        """
+        self.dimensions = dimensions
+        self.min_n = min_n
+        self.max_n = max_n
+        self.model_name = f"hashed-{dimensions}"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for word in WORD_PATTERN.findall(text.lower()):
+            features.append(word)
+            padded = f" {word} "
+            for n in range(self.min_n, min(self.max_n, len(padded)) + 1):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def __call__(self, input: Documents) -> Embeddings:
+        rows = []
+        hashes = []
+        for row, text in enumerate(input):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(zlib.crc32(feature.encode("utf-8")) for feature in features)
+
+        # One scatter-add over all texts of the batch
+        hashes = np.array(hashes, dtype=np.uint32)
+        signs = np.where(hashes >> 31, 1.0, -1.0).astype(np.float32)
+        matrix = np.zeros((len(input), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), hashes % self.dimensions), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+
+class SentenceTransformerEmbeddingFunction(EmbeddingFunction):
+    def __init__(self, model_name: str = LOCAL_EMBEDDING_MODEL, batch_size: int = 64, device: str = "cpu"):
+        """Embedding with a small sentence-transformers model, run locally.
+
+        The model is loaded on the first call, so startup does not wait for it.
+
+        Args:
+            model_name: sentence-transformers model name or path
+            batch_size: Texts per forward pass
+            device: Torch device
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self.model_name, device=self.device)
+                logger.info(f"Loaded embedding model {self.model_name} on {self.device}")
+            return self._model
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = self._load().encode(
+            list(input),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        return vectors.tolist()
+
+
+def sentence_transformers_available() -> bool:
+    """Whether the optional sentence-transformers package is installed."""
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_embedding_function(
+    backend: str = EMBEDDING_BACKEND,
+    client=None,
+    scheduler: Optional[LLMScheduler] = None
+) -> EmbeddingFunction:
+    """Create the embedding function of a backend.
+
+    Args:
+        backend: "openai", "local" or "hashed"
+        client: OpenAI-compatible client of the LLM_BACKEND backend for "openai"
+            (default: the process-wide one)
+        scheduler: LLM request scheduler for "openai" (default: the process-wide one)
+
+    Returns:
+        Embedding function; its space (or model_name) identifies the vector space
+    """
+    if backend == "openai":
+        return ScheduledEmbeddingFunction(
+            client or get_llm_client(),
+            OPENAI_EMBEDDING_MODEL,
+            scheduler or get_scheduler(),
+            backend=LLM_BACKEND
+        )
+    if backend == "local":
+        if sentence_transformers_available():
+            return SentenceTransformerEmbeddingFunction()
+        logger.warning("sentence-transformers is not installed; using hashed n-gram embeddings")
+        return HashedEmbeddingFunction()
+    if backend == "hashed":
+        return HashedEmbeddingFunction()
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(EMBEDDING_BACKENDS)}")
@@ -1,8 +1,10 @@
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 import json
 from datetime import timedelta
 from pathlib import Path
 
+from scripts.transcript_store import CompactTranscript
+
 class TranscriptFormatter:
     def __init__(self, output_dir: str = "output"):
         """Initialize the transcript formatter.
@@ -24,6 +26,34 @@ class TranscriptFormatter:
         """
         return str(timedelta(seconds=int(seconds)))
         
+    def format_segment(self, segment: Dict) -> Dict:
+        """Format a single raw segment.
+        
+        Args:
+            segment: Raw segment from WhisperX
+            
+        Returns:
+            Formatted segment with speaker and timestamps
+        """
+        return {
+            "speaker": segment.get("speaker", "UNKNOWN"),
+            "start_time": self.format_time(segment["start"]),
+            "end_time": self.format_time(segment["end"]),
+            "text": segment["text"].strip()
+        }
+        
+    def format_segments(self, segments: Iterable[Dict]) -> Iterator[Dict]:
+        """Format raw segments one at a time as they arrive.
+        
+        Args:
+            segments: Raw segments, e.g. from WhisperTranscriber.transcribe_stream
+            
+        Yields:
+            Formatted segments
+        """
+        for segment in segments:
+            yield self.format_segment(segment)
+        
     def format_transcript(self, transcription: Dict) -> Dict:
         """Format transcription into a structured format.
         
@@ -33,16 +63,7 @@ class TranscriptFormatter:
         Returns:
             Formatted transcript with speaker turns and timestamps
         """
-        formatted_segments = []
-        
-        for segment in transcription["segments"]:
-            formatted_segment = {
-                "speaker": segment.get("speaker", "UNKNOWN"),
-                "start_time": self.format_time(segment["start"]),
-                "end_time": self.format_time(segment["end"]),
-                "text": segment["text"].strip()
-            }
-            formatted_segments.append(formatted_segment)
+        formatted_segments = list(self.format_segments(transcription["segments"]))
             
         return {
             "segments": formatted_segments,
@@ -64,6 +85,60 @@ class TranscriptFormatter:
         with open(output_path, "w") as f:
             json.dump(formatted_transcript, f, indent=2)
         return str(output_path)
+        
+    def save_compact(self, segments: Iterable[Dict], filename: str) -> str:
+        """Save raw segments in the compact binary transcript format.
+        
+        The file can be memory-mapped with CompactTranscript.load and rendered
+        to JSON or text without materializing every segment.
+        
+        Args:
+            segments: Raw segments from WhisperX
+            filename: Output filename
+            
+        Returns:
+            Path to saved file
+        """
+        return CompactTranscript.from_segments(segments).save(str(self.output_dir / filename))
+        
+    def save_transcript_stream(self, segments: Iterable[Dict], filename: str) -> str:
+        """Format raw segments and write them to a JSON file as they arrive.
+        
+        Produces the same structure as save_transcript without holding all
+        formatted segments in memory.
+        
+        Args:
+            segments: Raw segments, e.g. from WhisperTranscriber.transcribe_stream
+            filename: Output filename
+            
+        Returns:
+            Path to saved file
+        """
+        output_path = self.output_dir / filename
+        texts = []
+        speakers = []
+        with open(output_path, "w") as f:
+            f.write('{\n  "segments": [')
+            for i, segment in enumerate(self.format_segments(segments)):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(segment))
+                f.flush()
+                texts.append(segment["text"])
+                if segment["speaker"] not in speakers:
+                    speakers.append(segment["speaker"])
+            f.write("\n  ],\n")
+            f.write(f'  "full_text": {json.dumps(" ".join(texts))},\n')
+            f.write(f'  "speakers": {json.dumps(speakers)}\n}}\n')
+        return str(output_path)
+
+def parse_time(value) -> float:
+    """Parse seconds or TranscriptFormatter's H:MM:SS strings."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
 
 def format_transcript(segments):
     """Format transcript segments into a readable text format.
@@ -74,14 +149,14 @@ def format_transcript(segments):
     Returns:
         Formatted transcript text
     """
-    formatted = ""
+    lines = []
     for seg in segments:
         speaker = seg.get("speaker", "Unknown")
         start = float(seg["start"])
         end = float(seg["end"])
         text = seg["text"]
-        formatted += f"[{start:.2f}s - {end:.2f}s] {speaker}: {text}\n"
-    return formatted
+        lines.append(f"[{start:.2f}s - {end:.2f}s] {speaker}: {text}\n")
+    return "".join(lines)
 
 def main():
     """Example usage of TranscriptFormatter."""
@@ -0,0 +1,273 @@
+import json
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+
+from openai import OpenAI
+from pydantic import BaseModel, Field, ValidationError
+
+from scripts.prompt_encoder import TranscriptPromptEncoder
+from scripts.llm_cache import LLMResponseCache, get_llm_cache
+from scripts.llm_scheduler import LLMScheduler, get_scheduler
+from scripts.llm_backend import get_llm_client
+from scripts.json_stream import JsonItemStream
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Model name prefixes that accept a JSON schema as response_format
+SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+
+class Decision(BaseModel):
+    decision: str = Field(description="The specific decision made")
+    speaker: Optional[str] = Field(None, description="Who made the decision")
+    context: Optional[str] = Field(None, description="Context and reasoning behind it")
+    conditions: Optional[str] = Field(None, description="Conditions or caveats attached")
+
+
+class ActionItem(BaseModel):
+    task: str = Field(description="The specific task or action required")
+    owner: Optional[str] = Field(None, description="Who is responsible for it")
+    deadline: Optional[str] = Field(None, description="Mentioned deadline or timeframe")
+    dependencies: Optional[str] = Field(None, description="Dependencies or prerequisites")
+    priority: Optional[str] = Field(None, description="Priority level, if mentioned")
+
+
+class FollowUp(BaseModel):
+    topic: str = Field(description="The topic or issue that needs follow-up")
+    reason: Optional[str] = Field(None, description="Why it needs follow-up")
+    participants: List[str] = Field(default_factory=list, description="Who should be involved")
+    urgency: Optional[str] = Field(None, description="Suggested timing or urgency")
+    questions: List[str] = Field(default_factory=list, description="Questions or points to address")
+
+
+class MeetingExtraction(BaseModel):
+    summary: str = Field(description="Markdown summary: main topics, key points per speaker, flow and context")
+    decisions: List[Decision] = Field(default_factory=list)
+    action_items: List[ActionItem] = Field(default_factory=list)
+    follow_ups: List[FollowUp] = Field(default_factory=list)
+
+
+# Model of each list section, used to validate items as they stream in
+ITEM_MODELS = {"decisions": Decision, "action_items": ActionItem, "follow_ups": FollowUp}
+
+
+SYSTEM_PROMPT = """You are a meeting analyst. From the meeting transcript, produce in one pass:
+1. summary: a well-structured markdown summary covering the main topics, key points raised
+   by each speaker, the overall flow of the meeting and important context.
+2. decisions: every explicit or implicit decision, who made it, its reasoning and any caveats.
+3. action_items: every task assigned, with owner, deadline, dependencies and priority when stated.
+4. follow_ups: unresolved topics that need follow-up, why, who should be involved, urgency and
+   open questions.
+Only use information from the transcript. Use null for fields that are not mentioned.
+Respond with a single JSON object matching this schema:
+{schema}"""
+
+
+class FusedExtractor:
+    def __init__(
+        self,
+        llm_model: str = "gpt-4",
+        client: Optional[OpenAI] = None,
+        temperature: float = 0.0,
+        max_retries: int = 1,
+        encoder: Optional[TranscriptPromptEncoder] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
+        """Extract summary, decisions, action items and follow-ups in one request.
+
+        Args:
+            llm_model: Chat model to use
+            client: OpenAI-compatible client (default: the LLM_BACKEND one; the
+                scheduler retries rate-limited requests, so it should not)
+            temperature: Sampling temperature
+            max_retries: Extra attempts when the reply fails schema validation
+            encoder: Transcript prompt encoder
+            cache: LLM response cache (default: the process-wide one)
+            scheduler: LLM request scheduler (default: the process-wide one)
+        """
+        self.llm_model = llm_model
+        self.client = client or get_llm_client()
+        self.temperature = temperature
+        self.max_retries = max_retries
+        self.encoder = encoder or TranscriptPromptEncoder(llm_model)
+        self.cache = cache or get_llm_cache()
+        self.scheduler = scheduler or get_scheduler()
+
+    def build_messages(self, transcript: Dict) -> List[Dict]:
+        """Build the chat messages for a formatted transcript."""
+        schema = json.dumps(MeetingExtraction.model_json_schema())
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT.format(schema=schema)},
+            {"role": "user", "content": f"Transcript:\n{self.encoder.encode(transcript)}"}
+        ]
+
+    def _response_format(self) -> Optional[Dict]:
+        """Constrain the reply to the schema where the model supports it."""
+        if self.llm_model.startswith(SCHEMA_MODELS):
+            return {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "meeting_extraction",
+                    "schema": MeetingExtraction.model_json_schema()
+                }
+            }
+        return None
+
+    @staticmethod
+    def _parse(content: str) -> MeetingExtraction:
+        """Validate a reply, tolerating a markdown code fence around the JSON."""
+        content = content.strip()
+        if content.startswith("```"):
+            content = content.split("\n", 1)[1].rsplit("```", 1)[0]
+        return MeetingExtraction.model_validate_json(content)
+
+    def _request(self, messages: List[Dict], kwargs: Dict) -> Dict:
+        """Make the request, retrying with the validation error if needed."""
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            response = self.scheduler.chat(
+                self.client,
+                model=self.llm_model,
+                messages=messages,
+                temperature=self.temperature,
+                **kwargs
+            )
+            usage["requests"] += 1
+            if response.usage:
+                usage["prompt_tokens"] += response.usage.prompt_tokens
+                usage["completion_tokens"] += response.usage.completion_tokens
+            content = response.choices[0].message.content or ""
+            try:
+                extraction = self._parse(content)
+                break
+            except (ValidationError, ValueError) as e:
+                logger.warning(f"Fused extraction reply failed validation (attempt {attempt + 1}): {e}")
+                if attempt == self.max_retries:
+                    raise ValueError(f"Fused extraction did not match the schema: {e}") from e
+                messages = messages + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": f"That reply did not match the schema: {e}. Respond with corrected JSON only."}
+                ]
+
+        usage["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Fused extraction: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} "
+            f"completion tokens in {usage['seconds']:.1f}s"
+        )
+        result = extraction.model_dump()
+        result["llm_usage"] = usage
+        return result
+
+    @staticmethod
+    def _item_event(key: Optional[str], value) -> Optional[Dict]:
+        """Event for a value completed in the streamed reply, if it is a valid item or the summary."""
+        if key == "summary" and isinstance(value, str):
+            return {"type": "section", "section": "summary", "value": value}
+        if key in ITEM_MODELS:
+            try:
+                item = ITEM_MODELS[key].model_validate(value).model_dump()
+            except ValidationError:
+                return None
+            return {"type": "item", "section": key, "item": item}
+        return None
+
+    def _request_stream(self, messages: List[Dict], kwargs: Dict, on_event: Callable[[Dict], None]) -> Dict:
+        """Stream the reply, passing each item to on_event as soon as its object closes.
+
+        A reply that fails validation is retried without streaming.
+        """
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 1}
+        start = time.perf_counter()
+        parser = JsonItemStream()
+        for chunk in self.scheduler.stream_chat(
+            self.client,
+            model=self.llm_model,
+            messages=messages,
+            temperature=self.temperature,
+            **kwargs
+        ):
+            if chunk.usage:
+                usage["prompt_tokens"] += chunk.usage.prompt_tokens
+                usage["completion_tokens"] += chunk.usage.completion_tokens
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for key, value in parser.feed(chunk.choices[0].delta.content):
+                event = self._item_event(key, value)
+                if event:
+                    if "first_item_seconds" not in usage:
+                        usage["first_item_seconds"] = round(time.perf_counter() - start, 3)
+                    on_event(event)
+
+        try:
+            extraction = self._parse(parser.text)
+        except (ValidationError, ValueError) as e:
+            logger.warning(f"Streamed fused extraction failed validation, retrying without streaming: {e}")
+            result = self._request(messages + [
+                {"role": "assistant", "content": parser.text},
+                {"role": "user", "content": f"That reply did not match the schema: {e}. Respond with corrected JSON only."}
+            ], kwargs)
+            for field in ("prompt_tokens", "completion_tokens", "requests"):
+                result["llm_usage"][field] += usage[field]
+            result["llm_usage"]["seconds"] = round(time.perf_counter() - start, 3)
+            return result
+
+        usage["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Fused extraction (streamed): {usage['prompt_tokens']} prompt + {usage['completion_tokens']} "
+            f"completion tokens in {usage['seconds']:.1f}s, first item after {usage.get('first_item_seconds', 0):.1f}s"
+        )
+        result = extraction.model_dump()
+        result["llm_usage"] = usage
+        return result
+
+    def extract(self, transcript: Dict, on_event: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Analyze a formatted transcript in a single request.
+
+        Identical requests are answered from the LLM response cache. With
+        on_event, the reply is streamed and each decision, action item and
+        follow-up is reported as soon as it is complete, as
+        {"type": "item", "section": ..., "item": ...}; the summary comes as
+        {"type": "section", "section": "summary", "value": ...}.
+
+        Args:
+            transcript: Formatted transcript with speaker turns
+            on_event: Called with each item as it streams in
+
+        Returns:
+            Dict with summary, decisions, action_items and follow_ups, plus
+            llm_usage (prompt/completion tokens, requests and seconds)
+
+        Raises:
+            ValueError: If the reply does not match the schema after retries
+        """
+        messages = self.build_messages(transcript)
+        kwargs = {}
+        response_format = self._response_format()
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        key = self.cache.make_key(self.llm_model, {"messages": messages, **kwargs}, self.temperature)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached["llm_usage"] = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "seconds": 0.0, "cached": True}
+            if on_event:
+                # Report cached items the same way as streamed ones
+                values = [("summary", cached.get("summary"))] + [
+                    (section, item) for section in ITEM_MODELS for item in cached.get(section) or []
+                ]
+                for key, value in values:
+                    event = self._item_event(key, value)
+                    if event:
+                        on_event(event)
+            return cached
+
+        if on_event:
+            result = self._request_stream(messages, kwargs, on_event)
+        else:
+            result = self._request(messages, kwargs)
+        self.cache.put(key, result, self.llm_model, self.temperature, result["llm_usage"]["seconds"])
+        return result
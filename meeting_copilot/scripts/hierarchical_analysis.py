@@ -0,0 +1,442 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from scripts.format_transcript import parse_time
+from scripts.fused_extraction import FusedExtractor
+from scripts.llm_backend import cache_scope
+from scripts.transcript_alignment import ALIGNED_SECTIONS, item_text, tokenize
+from scripts.transcription_cache import TranscriptionCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_CACHE_DIR = os.getenv("CHUNK_CACHE_DIR", ".cache/chunks")
+# Transcript tokens per chunk; also bounds every reduce prompt
+CHUNK_TOKENS = int(os.getenv("HIERARCHICAL_CHUNK_TOKENS", "3000"))
+# A silence this long is taken as a topic boundary
+PAUSE_SECONDS = 3.0
+# Tokens allowed for the speaker label of each segment when sizing chunks
+SPEAKER_TOKENS = 8
+# Bump when prompts or the extraction schema change, so cached chunks are redone
+PROMPT_VERSION = 1
+
+REDUCE_PROMPT = """These are summaries of consecutive parts of one meeting, in order.
+Combine them into one well-structured markdown summary of the whole meeting covering the
+main topics, key points raised by each speaker, the overall flow and important context.
+Do not repeat points; do not mention that the input was split into parts."""
+
+
+def split_chunks(
+    segments: List[Dict],
+    count_tokens,
+    max_tokens: int = CHUNK_TOKENS,
+    pause_seconds: float = PAUSE_SECONDS
+) -> List[List[Dict]]:
+    """Split a transcript into chunks at pauses or speaker changes.
+
+    Once a chunk reaches 60% of max_tokens it ends at the next pause of
+    pause_seconds or more; past 85% any speaker change will do, and it is
+    cut hard before exceeding max_tokens. Boundaries depend only on the
+    segments around them, so editing one part of a transcript leaves the
+    other chunks (and their cache entries) unchanged. Speaker labels are
+    sized at a flat SPEAKER_TOKENS, so a rename only moves a boundary when
+    it merges two speakers whose change was one.
+
+    Args:
+        segments: Raw or formatted segments in time order
+        count_tokens: Function returning the token count of a string
+        max_tokens: Maximum transcript tokens per chunk
+        pause_seconds: Minimum silence treated as a topic boundary
+
+    Returns:
+        Lists of consecutive segments
+    """
+    chunks = []
+    current = []
+    tokens = 0
+    previous_end = None
+    for segment in segments:
+        speaker = segment.get("speaker", "UNKNOWN")
+        cost = count_tokens(segment.get("text", "").strip()) + SPEAKER_TOKENS
+        start = parse_time(segment.get("start", segment.get("start_time", 0)))
+        if current:
+            pause = previous_end is not None and start - previous_end >= pause_seconds
+            speaker_change = speaker != current[-1].get("speaker", "UNKNOWN")
+            if (
+                tokens + cost > max_tokens
+                or (tokens >= 0.6 * max_tokens and pause)
+                or (tokens >= 0.85 * max_tokens and speaker_change)
+            ):
+                chunks.append(current)
+                current = []
+                tokens = 0
+        current.append(segment)
+        tokens += cost
+        previous_end = parse_time(segment.get("end", segment.get("end_time", start)))
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def deduplicate_with_sources(
+    items: List[Dict],
+    sources: List[int],
+    threshold: float = 0.6
+) -> Tuple[List[Dict], List[List[int]]]:
+    """Merge items that describe the same thing, keeping track of where each came from.
+
+    Chunks overlap in topic, so the same decision or task is often extracted
+    from two neighbouring chunks. Near-duplicates are merged into the first
+    occurrence, filling in fields it is missing.
+
+    Args:
+        items: Items in transcript order
+        sources: Chunk index each item was extracted from
+        threshold: Word overlap (Jaccard) above which items are merged
+
+    Returns:
+        (merged items, sorted chunk indexes each merged item came from)
+    """
+    kept: List[Tuple[set, Dict, set]] = []
+    for item, source in zip(items, sources):
+        tokens = set(tokenize(item_text(item)))
+        for kept_tokens, kept_item, kept_sources in kept:
+            union = tokens | kept_tokens
+            if union and len(tokens & kept_tokens) / len(union) >= threshold:
+                for field, value in item.items():
+                    if value and not kept_item.get(field):
+                        kept_item[field] = value
+                kept_sources.add(source)
+                break
+        else:
+            kept.append((tokens, dict(item), {source}))
+    return [item for _, item, _ in kept], [sorted(item_sources) for _, _, item_sources in kept]
+
+
+def deduplicate(items: List[Dict], threshold: float = 0.6) -> List[Dict]:
+    """Merge items that describe the same thing (see deduplicate_with_sources)."""
+    return deduplicate_with_sources(items, [0] * len(items), threshold)[0]
+
+
+def rename_speakers(value, renames: Dict[str, str]):
+    """Replace speaker labels throughout an extraction result.
+
+    Args:
+        value: Result, or any part of it (strings, lists, dicts)
+        renames: Old speaker label -> new label
+
+    Returns:
+        A copy with every whole-word occurrence of an old label replaced
+    """
+    pattern = re.compile(r"\b(" + "|".join(re.escape(old) for old in sorted(renames, key=len, reverse=True)) + r")\b")
+
+    def rename(part):
+        if isinstance(part, str):
+            return pattern.sub(lambda match: renames[match.group(1)], part)
+        if isinstance(part, list):
+            return [rename(element) for element in part]
+        if isinstance(part, dict):
+            return {key: rename(element) for key, element in part.items()}
+        return part
+
+    return rename(value) if renames else value
+
+
+def chunk_starts(chunks: List[List[Dict]]) -> List[int]:
+    """Index of the first segment of each chunk."""
+    starts = []
+    position = 0
+    for chunk in chunks:
+        starts.append(position)
+        position += len(chunk)
+    return starts
+
+
+class HierarchicalAnalyzer:
+    def __init__(
+        self,
+        extractor: FusedExtractor,
+        chunk_tokens: int = CHUNK_TOKENS,
+        max_workers: int = 4,
+        cache: Optional[TranscriptionCache] = None,
+        use_cache: bool = True
+    ):
+        """Map-reduce analysis for meetings too long for one prompt.
+
+        The transcript is split into chunks of at most chunk_tokens, each
+        chunk is analyzed with one fused request (in parallel, cached by
+        content hash), and the chunk results are reduced: items are
+        concatenated and deduplicated, and chunk summaries are merged into
+        one, in groups that fit chunk_tokens. No prompt grows with the
+        length of the meeting.
+
+        Args:
+            extractor: Fused extractor used for chunks and summary merging
+            chunk_tokens: Maximum transcript tokens per chunk
+            max_workers: Chunks analyzed concurrently
+            cache: Cache for chunk and merge results (default: CHUNK_CACHE_DIR)
+            use_cache: Set to False to always call the model
+        """
+        self.extractor = extractor
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        if cache is None and use_cache:
+            cache = TranscriptionCache(cache_dir=CHUNK_CACHE_DIR)
+        self.cache = cache if use_cache else None
+
+    def chunk_key(self, chunk: List[Dict]) -> str:
+        """Cache key for a chunk: its content, the model, the prompt version and the backend."""
+        content = json.dumps(
+            [(segment.get("speaker"), segment.get("text", "").strip()) for segment in chunk],
+            ensure_ascii=False
+        )
+        return TranscriptionCache.make_key(
+            hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            kind="chunk",
+            model=self.extractor.llm_model,
+            temperature=self.extractor.temperature,
+            version=PROMPT_VERSION,
+            **cache_scope()
+        )
+
+    def _analyze_chunk(self, chunk: List[Dict]) -> Tuple[Dict, bool]:
+        """Extract one chunk, from the cache if possible.
+
+        Returns:
+            (chunk result, whether it came from the cache)
+        """
+        key = self.chunk_key(chunk)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, True
+
+        start = time.perf_counter()
+        result = self.extractor.extract({
+            "segments": chunk,
+            "speakers": sorted({segment.get("speaker", "UNKNOWN") for segment in chunk})
+        })
+        if self.cache:
+            self.cache.put(key, result, time.perf_counter() - start)
+        return result, False
+
+    def _merge_summaries(self, summaries: List[str], usage: Dict) -> str:
+        """Merge summaries into one, in groups small enough for one prompt."""
+        count_tokens = self.extractor.encoder.count_tokens
+        while len(summaries) > 1:
+            groups = [[]]
+            tokens = 0
+            for summary in summaries:
+                cost = count_tokens(summary)
+                if groups[-1] and tokens + cost > self.chunk_tokens:
+                    groups.append([])
+                    tokens = 0
+                groups[-1].append(summary)
+                tokens += cost
+            if len(groups) == len(summaries):
+                # Summaries too long to pair up; merge two at a time regardless
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                merged = list(executor.map(self._merge_group, groups))
+            summaries = [summary for summary, _ in merged]
+            for _, merge_usage in merged:
+                for field, value in merge_usage.items():
+                    usage[field] += value
+        return summaries[0] if summaries else ""
+
+    def _merge_group(self, summaries: List[str]) -> Tuple[str, Dict]:
+        """Merge one group of summaries with a single request.
+
+        Returns:
+            (merged summary, token usage of the request)
+        """
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+        if len(summaries) == 1:
+            return summaries[0], usage
+        parts = "\n\n".join(f"Part {i + 1}:\n{summary}" for i, summary in enumerate(summaries))
+        key = TranscriptionCache.make_key(
+            hashlib.sha256(parts.encode("utf-8")).hexdigest(),
+            kind="merge",
+            model=self.extractor.llm_model,
+            temperature=self.extractor.temperature,
+            version=PROMPT_VERSION,
+            **cache_scope()
+        )
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached["summary"], usage
+
+        start = time.perf_counter()
+        response = self.extractor.scheduler.chat(
+            self.extractor.client,
+            model=self.extractor.llm_model,
+            messages=[
+                {"role": "system", "content": REDUCE_PROMPT},
+                {"role": "user", "content": parts}
+            ],
+            temperature=self.extractor.temperature
+        )
+        usage["requests"] += 1
+        if response.usage:
+            usage["prompt_tokens"] += response.usage.prompt_tokens
+            usage["completion_tokens"] += response.usage.completion_tokens
+        summary = response.choices[0].message.content or ""
+        if self.cache:
+            self.cache.put(key, {"summary": summary}, time.perf_counter() - start)
+        return summary, usage
+
+    def analyze(self, transcript: Dict) -> Dict:
+        """Analyze a transcript chunk by chunk and reduce the results.
+
+        Args:
+            transcript: Formatted transcript with speaker turns
+
+        Returns:
+            Dict with summary, decisions, action_items and follow_ups, plus
+            llm_usage with token counts and per-chunk details, and provenance:
+            the chunks (cache key and segment range) and, per section, the
+            chunks each item was extracted from
+        """
+        start = time.perf_counter()
+        chunks = split_chunks(
+            transcript.get("segments", []),
+            self.extractor.encoder.count_tokens,
+            self.chunk_tokens
+        )
+        logger.info(f"Analyzing {len(chunks)} transcript chunks of up to {self.chunk_tokens} tokens")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._analyze_chunk, chunks))
+
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "chunks": []}
+        for chunk, (result, cached) in zip(chunks, results):
+            chunk_usage = result.get("llm_usage", {})
+            if not cached:
+                for field in ("prompt_tokens", "completion_tokens", "requests"):
+                    usage[field] += chunk_usage.get(field, 0)
+            usage["chunks"].append({
+                "start": parse_time(chunk[0].get("start", chunk[0].get("start_time", 0))),
+                "end": parse_time(chunk[-1].get("end", chunk[-1].get("end_time", 0))),
+                "segments": len(chunk),
+                "prompt_tokens": chunk_usage.get("prompt_tokens", 0),
+                "cached": cached
+            })
+
+        # Which chunks (transcript spans) every item depends on, for incremental re-analysis
+        provenance = {
+            "chunks": [
+                {
+                    "key": self.chunk_key(chunk),
+                    "first_segment": first,
+                    "segments": len(chunk),
+                    "start": usage["chunks"][index]["start"],
+                    "end": usage["chunks"][index]["end"]
+                }
+                for index, (first, chunk) in enumerate(zip(chunk_starts(chunks), chunks))
+            ]
+        }
+        analysis = {}
+        for section in ALIGNED_SECTIONS:
+            items = []
+            sources = []
+            for index, (result, _) in enumerate(results):
+                for item in result.get(section, []):
+                    items.append(item)
+                    sources.append(index)
+            analysis[section], provenance[section] = deduplicate_with_sources(items, sources)
+        analysis["summary"] = self._merge_summaries(
+            [result.get("summary", "") for result, _ in results if result.get("summary")],
+            usage
+        )
+
+        usage["seconds"] = round(time.perf_counter() - start, 3)
+        cached = sum(1 for chunk in usage["chunks"] if chunk["cached"])
+        logger.info(
+            f"Hierarchical analysis: {len(chunks)} chunks ({cached} cached), "
+            f"{usage['requests']} requests, {usage['prompt_tokens']} prompt tokens in {usage['seconds']:.1f}s"
+        )
+        analysis["llm_usage"] = usage
+        analysis["provenance"] = provenance
+        return analysis
+
+    def prefetch(self, transcript: Dict) -> int:
+        """Extract the finished chunks of a transcript that is still growing.
+
+        Appending segments can only change the last chunk, as each boundary
+        depends on the segments before it. Every other chunk is extracted
+        now and cached, so analyze() on the complete transcript is left with
+        the last chunk and the summary merge.
+
+        Args:
+            transcript: Formatted transcript so far
+
+        Returns:
+            Number of chunks extracted (not already cached)
+        """
+        if not self.cache:
+            return 0
+        chunks = split_chunks(
+            transcript.get("segments", []),
+            self.extractor.encoder.count_tokens,
+            self.chunk_tokens
+        )[:-1]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._analyze_chunk, chunks))
+        extracted = sum(1 for _, cached in results if not cached)
+        if extracted:
+            logger.info(f"Extracted {extracted} finished transcript chunks ahead of the analysis")
+        return extracted
+
+    def relabel_speakers(self, transcript: Dict, renames: Dict[str, str]) -> int:
+        """Carry cached chunk results over a speaker rename.
+
+        Renaming a speaker changes the content of every chunk they speak in.
+        Instead of extracting those chunks again, the cached results of the
+        chunks before the rename are stored for the renamed chunks with the
+        labels replaced. The renamed transcript is split again, and only
+        chunks covering the same segments as before are carried over; a
+        rename that merges two speakers can move a boundary, and the chunks
+        around it are extracted afresh.
+
+        Args:
+            transcript: Transcript before the rename
+            renames: Old speaker label -> new label
+
+        Returns:
+            Number of chunk results carried over
+        """
+        if not self.cache or not renames:
+            return 0
+        segments = transcript.get("segments", [])
+        count_tokens = self.extractor.encoder.count_tokens
+        previous = {}
+        start = 0
+        for chunk in split_chunks(segments, count_tokens, self.chunk_tokens):
+            previous[(start, len(chunk))] = chunk
+            start += len(chunk)
+
+        renamed_segments = [
+            {**segment, "speaker": renames.get(segment.get("speaker", "UNKNOWN"), segment.get("speaker", "UNKNOWN"))}
+            for segment in segments
+        ]
+        chunks = split_chunks(renamed_segments, count_tokens, self.chunk_tokens)
+        carried = 0
+        start = 0
+        for renamed in chunks:
+            chunk = previous.get((start, len(renamed)))
+            start += len(renamed)
+            if chunk is None or renamed == chunk:
+                continue
+            cached = self.cache.get(self.chunk_key(chunk))
+            if cached is not None:
+                self.cache.put(self.chunk_key(renamed), rename_speakers(cached, renames), 0.0)
+                carried += 1
+        logger.info(f"Carried {carried} of {len(chunks)} chunk results over the speaker rename")
+        return carried
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import socket
+import logging
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Calibrated settings are stored per host in this directory
+PROFILE_DIR = os.getenv("INFERENCE_PROFILE_DIR", "profiles")
+
+CPU_COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+CALIBRATION_BATCH_SIZES = (1, 4, 8, 16)
+
+
+def default_settings(device: str) -> Dict:
+    """Inference settings used when no calibrated profile exists.
+
+    Args:
+        device: Device to run inference on (cuda/cpu)
+
+    Returns:
+        Dict with compute_type, batch_size and cpu_threads
+    """
+    if device.startswith("cuda"):
+        return {"compute_type": "float16", "batch_size": 16, "cpu_threads": None}
+    return {"compute_type": "int8", "batch_size": 16, "cpu_threads": os.cpu_count() or 4}
+
+
+def profile_path(host: Optional[str] = None) -> Path:
+    """Get the profile file of a host (defaults to this machine)."""
+    return Path(PROFILE_DIR) / f"{host or socket.gethostname()}.json"
+
+
+def load_profile(model_name: str, device: str, host: Optional[str] = None) -> Optional[Dict]:
+    """Load the calibrated settings for a model on this host.
+
+    Args:
+        model_name: Whisper model the settings were calibrated for
+        device: Device the settings were calibrated on
+        host: Host name (defaults to this machine)
+
+    Returns:
+        Calibrated settings, or None if the host was never calibrated
+    """
+    path = profile_path(host)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        profiles = json.load(f).get("profiles", {})
+    return profiles.get(f"{device}/{model_name}")
+
+
+def save_profile(settings: Dict, model_name: str, device: str, host: Optional[str] = None) -> str:
+    """Save calibrated settings for a model on this host.
+
+    Args:
+        settings: Settings chosen by calibration
+        model_name: Whisper model the settings were calibrated for
+        device: Device the settings were calibrated on
+        host: Host name (defaults to this machine)
+
+    Returns:
+        Path to the profile file
+    """
+    path = profile_path(host)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"host": host or socket.gethostname(), "profiles": {}}
+    if path.exists():
+        with open(path) as f:
+            data = json.load(f)
+    data["profiles"][f"{device}/{model_name}"] = settings
+
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+    return str(path)
+
+
+def resolve_settings(
+    model_name: str,
+    device: str,
+    compute_type: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    cpu_threads: Optional[int] = None
+) -> Dict:
+    """Combine explicit settings with this host's profile and the defaults.
+
+    Explicit arguments win over the calibrated profile, which wins over the
+    defaults for the device.
+
+    Returns:
+        Dict with compute_type, batch_size and cpu_threads
+    """
+    settings = default_settings(device)
+    profile = load_profile(model_name, device)
+    if profile:
+        logger.info(f"Using calibrated inference profile for {device}/{model_name}")
+        settings.update({key: profile[key] for key in settings if key in profile})
+    explicit = {"compute_type": compute_type, "batch_size": batch_size, "cpu_threads": cpu_threads}
+    settings.update({key: value for key, value in explicit.items() if value is not None})
+    return settings
+
+
+def _measure(
+    sample_path: str,
+    model_name: str,
+    device: str,
+    compute_type: str,
+    batch_size: int,
+    cpu_threads: int
+) -> Dict:
+    """Time one configuration; runs in a fresh process so peak RSS is its own."""
+    import torch
+    import whisperx
+    from scripts.audio_io import SAMPLE_RATE, decode_audio
+
+    torch.set_num_threads(cpu_threads)
+    model = whisperx.load_model(
+        model_name,
+        device,
+        compute_type=compute_type,
+        language="en",
+        threads=cpu_threads
+    )
+    audio = decode_audio(sample_path)
+
+    # Warm up on a short slice so one-off initialization is not timed
+    model.transcribe(audio[:SAMPLE_RATE * 30], batch_size=batch_size, language="en")
+
+    start = time.perf_counter()
+    model.transcribe(audio, batch_size=batch_size, language="en")
+    seconds = time.perf_counter() - start
+
+    duration = len(audio) / SAMPLE_RATE
+    return {
+        "compute_type": compute_type,
+        "batch_size": batch_size,
+        "cpu_threads": cpu_threads,
+        "seconds": round(seconds, 2),
+        "rtf": round(seconds / duration, 4),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def calibrate(
+    sample_path: str,
+    model_name: str = "large-v2",
+    device: str = "cpu",
+    compute_types: Sequence[str] = CPU_COMPUTE_TYPES,
+    batch_sizes: Sequence[int] = CALIBRATION_BATCH_SIZES,
+    cpu_threads: Optional[int] = None,
+    max_rss_mb: Optional[float] = None
+) -> Dict:
+    """Measure real-time factor and peak RSS across settings on a sample clip.
+
+    Every configuration runs in its own process. The configuration with the
+    lowest real-time factor that stays within max_rss_mb is chosen.
+
+    Args:
+        sample_path: Representative audio clip (a few minutes is enough)
+        model_name: Whisper model to calibrate
+        device: Device to calibrate on
+        compute_types: Compute types to try
+        batch_sizes: Batch sizes to try
+        cpu_threads: Threads per process (defaults to all cores)
+        max_rss_mb: Memory ceiling a configuration must stay under
+
+    Returns:
+        Chosen settings along with all measurements
+    """
+    cpu_threads = cpu_threads or os.cpu_count() or 4
+    measurements: List[Dict] = []
+    context = multiprocessing.get_context("spawn")
+
+    for compute_type in compute_types:
+        for batch_size in batch_sizes:
+            logger.info(f"Calibrating compute_type={compute_type} batch_size={batch_size}")
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    measurement = pool.submit(
+                        _measure,
+                        sample_path,
+                        model_name,
+                        device,
+                        compute_type,
+                        batch_size,
+                        cpu_threads
+                    ).result()
+            except Exception as e:
+                logger.warning(f"Configuration failed: {e}")
+                continue
+            logger.info(f"  RTF {measurement['rtf']}, peak RSS {measurement['peak_rss_mb']} MB")
+            measurements.append(measurement)
+
+    candidates = [
+        m for m in measurements
+        if max_rss_mb is None or m["peak_rss_mb"] <= max_rss_mb
+    ]
+    if not candidates:
+        raise RuntimeError("No configuration completed within the memory limit")
+
+    best = min(candidates, key=lambda m: m["rtf"])
+    return {
+        "compute_type": best["compute_type"],
+        "batch_size": best["batch_size"],
+        "cpu_threads": best["cpu_threads"],
+        "rtf": best["rtf"],
+        "peak_rss_mb": best["peak_rss_mb"],
+        "calibrated_at": datetime.now().isoformat(),
+        "sample": os.path.basename(sample_path),
+        "measurements": measurements
+    }
+
+
+def main():
+    """Calibrate or inspect inference profiles for this host."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage Whisper inference profiles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="Measure settings on a sample clip")
+    calibrate_parser.add_argument("sample", help="Path to a representative audio clip")
+    calibrate_parser.add_argument("--model", default="large-v2", help="Whisper model to calibrate")
+    calibrate_parser.add_argument("--device", default="cpu", help="Device to calibrate on")
+    calibrate_parser.add_argument("--threads", type=int, help="CPU threads (default: all cores)")
+    calibrate_parser.add_argument("--max-rss-mb", type=float, help="Memory ceiling per process")
+    calibrate_parser.add_argument(
+        "--batch-sizes",
+        default=",".join(str(b) for b in CALIBRATION_BATCH_SIZES),
+        help="Comma-separated batch sizes to try"
+    )
+    calibrate_parser.add_argument(
+        "--compute-types",
+        default=",".join(CPU_COMPUTE_TYPES),
+        help="Comma-separated compute types to try"
+    )
+
+    show_parser = subparsers.add_parser("show", help="Print the profile of this host")
+    show_parser.add_argument("--model", default="large-v2", help="Whisper model")
+    show_parser.add_argument("--device", default="cpu", help="Device")
+
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        settings = calibrate(
+            args.sample,
+            model_name=args.model,
+            device=args.device,
+            compute_types=args.compute_types.split(","),
+            batch_sizes=[int(b) for b in args.batch_sizes.split(",")],
+            cpu_threads=args.threads,
+            max_rss_mb=args.max_rss_mb
+        )
+        path = save_profile(settings, args.model, args.device)
+        print(f"\nBest settings: compute_type={settings['compute_type']} "
+              f"batch_size={settings['batch_size']} cpu_threads={settings['cpu_threads']} "
+              f"(RTF {settings['rtf']}, peak RSS {settings['peak_rss_mb']} MB)")
+        print(f"Profile saved to: {path}")
+    else:
+        print(json.dumps(resolve_settings(args.model, args.device), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import logging
+from typing import List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _Frame:
+    __slots__ = ("kind", "emit", "key", "expect_key")
+
+    def __init__(self, kind: str, emit: bool, key: Optional[str] = None):
+        self.kind = kind
+        # Whether the values directly inside this container are emitted
+        self.emit = emit
+        self.key = key
+        self.expect_key = kind == "{"
+
+
+class JsonItemStream:
+    def __init__(self):
+        """Incremental parser emitting the parts of a JSON document as they complete.
+
+        Text is fed in arbitrary pieces, as it streams from a model. For a
+        top-level object, the items of each array value are emitted one by
+        one as soon as they close, and other values once complete; for a
+        top-level array, each element is emitted. Anything before the
+        document (such as a markdown code fence) is skipped.
+
+        Example:
+            '{"summary": "...", "decisions": [{...}, {...}]}' emits
+            ("summary", "..."), ("decisions", {...}), ("decisions", {...})
+        """
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._value_depth = 0
+        self._primitive = False
+        self.done = False
+
+    def _emit(self, events: List[Tuple[Optional[str], object]], end: int):
+        frame = self._stack[self._value_depth - 1]
+        key = frame.key if frame.kind == "[" else self._key
+        text = self._buffer[self._value_start:end]
+        self._value_start = None
+        self._primitive = False
+        try:
+            events.append((key, json.loads(text)))
+        except ValueError:
+            logger.warning(f"Skipping malformed JSON value under {key!r}: {text[:80]}")
+
+    def feed(self, text: str) -> List[Tuple[Optional[str], object]]:
+        """Add text and return the values completed by it.
+
+        Args:
+            text: Next piece of the document
+
+        Returns:
+            (key, value) pairs in document order; key is the top-level key
+            the value belongs to, or None for elements of a top-level array
+        """
+        self._buffer += text
+        events = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buffer[self._key_start:i + 1])
+                        self._key_start = None
+                    elif self._value_start is not None and len(self._stack) == self._value_depth:
+                        self._emit(events, i + 1)
+                continue
+
+            if not self._stack:
+                if not self.done and c in "{[":
+                    self._stack.append(_Frame(c, emit=True))
+                continue
+
+            top = self._stack[-1]
+            if self._primitive and (c in ",]}" or c.isspace()):
+                self._emit(events, i)
+            if c == '"':
+                self._in_string = True
+                if top.kind == "{" and top.expect_key:
+                    top.expect_key = False
+                    if len(self._stack) == 1:
+                        self._key_start = i
+                elif top.emit and self._value_start is None:
+                    self._value_start = i
+                    self._value_depth = len(self._stack)
+            elif c in "{[":
+                if top.emit and self._value_start is None:
+                    if len(self._stack) == 1 and top.kind == "{" and c == "[":
+                        # An array under a top-level key: emit its items instead
+                        self._stack.append(_Frame(c, emit=True, key=self._key))
+                        continue
+                    self._value_start = i
+                    self._value_depth = len(self._stack)
+                self._stack.append(_Frame(c, emit=False))
+            elif c in "}]":
+                self._stack.pop()
+                if self._value_start is not None and len(self._stack) == self._value_depth:
+                    self._emit(events, i + 1)
+                if not self._stack:
+                    self.done = True
+            elif c == ",":
+                if top.kind == "{":
+                    top.expect_key = True
+            elif c != ":" and not c.isspace():
+                # Start of a number, true, false or null
+                if top.emit and self._value_start is None:
+                    self._value_start = i
+                    self._value_depth = len(self._stack)
+                    self._primitive = True
+        self._pos = len(buffer)
+        return events
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buffer
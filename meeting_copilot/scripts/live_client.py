@@ -0,0 +1,80 @@
+import json
+import time
+import asyncio
+import logging
+
+import websockets
+
+from scripts.audio_io import SAMPLE_RATE, decode_audio
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def replay(audio_path: str, url: str, frame_ms: int = 100, speed: float = 1.0):
+    """Stream an audio file to the live endpoint at real-time speed.
+
+    Args:
+        audio_path: Audio file to replay
+        url: WebSocket URL of the /ws/live endpoint
+        frame_ms: Length of each PCM frame sent
+        speed: Playback speed (1.0 is real time)
+    """
+    audio = decode_audio(audio_path)
+    pcm = (audio * 32767).astype("<i2").tobytes()
+    frame_bytes = int(SAMPLE_RATE * frame_ms / 1000) * 2
+
+    async with websockets.connect(url, max_size=None) as websocket:
+        start = time.perf_counter()
+        ended_at = None
+
+        async def send_audio():
+            nonlocal ended_at
+            for i, offset in enumerate(range(0, len(pcm), frame_bytes)):
+                await websocket.send(pcm[offset:offset + frame_bytes])
+                # Pace frames against the wall clock so delays do not accumulate
+                due = start + (i + 1) * frame_ms / 1000 / speed
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await websocket.send("end")
+            ended_at = time.perf_counter()
+            logger.info(f"Stream ended after {ended_at - start:.1f}s")
+
+        async def receive():
+            async for message in websocket:
+                event = json.loads(message)
+                now = time.perf_counter()
+                if event["type"] == "segment":
+                    segment = event["segment"]
+                    # How far the segment trails the audio position it describes
+                    audio_position = min((now - start) * speed, len(audio) / SAMPLE_RATE)
+                    lag = audio_position - segment["end"]
+                    print(f"[{segment['start_time']}] {segment['speaker']}: {segment['text']}  (lag {lag:.1f}s)")
+                elif event["type"] == "analysis":
+                    print(f"\nAnalysis received {now - (ended_at or now):.1f}s after the stream closed")
+                    print(json.dumps(event["analysis"], indent=2))
+                    return
+                elif event["type"] == "error":
+                    logger.error(f"Server error: {event['message']}")
+                    return
+                else:
+                    logger.info(f"{event['type']}: {event.get('meeting_id', '')}")
+
+        await asyncio.gather(send_audio(), receive())
+
+
+def main():
+    """Replay a recording to the live transcription endpoint."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay an audio file to /ws/live")
+    parser.add_argument("audio_file", help="Audio file to replay (WAV or anything ffmpeg reads)")
+    parser.add_argument("--url", default="ws://localhost:8000/ws/live", help="Live endpoint URL")
+    parser.add_argument("--frame-ms", type=int, default=100, help="Frame length in milliseconds")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed")
+
+    args = parser.parse_args()
+    asyncio.run(replay(args.audio_file, args.url, args.frame_ms, args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import logging
+import threading
+from typing import Dict, List
+
+import numpy as np
+import whisperx
+
+from scripts.audio_io import SAMPLE_RATE
+from scripts.whisper_transcribe import SpeakerTracker, WhisperTranscriber, build_transcription, shift_segment
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LiveTranscriptionSession:
+    def __init__(
+        self,
+        transcriber: WhisperTranscriber,
+        step_seconds: float = 3.0,
+        holdback_seconds: float = 2.0,
+        max_window_seconds: float = 30.0,
+        context_seconds: float = 30.0
+    ):
+        """Transcribe audio that is still being recorded.
+
+        Incoming audio is re-transcribed over a rolling window every
+        step_seconds. Segments that end more than holdback_seconds before the
+        end of the window are final: they are diarized (with the previous
+        audio as context so speaker labels stay stable), returned, and their
+        audio is dropped from the window.
+
+        Args:
+            transcriber: Transcriber whose models are reused for every step
+            step_seconds: New audio needed before the window is re-transcribed
+            holdback_seconds: Trailing audio whose segments are not finalized yet
+            max_window_seconds: Window length at which segments are finalized
+                even without a pause
+            context_seconds: Previous audio diarized along with each chunk
+        """
+        self.transcriber = transcriber
+        self.step_seconds = step_seconds
+        self.holdback_seconds = holdback_seconds
+        self.max_window_seconds = max_window_seconds
+        self.context_len = int(context_seconds * SAMPLE_RATE)
+        self.tracker = SpeakerTracker(context_seconds)
+
+        self.window = np.zeros(0, dtype=np.float32)
+        self.window_start = 0.0
+        self.context = np.zeros(0, dtype=np.float32)
+        self.segments: List[Dict] = []
+
+        self._incoming = []
+        self._incoming_samples = 0
+        self._lock = threading.Lock()
+
+    def feed(self, samples: np.ndarray):
+        """Queue newly received audio; cheap enough to call per frame."""
+        with self._lock:
+            self._incoming.append(samples)
+            self._incoming_samples += len(samples)
+
+    def ready(self) -> bool:
+        """Whether enough new audio has arrived for another step."""
+        with self._lock:
+            return self._incoming_samples >= self.step_seconds * SAMPLE_RATE
+
+    def process(self) -> List[Dict]:
+        """Re-transcribe the window and return newly finalized segments."""
+        return self._step(final=False)
+
+    def finish(self) -> List[Dict]:
+        """Finalize everything left in the window once the stream has ended."""
+        return self._step(final=True)
+
+    def transcription(self) -> Dict:
+        """Transcription of everything finalized so far."""
+        return build_transcription(self.segments)
+
+    def _step(self, final: bool) -> List[Dict]:
+        with self._lock:
+            if self._incoming:
+                self.window = np.concatenate([self.window] + self._incoming)
+                self._incoming = []
+                self._incoming_samples = 0
+        if not len(self.window):
+            return []
+
+        duration = len(self.window) / SAMPLE_RATE
+        segments = self.transcriber.recognize(self.window)["segments"]
+
+        if final:
+            done = segments
+        else:
+            # The last segment may still be growing, so it is never final
+            done = [s for s in segments[:-1] if s["end"] <= duration - self.holdback_seconds]
+            if not done and duration >= self.max_window_seconds:
+                done = segments[:-1] or segments
+
+        if not done:
+            if not segments and duration >= self.max_window_seconds:
+                # Nothing but silence; keep only the tail in case speech starts there
+                self._advance(len(self.window) - int(self.holdback_seconds * SAMPLE_RATE))
+            return []
+
+        cut = len(self.window) if final else min(int(done[-1]["end"] * SAMPLE_RATE), len(self.window))
+        done = self._diarize(done, cut)
+        self._advance(cut)
+        self.segments.extend(done)
+        return done
+
+    def _diarize(self, segments: List[Dict], cut: int) -> List[Dict]:
+        """Label finalized segments with stable speakers and absolute times."""
+        shift = len(self.context) / SAMPLE_RATE
+        try:
+            diarize_segments = self.transcriber.diarize(
+                np.concatenate([self.context, self.window[:cut]])
+            )
+            diarize_segments = self.tracker.relabel(
+                diarize_segments,
+                self.window_start - shift,
+                self.window_start
+            )
+            diarize_segments["start"] -= shift
+            diarize_segments["end"] -= shift
+            segments = whisperx.assign_word_speakers(
+                diarize_segments,
+                {"segments": segments}
+            )["segments"]
+        except Exception as e:
+            logger.warning(f"Diarization failed for live chunk: {e}")
+        return [shift_segment(segment, self.window_start) for segment in segments]
+
+    def _advance(self, cut: int):
+        """Drop the first cut samples of the window, keeping them as context."""
+        cut = max(cut, 0)
+        self.context = np.concatenate([self.context, self.window[:cut]])[-self.context_len:]
+        self.window = self.window[cut:]
+        self.window_start += cut / SAMPLE_RATE
@@ -0,0 +1,203 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from openai import OpenAI
+from openai.types import CreateEmbeddingResponse
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# openai, stub, record or replay
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+BACKENDS = ("openai", "stub", "record", "replay")
+STUB_LLM_URL = os.getenv("STUB_LLM_URL", "http://127.0.0.1:8001/v1")
+LLM_FIXTURES_DIR = os.getenv("LLM_FIXTURES_DIR", "fixtures/llm")
+
+RESPONSE_TYPES = {"chat": ChatCompletion, "embeddings": CreateEmbeddingResponse}
+
+
+class _Endpoint:
+    def __init__(self, client: "RecordReplayClient", kind: str, create: Optional[Callable]):
+        self._client = client
+        self._kind = kind
+        self._create = create
+
+    def create(self, **kwargs):
+        return self._client.request(self._kind, self._create, kwargs)
+
+
+class _Chat:
+    def __init__(self, completions: _Endpoint):
+        self.completions = completions
+
+
+class RecordReplayClient:
+    def __init__(self, mode: str, fixtures_dir: str = LLM_FIXTURES_DIR, client: Optional[OpenAI] = None):
+        """OpenAI-compatible client that records responses to fixtures or replays them.
+
+        Each request is stored as one JSON file named by the hash of its
+        parameters, holding the request and the response. Replay never
+        touches the network and fails on requests that were not recorded.
+
+        Args:
+            mode: "record" to call client and save responses, "replay" to serve saved ones
+            fixtures_dir: Directory of fixture files
+            client: Client used for recording (default: OpenAI from OPENAI_API_KEY)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        self.mode = mode
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        if mode == "record" and client is None:
+            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.client = client
+        self.chat = _Chat(_Endpoint(self, "chat", client.chat.completions.create if client else None))
+        self.embeddings = _Endpoint(self, "embeddings", client.embeddings.create if client else None)
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+
+    @staticmethod
+    def fixture_key(kind: str, kwargs: Dict) -> str:
+        """Name of the fixture for a request."""
+        payload = json.dumps({"kind": kind, **kwargs}, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{kind}_{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}"
+
+    def request(self, kind: str, create: Optional[Callable], kwargs: Dict):
+        """Serve a request from its fixture, or make it and save the fixture."""
+        path = self.fixtures_dir / f"{self.fixture_key(kind, kwargs)}.json"
+        if self.mode == "replay":
+            if not path.exists():
+                raise LookupError(
+                    f"No recorded {kind} response for this request ({path.name}); "
+                    f"run with LLM_BACKEND=record to capture it"
+                )
+            with open(path) as f:
+                fixture = json.load(f)
+            with self._lock:
+                self.replayed += 1
+            if kwargs.get("stream"):
+                return iter([ChatCompletionChunk.model_validate(chunk) for chunk in fixture["response"]])
+            return RESPONSE_TYPES[kind].model_validate(fixture["response"])
+
+        response = create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(path, kwargs, response)
+        self._save(path, kwargs, response.model_dump())
+        return response
+
+    def _record_stream(self, path: Path, kwargs: Dict, response):
+        """Pass a streamed response through, saving its chunks once it is complete."""
+        chunks = []
+        for chunk in response:
+            chunks.append(chunk.model_dump())
+            yield chunk
+        self._save(path, kwargs, chunks)
+
+    def _save(self, path: Path, kwargs: Dict, response):
+        # Write then rename, so a concurrent replay never reads half a file
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"request": kwargs, "response": response}, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.recorded += 1
+
+    def stats(self) -> Dict:
+        """Report how many responses were recorded and replayed."""
+        with self._lock:
+            return {"mode": self.mode, "recorded": self.recorded, "replayed": self.replayed}
+
+
+def create_client(backend: str = LLM_BACKEND, fixtures_dir: str = LLM_FIXTURES_DIR):
+    """Create an OpenAI-compatible client for a backend.
+
+    Clients do not retry on their own; the LLM scheduler does.
+
+    Args:
+        backend: "openai", "stub" (local server from scripts.stub_llm_server
+            at STUB_LLM_URL), "record" or "replay"
+        fixtures_dir: Fixture directory for record and replay
+
+    Returns:
+        Client with chat.completions.create and embeddings.create
+    """
+    if backend == "openai":
+        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    if backend == "stub":
+        return OpenAI(api_key="stub", base_url=STUB_LLM_URL, max_retries=0)
+    if backend in ("record", "replay"):
+        return RecordReplayClient(backend, fixtures_dir)
+    raise ValueError(f"Unknown LLM backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide client for the LLM_BACKEND backend."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_client()
+            logger.info(f"Using the {LLM_BACKEND} LLM backend")
+        return _client
+
+
+def cache_scope(backend: str = LLM_BACKEND) -> Dict:
+    """Cache key fields that keep responses of different backends apart.
+
+    Stub and replay responses are fake, so they must never be served to an
+    openai run. Empty for openai, so keys of existing caches stay valid.
+
+    Args:
+        backend: LLM backend the responses come from
+
+    Returns:
+        Fields to add to every LLM cache key
+    """
+    return {} if backend == "openai" else {"backend": backend}
+
+
+def backend_stats() -> Dict:
+    """Report the backend in use, with record/replay counts where relevant."""
+    stats = {"backend": LLM_BACKEND}
+    if isinstance(_client, RecordReplayClient):
+        stats.update(_client.stats())
+    return stats
+
+
+def run_agent_task(agent, task, llm_model: str):
+    """Execute a crewai agent task.
+
+    crewai makes its model requests itself, so with the openai backend the
+    task runs through crewai. Other backends cannot be plugged into crewai;
+    there the task is sent as one chat request built from the agent's role
+    and the task, so offline runs exercise the same prompts.
+
+    Args:
+        agent: crewai Agent
+        task: Task created by the agent
+        llm_model: Chat model to use
+
+    Returns:
+        The agent's output
+    """
+    if LLM_BACKEND == "openai":
+        return agent.execute_task(task)
+    response = get_llm_client().chat.completions.create(
+        model=llm_model,
+        messages=[
+            {"role": "system", "content": f"You are a {agent.role}. {agent.goal}\n{agent.backstory}"},
+            {"role": "user", "content": f"{task.description}\n\nExpected output: {task.expected_output}"}
+        ]
+    )
+    return response.choices[0].message.content
@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from scripts.llm_backend import LLM_BACKEND, cache_scope
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.db")
+DEFAULT_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+DEFAULT_MAX_SIZE_MB = int(os.getenv("LLM_CACHE_MB", "256"))
+# Skip cache lookups (responses are still stored, refreshing stale entries)
+BYPASS = os.getenv("LLM_CACHE_BYPASS", "false").lower() in ("1", "true", "yes")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    temperature REAL,
+    created REAL,
+    accessed REAL,
+    compute_seconds REAL,
+    size INTEGER,
+    hits INTEGER DEFAULT 0,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        max_size_mb: int = DEFAULT_MAX_SIZE_MB,
+        bypass: bool = BYPASS
+    ):
+        """Initialize the on-disk cache of LLM responses.
+
+        Responses are keyed on model, a hash of the prompt and temperature,
+        and on the LLM backend unless it is openai.
+        Entries expire after ttl_hours, and the least recently used ones are
+        evicted when the cache grows beyond max_size_mb.
+
+        Args:
+            path: SQLite database file
+            ttl_hours: Hours a response stays valid (0 disables expiry)
+            max_size_mb: Maximum total size of cached responses in MB
+            bypass: Always call the model; fresh responses still replace cached ones
+        """
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.bypass = bypass
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bypassed = 0
+        self.saved_seconds = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(model: str, prompt, temperature: Optional[float] = None, backend: str = LLM_BACKEND) -> str:
+        """Build a cache key.
+
+        Args:
+            model: Model name
+            prompt: Prompt text, chat messages, or anything else JSON-serializable
+                that fully determines the request
+            temperature: Sampling temperature (None for the provider default)
+            backend: LLM backend answering the request
+
+        Returns:
+            Cache key
+        """
+        prompt_hash = hashlib.sha256(
+            json.dumps(prompt, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        payload = json.dumps(
+            {"model": model, "prompt": prompt_hash, "temperature": temperature, **cache_scope(backend)},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str):
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        if self.bypass:
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value, created, compute_seconds FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                with conn:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                with self._lock:
+                    self.expired += 1
+                row = None
+            if row:
+                with conn:
+                    conn.execute("UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += row[2] or 0.0
+        return json.loads(row[0])
+
+    def put(self, key: str, value, model: str, temperature: Optional[float], compute_seconds: float):
+        """Store a response and evict entries over the size limit.
+
+        Args:
+            key: Cache key from make_key
+            value: JSON-serializable response
+            model: Model name, kept for inspection
+            temperature: Sampling temperature, kept for inspection
+            compute_seconds: Time the request took
+        """
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                    (key, model, temperature, now, now, compute_seconds, len(data), data)
+                )
+            self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries, then least recently used ones over the size limit."""
+        with conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_size_bytes:
+                return
+            evicted = 0
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                if total <= self.max_size_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        logger.info(f"Evicted {evicted} LLM responses over the {self.max_size_bytes // (1024 * 1024)} MB limit")
+
+    def cached_call(self, model: str, prompt, temperature: Optional[float], call: Callable[[], object]):
+        """Return the cached response for a request, or make it and cache it.
+
+        Args:
+            model: Model name
+            prompt: Everything that determines the response besides model and temperature
+            temperature: Sampling temperature
+            call: Makes the request and returns a JSON-serializable response
+
+        Returns:
+            The response
+        """
+        key = self.make_key(model, prompt, temperature)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        value = call()
+        self.put(key, value, model, temperature, time.perf_counter() - start)
+        return value
+
+    def clear(self):
+        """Remove all cached responses."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM responses")
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """Report hit rate, time saved and cache size."""
+        conn = self._connect()
+        try:
+            entries, size, stored_hits, reused = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0), "
+                "COALESCE(SUM(hits > 0), 0) FROM responses"
+            ).fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 1),
+                "entries": entries,
+                "size_mb": round(size / (1024 * 1024), 2),
+                # Across processes, for cached entries still present
+                "stored_hits": stored_hits,
+                "reused_entries": reused
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+def main():
+    """Inspect or clear the LLM response cache."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LLM response cache")
+    parser.add_argument("action", choices=["stats", "clear"], help="Show cache size or remove all entries")
+    parser.add_argument("--path", default=DEFAULT_CACHE_PATH, help="Cache database path")
+
+    args = parser.parse_args()
+    cache = LLMResponseCache(args.path)
+
+    if args.action == "clear":
+        cache.clear()
+        print(f"Cleared {args.path}")
+    else:
+        stats = cache.stats()
+        print(f"{stats['entries']} cached responses, {stats['size_mb']} MB in {args.path}")
+        print(f"{stats['reused_entries']} entries served {stats['stored_hits']} hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+import os
+import time
+import heapq
+import random
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import openai
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Priority classes; lower runs first
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "300000"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+
+# Priority of calls that do not pass one explicitly
+_current_priority = contextvars.ContextVar("llm_priority", default=BULK)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """Token bucket refilled continuously at per_minute.
+
+        Not thread-safe on its own; LLMScheduler guards it with its lock.
+
+        Args:
+            per_minute: Refill rate per minute
+            capacity: Maximum burst (default: ten seconds' worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or max(per_minute / 6, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount can be taken (0 if it can be taken now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        """Take amount; the level may go negative when correcting estimates."""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+def retry_delay(error: Exception) -> Optional[float]:
+    """Server-requested delay for a retryable error, 0 if none given, None if not retryable."""
+    if isinstance(error, (openai.APIConnectionError, ConnectionError, TimeoutError)):
+        return 0.0
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status != 429 and not (isinstance(status, int) and status >= 500):
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        """Shared gate for all LLM requests of the process.
+
+        A request starts only when the request and token buckets have room
+        and fewer than max_concurrency requests are in flight. Waiting
+        requests start in priority order (INTERACTIVE before BULK, then
+        first come first served). Rate-limit (429), server (5xx) and
+        connection errors are retried with full-jitter exponential backoff,
+        honouring Retry-After.
+
+        Args:
+            requests_per_minute: Request rate limit
+            tokens_per_minute: Token rate limit (prompt + completion)
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries per request before giving up
+            base_delay: First backoff ceiling in seconds
+            max_delay: Largest backoff ceiling in seconds
+        """
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._active = 0
+        # Set when the API answers 429, so that no request starts before it allows
+        self._paused_until = 0.0
+        self.metrics = {
+            name: {"completed": 0, "failed": 0, "retries": 0, "queued_seconds": 0.0, "max_queued_seconds": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self.tokens_used = 0
+
+    @contextmanager
+    def priority(self, priority: int):
+        """Run the calls made inside the block with the given priority."""
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    def _acquire(self, priority: int, tokens: int) -> float:
+        """Wait for a slot. Returns the seconds spent waiting."""
+        start = time.monotonic()
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] == entry and self._active < self.max_concurrency:
+                        delay = max(
+                            self.request_bucket.delay(1),
+                            self.token_bucket.delay(tokens),
+                            self._paused_until - time.monotonic()
+                        )
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                heapq.heappop(self._waiting)
+                self.request_bucket.take(1)
+                self.token_bucket.take(tokens)
+                self._active += 1
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                raise
+            finally:
+                self._cond.notify_all()
+        return time.monotonic() - start
+
+    def _release(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Free the slot and correct the token bucket with the actual usage."""
+        with self._cond:
+            self._active -= 1
+            if used_tokens is not None:
+                self.token_bucket.take(used_tokens - estimated_tokens)
+                self.tokens_used += used_tokens
+            else:
+                self.tokens_used += estimated_tokens
+            self._cond.notify_all()
+
+    def run(
+        self,
+        call: Callable[[], object],
+        priority: Optional[int] = None,
+        tokens: int = 1,
+        used_tokens: Optional[Callable[[object], Optional[int]]] = None,
+        hold: bool = False
+    ):
+        """Run an LLM request under the rate limits, retrying transient errors.
+
+        Args:
+            call: Makes the request
+            priority: INTERACTIVE or BULK (default: the priority() block in effect)
+            tokens: Estimated tokens the request will use
+            used_tokens: Extracts the actual token count from the result
+            hold: Keep the request's slot after call returns (for streamed
+                responses); the caller must release it
+
+        Returns:
+            Result of call
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        metrics = self.metrics[PRIORITY_NAMES[priority]]
+        for attempt in range(self.max_retries + 1):
+            waited = self._acquire(priority, tokens)
+            with self._cond:
+                metrics["queued_seconds"] += waited
+                metrics["max_queued_seconds"] = max(metrics["max_queued_seconds"], waited)
+            try:
+                result = call()
+            except Exception as e:
+                # Failed requests are not billed for tokens
+                self._release(tokens, 0)
+                server_delay = retry_delay(e)
+                if server_delay is None or attempt == self.max_retries:
+                    with self._cond:
+                        metrics["failed"] += 1
+                    raise
+                ceiling = min(self.max_delay, self.base_delay * 2 ** attempt)
+                delay = max(server_delay, random.uniform(0, ceiling))
+                with self._cond:
+                    metrics["retries"] += 1
+                    if server_delay:
+                        # The limit is shared; hold back every request, not just this one
+                        self._paused_until = max(self._paused_until, time.monotonic() + server_delay)
+                logger.warning(f"LLM request failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            if not hold:
+                self._release(tokens, used_tokens(result) if used_tokens else None)
+            with self._cond:
+                metrics["completed"] += 1
+            return result
+
+    @staticmethod
+    def _estimate_tokens(kwargs: Dict) -> int:
+        """About four characters per token of the messages, plus the completion limit."""
+        characters = sum(len(str(message.get("content", ""))) for message in kwargs.get("messages", []))
+        return characters // 4 + kwargs.get("max_tokens", 1000)
+
+    def chat(self, client, priority: Optional[int] = None, **kwargs):
+        """client.chat.completions.create(**kwargs) through the scheduler.
+
+        The token estimate is corrected with the usage the API reports.
+        """
+        return self.run(
+            lambda: client.chat.completions.create(**kwargs),
+            priority=priority,
+            tokens=self._estimate_tokens(kwargs),
+            used_tokens=lambda response: response.usage.total_tokens if getattr(response, "usage", None) else None
+        )
+
+    def stream_chat(self, client, priority: Optional[int] = None, **kwargs) -> Iterator:
+        """Streamed chat completion through the scheduler.
+
+        The request keeps its slot until the stream is consumed or closed.
+        Errors opening the stream are retried; errors mid-stream are raised.
+
+        Yields:
+            Response chunks; the last one carries the usage
+        """
+        estimate = self._estimate_tokens(kwargs)
+        response = self.run(
+            lambda: client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs),
+            priority=priority,
+            tokens=estimate,
+            hold=True
+        )
+        used = None
+        try:
+            for chunk in response:
+                if getattr(chunk, "usage", None):
+                    used = chunk.usage.total_tokens
+                yield chunk
+        finally:
+            self._release(estimate, used)
+
+    def stats(self) -> Dict:
+        """Report queue depth per priority, requests in flight and outcomes."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiting:
+                depth[PRIORITY_NAMES[priority]] += 1
+            return {
+                "queue_depth": depth,
+                "in_flight": self._active,
+                "tokens_used": self.tokens_used,
+                "requests_available": round(max(self.request_bucket.level, 0), 1),
+                "tokens_available": round(max(self.token_bucket.level, 0)),
+                "by_priority": {
+                    name: {
+                        **metrics,
+                        "queued_seconds": round(metrics["queued_seconds"], 2),
+                        "max_queued_seconds": round(metrics["max_queued_seconds"], 2)
+                    }
+                    for name, metrics in self.metrics.items()
+                }
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide LLM scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
+
+
+def _serve_fake_endpoint(requests_per_second: float, latency: float):
+    """Start a local chat-completions endpoint that answers 429 above its rate limit."""
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    lock = threading.Lock()
+    window = []
+    counts = {"ok": 0, "rate_limited": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            now = time.monotonic()
+            with lock:
+                window[:] = [t for t in window if now - t < 1.0]
+                limited = len(window) >= requests_per_second
+                if not limited:
+                    window.append(now)
+                counts["rate_limited" if limited else "ok"] += 1
+            if limited:
+                body = json.dumps({"error": {"message": "Rate limit reached", "type": "rate_limit_error"}})
+                self.send_response(429)
+                self.send_header("retry-after", "0.5")
+            else:
+                time.sleep(latency)
+                body = json.dumps({
+                    "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": "fake",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+                })
+                self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counts
+
+
+def main():
+    """Load-test the scheduler against a local fake endpoint with a rate limit."""
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+    from openai import OpenAI
+
+    parser = argparse.ArgumentParser(description="Exercise the LLM scheduler against a fake rate-limited endpoint")
+    parser.add_argument("--bulk", type=int, default=60, help="Bulk requests to send")
+    parser.add_argument("--interactive", type=int, default=10, help="Interactive requests to send")
+    parser.add_argument("--endpoint-rps", type=float, default=5, help="Requests per second the fake endpoint allows")
+    parser.add_argument("--rpm", type=float, default=240, help="Scheduler request limit per minute")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake endpoint response time in seconds")
+
+    args = parser.parse_args()
+
+    server, counts = _serve_fake_endpoint(args.endpoint_rps, args.latency)
+    client = OpenAI(api_key="fake", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+    scheduler = LLMScheduler(requests_per_minute=args.rpm, tokens_per_minute=10 ** 6, base_delay=0.5)
+    latencies = {"interactive": [], "bulk": []}
+
+    def request(priority: int):
+        start = time.perf_counter()
+        try:
+            scheduler.chat(client, priority=priority, model="fake", messages=[{"role": "user", "content": "hi"}], max_tokens=20)
+        except openai.APIError:
+            return
+        latencies[PRIORITY_NAMES[priority]].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.bulk + args.interactive) as executor:
+        futures = [executor.submit(request, BULK) for _ in range(args.bulk)]
+        # Interactive requests arrive while the bulk backlog is queued
+        time.sleep(1.0)
+        futures += [executor.submit(request, INTERACTIVE) for _ in range(args.interactive)]
+        peak = scheduler.stats()["queue_depth"]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    stats = scheduler.stats()
+    print(f"{args.bulk + args.interactive} requests in {elapsed:.1f}s; endpoint answered "
+          f"{counts['ok']} and rate-limited {counts['rate_limited']}")
+    print(f"Queue depth after interactive burst: {peak}")
+    for name, values in latencies.items():
+        values.sort()
+        if not values:
+            continue
+        metrics = stats["by_priority"][name]
+        print(f"  {name:<12} completed {metrics['completed']:>3}  failed {metrics['failed']:>2}  "
+              f"retries {metrics['retries']:>3}  p50 {values[len(values) // 2]:.2f}s  max {values[-1]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import json
+import time
+import contextvars
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROOT = "all"
+# Levels from leaves to root, with the length asked of each summary
+LEVEL_WORDS = {"meeting": 120, "day": 150, "week": 200, "month": 250, "year": 300, ROOT: 350}
+# Characters of an analysis sent to the model for its digest
+DIGEST_INPUT_CHARS = 12000
+# Characters and number of child summaries merged by one request; larger periods merge in rounds
+MERGE_INPUT_CHARS = 12000
+MERGE_FAN_IN = 16
+# Analysis keys that are run metadata, not meeting content
+SKIPPED_KEYS = ("agent_timings", "agent_errors", "llm_usage", "prompt_encoding", "provenance")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    meeting_id TEXT PRIMARY KEY,
+    day TEXT,
+    timestamp TEXT,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS digests_day ON digests (day);
+CREATE TABLE IF NOT EXISTS periods (
+    period TEXT PRIMARY KEY,
+    parent TEXT,
+    summary TEXT,
+    children INTEGER,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS periods_parent ON periods (parent);
+"""
+
+
+def period_path(day: date) -> List[str]:
+    """Keys of the periods containing a day, from the day up to the root.
+
+    Weeks are ISO weeks; a week belongs to the month of its Thursday (as
+    ISO weeks belong to the year of their Thursday), so every period has
+    exactly one parent.
+    """
+    year, week, weekday = day.isocalendar()
+    thursday = day + timedelta(days=4 - weekday)
+    return [
+        f"day:{day.isoformat()}",
+        f"week:{year}-W{week:02d}",
+        f"month:{thursday.year}-{thursday.month:02d}",
+        f"year:{thursday.year}",
+        ROOT
+    ]
+
+
+def level_of(period: str) -> str:
+    """Level of a period key: "day", "week", "month", "year" or "all"."""
+    return period.split(":", 1)[0]
+
+
+def analysis_text(analysis: Dict) -> str:
+    """Compact text of an analysis for its digest prompt."""
+    parts = []
+    for section, content in analysis.items():
+        if section in SKIPPED_KEYS or not content:
+            continue
+        if isinstance(content, list):
+            items = "\n".join(
+                f"- {json.dumps(item, ensure_ascii=False) if isinstance(item, dict) else item}" for item in content
+            )
+            parts.append(f"## {section}\n{items}")
+        else:
+            parts.append(f"## {section}\n{content}")
+    return "\n\n".join(parts)[:DIGEST_INPUT_CHARS]
+
+
+class MeetingRollup:
+    def __init__(self, path: str, complete: Callable[[List[Dict]], str], max_workers: int = 4):
+        """Materialized summaries of meetings by day, week, month and year.
+
+        Each meeting is digested once when it is added. Digests are merged
+        into day summaries, days into weeks, weeks into months, months into
+        years and years into one summary of everything. Adding or removing a
+        meeting only recomputes the periods on its path, and a period with a
+        single child takes the child's summary without a model call. Reading
+        the overall summary is a single row lookup.
+
+        Args:
+            path: SQLite database file
+            complete: Chat completion function taking messages, returning text
+            max_workers: Concurrent model calls while digesting or merging
+        """
+        self.path = path
+        self.complete = complete
+        self.max_workers = max_workers
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._lock = threading.Lock()
+        # Updates may come from the background worker and from a request backfilling the rollup
+        self._write_lock = threading.RLock()
+        self.digested = 0
+        self.merged = 0
+        self.copied = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _map(self, function: Callable, items) -> List:
+        """Apply function to items concurrently, in the caller's context (e.g. its LLM priority)."""
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rollup") as executor:
+            return list(executor.map(lambda item: context.copy().run(function, item), items))
+
+    def _digest(self, meeting_id: str, analysis: Dict) -> str:
+        digest = self.complete([
+            {"role": "system", "content": f"You are a meeting analyst. Write a digest of the meeting in at most "
+                                          f"{LEVEL_WORDS['meeting']} words: main topics, decisions and action items "
+                                          f"with owners."},
+            {"role": "user", "content": f"Meeting {meeting_id}:\n{analysis_text(analysis)}"}
+        ])
+        with self._lock:
+            self.digested += 1
+        return digest
+
+    def _merge(self, period: str, children: List[Tuple[str, str]]) -> str:
+        """Summary of a period from (label, summary) of its children.
+
+        Children that do not fit one request are merged in bounded groups,
+        round after round, until they do.
+        """
+        if len(children) == 1:
+            with self._lock:
+                self.copied += 1
+            return children[0][1]
+        groups = self._group(children)
+        while len(groups) > 1:
+            children = self._map(
+                lambda group: (
+                    group[0][0] if len(group) == 1 else f"{group[0][0]} to {group[-1][0]}",
+                    self._combine(period, group)
+                ),
+                groups
+            )
+            groups = self._group(children)
+        return self._combine(period, groups[0])
+
+    @staticmethod
+    def _group(children: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Split children, in order, into groups small enough for one merge request."""
+        groups = [[]]
+        chars = 0
+        for child in children:
+            cost = len(child[0]) + len(child[1])
+            if groups[-1] and (chars + cost > MERGE_INPUT_CHARS or len(groups[-1]) >= MERGE_FAN_IN):
+                groups.append([])
+                chars = 0
+            groups[-1].append(child)
+            chars += cost
+        if len(groups) > 1 and len(groups) == len(children):
+            # Summaries too long to group up; merge two at a time regardless
+            groups = [children[i:i + 2] for i in range(0, len(children), 2)]
+        return groups
+
+    def _combine(self, period: str, children: List[Tuple[str, str]]) -> str:
+        """Merge one group of child summaries with a single request."""
+        if len(children) == 1:
+            return children[0][1]
+        level = level_of(period)
+        scope = "all meetings so far" if period == ROOT else f"the {level} {period.split(':', 1)[1]}"
+        content = "\n\n".join(f"### {label}\n{summary}" for label, summary in children)
+        summary = self.complete([
+            {"role": "system", "content": f"You are a meeting analyst. Combine the summaries below into one summary "
+                                          f"of {scope} in at most {LEVEL_WORDS[level]} words, highlighting key "
+                                          f"decisions, action items and important discussions."},
+            {"role": "user", "content": content}
+        ])
+        with self._lock:
+            self.merged += 1
+        return summary
+
+    def _children(self, conn: sqlite3.Connection, period: str) -> List[Tuple[str, str]]:
+        if level_of(period) == "day":
+            rows = conn.execute(
+                "SELECT meeting_id, digest FROM digests WHERE day = ? ORDER BY timestamp, meeting_id", (period,)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT period, summary FROM periods WHERE parent = ? ORDER BY period", (period,)
+            ).fetchall()
+        return [(label, summary) for label, summary in rows]
+
+    def _refresh(self, periods: List[str]):
+        """Recompute periods of one level from their children, in parallel."""
+        conn = self._connect()
+        try:
+            children = {period: self._children(conn, period) for period in periods}
+        finally:
+            conn.close()
+
+        summaries = dict(zip(
+            periods,
+            self._map(lambda period: self._merge(period, children[period]) if children[period] else None, periods)
+        ))
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                for period, summary in summaries.items():
+                    if summary is None:
+                        # Its last meeting was removed
+                        conn.execute("DELETE FROM periods WHERE period = ?", (period,))
+                        continue
+                    parent = self._path_of(period)[1] if period != ROOT else None
+                    conn.execute(
+                        "INSERT OR REPLACE INTO periods VALUES (?, ?, ?, ?, ?)",
+                        (period, parent, summary, len(children[period]), now)
+                    )
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _path_of(period: str) -> List[str]:
+        """Path from any period to the root, through a day it contains."""
+        level = level_of(period)
+        if period == ROOT:
+            return [ROOT]
+        key = period.split(":", 1)[1]
+        if level == "day":
+            day = date.fromisoformat(key)
+        elif level == "week":
+            year, week = key.split("-W")
+            day = date.fromisocalendar(int(year), int(week), 4)
+        elif level == "month":
+            # The week of a mid-month day has its Thursday in the same month
+            day = date(int(key[:4]), int(key[5:7]), 15)
+        else:
+            day = date(int(key), 6, 15)
+        path = period_path(day)
+        return path[path.index(period):]
+
+    def _propagate(self, days: List[str]) -> int:
+        """Recompute the given days and every period above them, level by level."""
+        count = 0
+        dirty = set(days)
+        while dirty:
+            self._refresh(sorted(dirty))
+            count += len(dirty)
+            dirty = {self._path_of(period)[1] for period in dirty if period != ROOT}
+        return count
+
+    def update(self, meetings: Dict[str, Dict], timestamps: Optional[Dict[str, str]] = None) -> int:
+        """Digest meetings and update the periods on their paths.
+
+        A meeting added again replaces its digest (and moves if its date
+        changed). Each affected period is recomputed once, however many of
+        the meetings fall into it.
+
+        Args:
+            meetings: Meeting ID -> analysis
+            timestamps: Meeting ID -> ISO time of the meeting (default: now)
+
+        Returns:
+            Number of periods recomputed
+        """
+        if not meetings:
+            return 0
+        timestamps = {
+            meeting_id: (timestamps or {}).get(meeting_id) or datetime.now().isoformat()
+            for meeting_id in meetings
+        }
+        digests = dict(zip(meetings, self._map(lambda item: self._digest(*item), meetings.items())))
+
+        with self._write_lock:
+            return self._store_digests(digests, timestamps)
+
+    def _store_digests(self, digests: Dict[str, str], timestamps: Dict[str, str]) -> int:
+        days = set()
+        conn = self._connect()
+        try:
+            with conn:
+                for meeting_id, digest in digests.items():
+                    previous = conn.execute("SELECT day FROM digests WHERE meeting_id = ?", (meeting_id,)).fetchone()
+                    if previous:
+                        days.add(previous[0])
+                    day = period_path(datetime.fromisoformat(timestamps[meeting_id]).date())[0]
+                    days.add(day)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                        (meeting_id, day, timestamps[meeting_id], digest)
+                    )
+        finally:
+            conn.close()
+
+        count = self._propagate(sorted(days))
+        logger.info(f"Rolled up {len(digests)} meetings, recomputing {count} period summaries")
+        return count
+
+    def remove(self, meeting_id: str):
+        """Drop a meeting's digest and update the periods on its path."""
+        with self._write_lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT day FROM digests WHERE meeting_id = ?", (meeting_id,)).fetchone()
+                    conn.execute("DELETE FROM digests WHERE meeting_id = ?", (meeting_id,))
+            finally:
+                conn.close()
+            if row:
+                self._propagate([row[0]])
+
+    def summary(self, period: str = ROOT) -> Optional[str]:
+        """Stored summary of a period ("all", "year:2024", "month:2024-05", "week:2024-W19", "day:2024-05-07")."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT summary FROM periods WHERE period = ?", (period,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def meeting_ids(self) -> List[str]:
+        """IDs of the digested meetings."""
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT meeting_id FROM digests")]
+        finally:
+            conn.close()
+
+    def clear(self):
+        """Remove all digests and period summaries."""
+        with self._write_lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM digests")
+                    conn.execute("DELETE FROM periods")
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict:
+        """Report stored meetings and periods, and model calls made."""
+        conn = self._connect()
+        try:
+            meetings = conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+            periods = dict(conn.execute(
+                "SELECT substr(period, 1, instr(period || ':', ':') - 1), COUNT(*) FROM periods GROUP BY 1"
+            ).fetchall())
+        finally:
+            conn.close()
+        with self._lock:
+            return {
+                "meetings": meetings,
+                "periods": periods,
+                "digests_computed": self.digested,
+                "merges": self.merged,
+                "single_child_copies": self.copied
+            }
@@ -0,0 +1,284 @@
+import gc
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import torch
+import whisperx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Default memory budget for loaded models, in megabytes (0 disables eviction)
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("MODEL_REGISTRY_BUDGET_MB", "0"))
+
+
+def _memory_in_use(device: str) -> int:
+    """Return the bytes currently in use on the given device.
+
+    Uses allocated CUDA memory for GPU devices and the process resident set
+    size for CPU. Returns 0 when the value cannot be determined.
+    """
+    if device.startswith("cuda") and torch.cuda.is_available():
+        return torch.cuda.memory_allocated()
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _parameter_bytes(model) -> int:
+    """Return the bytes of torch parameters and buffers held by a loaded model.
+
+    Looks at the model itself, the items of a tuple and one level of
+    attributes, where pipelines keep their networks. Returns 0 for models
+    without torch modules (e.g. CTranslate2 Whisper).
+    """
+    objects = list(model) if isinstance(model, tuple) else [model]
+    modules = []
+    for obj in objects:
+        modules.append(obj)
+        modules.extend(getattr(obj, "__dict__", {}).values())
+    tensors = {}
+    for module in modules:
+        if isinstance(module, torch.nn.Module):
+            for tensor in list(module.parameters()) + list(module.buffers()):
+                tensors[id(tensor)] = tensor.numel() * tensor.element_size()
+    return sum(tensors.values())
+
+
+class _RegistryEntry:
+    """A loaded model together with its bookkeeping data."""
+
+    def __init__(self, model, size_bytes: int, load_seconds: float):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+        self.hits = 0
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB):
+        """Initialize the model registry.
+
+        Args:
+            memory_budget_mb: Memory budget for all loaded models in MB.
+                Least recently used models are evicted once it is exceeded.
+                A value of 0 disables eviction.
+        """
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self._entries: "OrderedDict[Tuple, _RegistryEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        # One lock per model key, so concurrent requests for a model share a
+        # single load while unrelated models load in parallel
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_or_load(self, key: Tuple, loader: Callable, device: str):
+        """Return the model for key, loading it on first use.
+
+        Concurrent requests for the same key wait for a single load. The size
+        recorded for a model is that of its torch parameters and buffers, or,
+        for models without any, the growth in device memory during the load
+        (approximate when other models load at the same time).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.hits += 1
+                entry.last_used = time.time()
+                self._entries.move_to_end(key)
+                return entry.model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.hits += 1
+                    entry.last_used = time.time()
+                    self._entries.move_to_end(key)
+                    return entry.model
+
+            logger.info(f"Loading {key[0]} model {key[1:]}")
+            memory_before = _memory_in_use(device)
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            size_bytes = _parameter_bytes(model) or max(_memory_in_use(device) - memory_before, 0)
+            logger.info(
+                f"Loaded {key[0]} model in {load_seconds:.1f}s "
+                f"(~{size_bytes / 1024 / 1024:.0f} MB)"
+            )
+
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = _RegistryEntry(model, size_bytes, load_seconds)
+                self._evict_over_budget(keep=key)
+        return model
+
+    def _evict_over_budget(self, keep: Tuple):
+        """Evict least recently used models until the budget is respected."""
+        if not self.memory_budget_bytes:
+            return
+        while self.total_bytes() > self.memory_budget_bytes:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            self._evict(victim)
+
+    def _evict(self, key: Tuple):
+        """Drop a model and release the memory it holds.
+
+        Callers fetch models per call instead of keeping them, so the memory
+        is freed as soon as calls still running with the model return.
+        """
+        entry = self._entries.pop(key)
+        logger.info(f"Evicting {key[0]} model {key[1:]} after {entry.hits} hits")
+        del entry
+        self.evictions += 1
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def total_bytes(self) -> int:
+        """Return the estimated memory held by all loaded models."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def get_asr_model(
+        self,
+        model_name: str,
+        device: str,
+        compute_type: str,
+        language: Optional[str] = None,
+        cpu_threads: Optional[int] = None
+    ):
+        """Get a WhisperX ASR model, loading it on first use.
+
+        Args:
+            model_name: Whisper model to use
+            device: Device to run inference on (cuda/cpu)
+            compute_type: CTranslate2 compute type (float16, float32, int8, ...)
+            language: Language to pin the model to, if any
+            cpu_threads: CTranslate2 threads for CPU inference
+
+        Returns:
+            Loaded WhisperX pipeline
+        """
+        key = ("asr", model_name, device, compute_type, language, cpu_threads)
+        options = {"threads": cpu_threads} if cpu_threads else {}
+        return self._get_or_load(
+            key,
+            lambda: whisperx.load_model(
+                model_name,
+                device,
+                compute_type=compute_type,
+                language=language,
+                **options
+            ),
+            device
+        )
+
+    def get_diarization_model(self, device: str, hf_token: Optional[str] = None):
+        """Get the pyannote diarization pipeline, loading it on first use.
+
+        Args:
+            device: Device to run inference on (cuda/cpu)
+            hf_token: Hugging Face token used to download the pipeline
+
+        Returns:
+            Loaded WhisperX diarization pipeline
+        """
+        key = ("diarization", "pyannote", device, None)
+        return self._get_or_load(
+            key,
+            lambda: whisperx.DiarizationPipeline(
+                use_auth_token=hf_token,
+                device=device
+            ),
+            device
+        )
+
+    def get_alignment_model(self, language: str, device: str):
+        """Get the phoneme alignment model for a language, loading it on first use.
+
+        Args:
+            language: Language code of the transcript
+            device: Device to run inference on (cuda/cpu)
+
+        Returns:
+            Tuple of (alignment model, alignment metadata)
+        """
+        key = ("alignment", language, device, None)
+        return self._get_or_load(
+            key,
+            lambda: whisperx.load_align_model(language_code=language, device=device),
+            device
+        )
+
+    def clear(self):
+        """Unload every model held by the registry."""
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def stats(self) -> List[Dict]:
+        """Report load times, hit counts and memory use for loaded models.
+
+        Returns:
+            List of per-model statistics, most recently used last
+        """
+        with self._lock:
+            return [
+                {
+                    "kind": key[0],
+                    "key": [part for part in key[1:] if part is not None],
+                    "load_seconds": round(entry.load_seconds, 3),
+                    "hits": entry.hits,
+                    "size_mb": round(entry.size_bytes / 1024 / 1024, 1),
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def summary(self) -> Dict:
+        """Report registry-wide counters along with per-model statistics."""
+        with self._lock:
+            return {
+                "models": self.stats(),
+                "loads": self.misses,
+                "hits": sum(entry.hits for entry in self._entries.values()),
+                "evictions": self.evictions,
+                "total_mb": round(self.total_bytes() / 1024 / 1024, 1),
+                "budget_mb": self.memory_budget_bytes // (1024 * 1024)
+            }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
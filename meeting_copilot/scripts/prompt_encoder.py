@@ -0,0 +1,268 @@
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import tiktoken
+
+from scripts.format_transcript import parse_time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Context window per model family (longest matching prefix wins)
+MODEL_CONTEXT_TOKENS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1000000,
+    "gpt-5": 400000,
+    "o1": 200000,
+    "o3": 200000,
+    "o4": 200000
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+
+# Tokens kept free for instructions and the model's answer
+RESERVED_TOKENS = int(os.getenv("PROMPT_RESERVED_TOKENS", "2500"))
+# Fixed transcript budget overriding the per-model one
+PROMPT_TOKEN_BUDGET = os.getenv("PROMPT_TOKEN_BUDGET")
+# Longest turn merged from consecutive segments; longer runs of one speaker
+# (or of a transcript without diarization) are split into several turns
+MAX_TURN_CHARS = int(os.getenv("PROMPT_MAX_TURN_CHARS", "2000"))
+
+
+def context_tokens(llm_model: str) -> int:
+    """Context window of a model, by longest matching name prefix."""
+    matches = [name for name in MODEL_CONTEXT_TOKENS if llm_model.startswith(name)]
+    if not matches:
+        return DEFAULT_CONTEXT_TOKENS
+    return MODEL_CONTEXT_TOKENS[max(matches, key=len)]
+
+
+def format_clock(seconds: float) -> str:
+    """Short M:SS / H:MM:SS timestamp."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def merge_turns(segments: List[Dict], max_chars: int = MAX_TURN_CHARS) -> List[Tuple[float, str, str]]:
+    """Merge consecutive segments by the same speaker into turns.
+
+    A turn grows to at most max_chars, so a long monologue or a transcript
+    without speaker labels still splits into turns the budget can choose from.
+
+    Args:
+        segments: Raw or formatted segments
+        max_chars: Text length after which a speaker's next segment starts a new turn
+
+    Returns:
+        (start seconds, speaker, text) per turn
+    """
+    turns = []
+    length = 0
+    for segment in segments:
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        speaker = segment.get("speaker", "UNKNOWN")
+        if turns and turns[-1][1] == speaker and length + len(text) < max_chars:
+            turns[-1][2].append(text)
+            length += len(text) + 1
+        else:
+            start = parse_time(segment.get("start", segment.get("start_time", 0)))
+            turns.append((start, speaker, [text]))
+            length = len(text)
+    return [(start, speaker, " ".join(texts)) for start, speaker, texts in turns]
+
+
+class TranscriptPromptEncoder:
+    def __init__(
+        self,
+        llm_model: str = "gpt-4",
+        budget_tokens: Optional[int] = None,
+        reserved_tokens: int = RESERVED_TOKENS
+    ):
+        """Render transcripts for prompts in a dense, token-budgeted form.
+
+        Each speaker turn becomes one line, "[M:SS] SPEAKER: text", with
+        consecutive segments of the same speaker merged. The transcript
+        appears once instead of as full_text plus a dict of segments.
+
+        Args:
+            llm_model: Model the prompt is for; sets the tokenizer and budget
+            budget_tokens: Transcript token budget (default: PROMPT_TOKEN_BUDGET,
+                else the model's context window minus reserved_tokens)
+            reserved_tokens: Tokens left for instructions and the answer
+        """
+        self.llm_model = llm_model
+        if budget_tokens is None and PROMPT_TOKEN_BUDGET:
+            budget_tokens = int(PROMPT_TOKEN_BUDGET)
+        if budget_tokens is None:
+            budget_tokens = context_tokens(llm_model) - reserved_tokens
+        self.budget_tokens = budget_tokens
+        self._encoding = None
+        self._last = None
+
+    @property
+    def encoding(self):
+        """tiktoken encoding for the model, loaded on first use."""
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.llm_model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        return self._encoding
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens text takes for this model."""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def render(self, turns: List[Tuple[float, str, str]], timestamps: bool = True) -> List[str]:
+        """Render turns as prompt lines."""
+        if timestamps:
+            return [f"[{format_clock(start)}] {speaker}: {text}" for start, speaker, text in turns]
+        return [f"{speaker}: {text}" for _, speaker, text in turns]
+
+    def _truncate(self, line: str, tokens: int) -> str:
+        """Cut a line to its first tokens, marking the cut."""
+        return self.encoding.decode(self.encoding.encode(line, disallowed_special=())[:tokens]) + " [...]"
+
+    def _fit(self, lines: List[str], counts: List[int]) -> Tuple[List[str], int]:
+        """Drop turns from the middle until the lines fit the budget.
+
+        The opening and the end of a meeting usually carry the agenda and the
+        conclusions, so they are kept. A first turn larger than the whole
+        budget is cut to fit rather than dropped, so some transcript is always
+        sent.
+
+        Returns:
+            (lines, number of turns omitted or cut)
+        """
+        total = sum(counts) + len(lines)
+        if total <= self.budget_tokens:
+            return lines, 0
+        head, tail = [], []
+        used = 0
+        first, last = 0, len(lines) - 1
+        # Alternate taking turns from the start and the end
+        while first <= last:
+            index = first if len(head) <= len(tail) else last
+            cost = counts[index] + 1
+            if used + cost > self.budget_tokens - 20:
+                break
+            used += cost
+            if index == first:
+                head.append(lines[first])
+                first += 1
+            else:
+                tail.append(lines[last])
+                last -= 1
+        if not head and lines:
+            head.append(self._truncate(lines[0], max(self.budget_tokens - 40, 1)))
+            first += 1
+            omitted = last - first + 1
+            marker = [f"[... {omitted} turns omitted ...]"] if omitted else []
+            return head + marker, omitted + 1
+        omitted = last - first + 1
+        return head + [f"[... {omitted} turns omitted ...]"] + tail[::-1], omitted
+
+    def encode_with_stats(self, transcript: Dict) -> Tuple[str, Dict]:
+        """Encode a transcript and report the token savings.
+
+        Args:
+            transcript: Formatted transcript (or raw transcription) with segments
+
+        Returns:
+            (prompt text, stats) where stats holds the token counts of the old
+            dict rendering, of the full compact rendering and of what is sent,
+            the savings of the compact rendering and how many turns had to be
+            omitted to fit the budget
+        """
+        segments = transcript.get("segments", [])
+        # The same dict may have been edited in place since it was last encoded
+        fingerprint = hash(tuple((segment.get("speaker"), segment.get("text")) for segment in segments))
+        if self._last is not None and self._last[0] is transcript and self._last[1] == fingerprint:
+            return self._last[2], self._last[3]
+
+        turns = merge_turns(segments)
+        lines = self.render(turns)
+        counts = [self.count_tokens(line) for line in lines]
+        compact_tokens = sum(counts) + max(len(lines) - 1, 0)
+        timestamps = True
+        if sum(counts) + len(lines) > self.budget_tokens:
+            # Timestamps cost a few tokens per turn; drop them before dropping turns
+            lines = self.render(turns, timestamps=False)
+            counts = [self.count_tokens(line) for line in lines]
+            timestamps = False
+        lines, omitted = self._fit(lines, counts)
+        text = "\n".join(lines)
+
+        # What the agents used to send: a repr of full_text, speakers and segments
+        original = str({
+            "full_text": transcript.get("full_text", transcript.get("text", "")),
+            "speakers": transcript.get("speakers", []),
+            "segments": segments
+        })
+        original_tokens = self.count_tokens(original)
+        tokens = self.count_tokens(text)
+        stats = {
+            "segments": len(segments),
+            "turns": len(turns),
+            "original_tokens": original_tokens,
+            "compact_tokens": compact_tokens,
+            "encoded_tokens": tokens,
+            "saved_tokens": original_tokens - compact_tokens,
+            "saved_ratio": round(1 - compact_tokens / original_tokens, 3) if original_tokens else 0.0,
+            "budget_tokens": self.budget_tokens,
+            "timestamps": timestamps,
+            "omitted_turns": omitted
+        }
+        if omitted:
+            logger.warning(
+                f"Transcript exceeds the {self.budget_tokens}-token budget for {self.llm_model}; "
+                f"omitted {omitted} of {len(turns)} turns"
+            )
+        self._last = (transcript, fingerprint, text, stats)
+        return text, stats
+
+    def encode(self, transcript: Dict) -> str:
+        """Encode a transcript for a prompt within the token budget."""
+        return self.encode_with_stats(transcript)[0]
+
+
+def main():
+    """Report prompt token savings for saved transcripts."""
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure the compact transcript prompt encoding")
+    parser.add_argument("transcripts", nargs="+", help="Formatted transcript JSON files")
+    parser.add_argument("--model", default="gpt-4", help="Model whose tokenizer and budget to use")
+    parser.add_argument("--budget", type=int, help="Transcript token budget")
+    parser.add_argument("--show", action="store_true", help="Print the encoded transcript")
+
+    args = parser.parse_args()
+    encoder = TranscriptPromptEncoder(args.model, budget_tokens=args.budget)
+
+    print(f"{'transcript':<36} {'segments':>9} {'turns':>6} {'before':>8} {'compact':>8} {'saved':>7} {'sent':>8} {'omitted':>8}")
+    for path in args.transcripts:
+        with open(path) as f:
+            transcript = json.load(f)
+        text, stats = encoder.encode_with_stats(transcript)
+        print(
+            f"{os.path.basename(path):<36} {stats['segments']:>9} {stats['turns']:>6} "
+            f"{stats['original_tokens']:>8} {stats['compact_tokens']:>8} "
+            f"{stats['saved_ratio']:>6.0%} {stats['encoded_tokens']:>8} {stats['omitted_turns']:>8}"
+        )
+        if args.show:
+            print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,269 @@
+import os
 import json
+import time
+from functools import partial
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, Optional
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 from crewai import Crew, Task
-from agents.summarizer import summarizer
-from agents.decision_extractor import decision_extractor
-from agents.action_tracker import action_tracker
-from agents.followup_checker import followup_checker
+from agents.summarizer import summarizer, SummarizerAgent
+from agents.decision_extractor import decision_extractor, DecisionExtractorAgent
+from agents.action_tracker import action_tracker, ActionTrackerAgent
+from agents.followup_checker import followup_checker, FollowupCheckerAgent
+from scripts.fused_extraction import FusedExtractor
+from scripts.hierarchical_analysis import HierarchicalAnalyzer
+from scripts.prompt_encoder import TranscriptPromptEncoder
+from scripts.llm_cache import LLMResponseCache, get_llm_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "agents" runs one agent per section, "fused" extracts all sections in one request,
+# "hierarchical" analyzes the transcript in chunks and reduces the results
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "agents")
+ANALYSIS_MODES = ("agents", "fused", "hierarchical")
+# Switch to hierarchical analysis when a transcript does not fit one prompt
+HIERARCHICAL_FALLBACK = os.getenv("HIERARCHICAL_FALLBACK", "true").lower() in ("1", "true", "yes")
+# Run the four agents at once instead of one after another
+CONCURRENT_AGENTS = os.getenv("ANALYSIS_CONCURRENT", "true").lower() in ("1", "true", "yes")
+# Seconds each agent may take before its section is given up on
+AGENT_TIMEOUT = float(os.getenv("ANALYSIS_AGENT_TIMEOUT", "180"))
+
 class MeetingAnalyzer:
-    def __init__(self, output_dir: str = "output", llm_model: str = "gpt-4"):
+    def __init__(
+        self,
+        output_dir: str = "output",
+        llm_model: str = "gpt-4",
+        concurrent: bool = CONCURRENT_AGENTS,
+        agent_timeout: Optional[float] = AGENT_TIMEOUT,
+        mode: str = ANALYSIS_MODE,
+        llm_cache: Optional[LLMResponseCache] = None
+    ):
         """Initialize the meeting analyzer.
         
         Args:
             output_dir: Directory to save analysis results
             llm_model: LLM model to use for analysis
+            concurrent: Run the agents concurrently instead of sequentially
+            agent_timeout: Seconds each agent may take in concurrent mode
+                (None waits indefinitely)
+            mode: "agents" for one request per section, "fused" for a single
+                schema-constrained request returning all sections,
+                "hierarchical" for map-reduce over transcript chunks
+            llm_cache: Cache of LLM responses (default: the process-wide one)
         """
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.llm_model = llm_model
+        self.concurrent = concurrent
+        self.agent_timeout = agent_timeout
+        self.mode = mode
+        self._fused_extractor = None
+        self._hierarchical = None
+        self.llm_cache = llm_cache or get_llm_cache()
+        
+        # Initialize agents; they share one encoder so the transcript is encoded once
+        self.encoder = TranscriptPromptEncoder(llm_model)
+        self.summarizer = SummarizerAgent(llm_model=llm_model, encoder=self.encoder, cache=self.llm_cache)
+        self.decision_extractor = DecisionExtractorAgent(llm_model=llm_model, encoder=self.encoder, cache=self.llm_cache)
+        self.action_tracker = ActionTrackerAgent(llm_model=llm_model, encoder=self.encoder, cache=self.llm_cache)
+        self.followup_checker = FollowupCheckerAgent(llm_model=llm_model, encoder=self.encoder, cache=self.llm_cache)
+        
+    @property
+    def fused_extractor(self) -> FusedExtractor:
+        """Single-request extractor used in fused mode, created on first use."""
+        if self._fused_extractor is None:
+            self._fused_extractor = FusedExtractor(
+                llm_model=self.llm_model,
+                encoder=self.encoder,
+                cache=self.llm_cache
+            )
+        return self._fused_extractor
+        
+    @property
+    def hierarchical(self) -> HierarchicalAnalyzer:
+        """Chunked map-reduce analyzer for long meetings, created on first use."""
+        if self._hierarchical is None:
+            self._hierarchical = HierarchicalAnalyzer(self.fused_extractor)
+        return self._hierarchical
+        
+    def _agent_jobs(self) -> Dict[str, Callable[[Dict], object]]:
+        """Analysis sections and the agent call producing each."""
+        return {
+            "summary": self.summarizer.summarize,
+            "decisions": self.decision_extractor.extract_decisions,
+            "action_items": self.action_tracker.track_actions,
+            "follow_ups": self.followup_checker.check_followups
+        }
+        
+    @staticmethod
+    def _timed(job: Callable[[Dict], object], transcript: Dict):
+        """Run an agent call.
+        
+        Returns:
+            (result, seconds taken, error message or None)
+        """
+        start = time.perf_counter()
+        try:
+            return job(transcript), time.perf_counter() - start, None
+        except Exception as e:
+            return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        
+    def _run_sequential(self, jobs: Dict[str, Callable], transcript: Dict) -> Dict[str, tuple]:
+        """Run the agents one after another."""
+        outcomes = {}
+        for section, job in jobs.items():
+            logger.info(f"Running {section} agent...")
+            outcomes[section] = self._timed(job, transcript)
+        return outcomes
+        
+    def _run_concurrent(self, jobs: Dict[str, Callable], transcript: Dict) -> Dict[str, tuple]:
+        """Run the agents in parallel, giving up on any that exceed the timeout."""
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="agent")
+        futures = {
+            section: executor.submit(self._timed, job, transcript)
+            for section, job in jobs.items()
+        }
+        # All agents start together, so one shared deadline is a per-agent timeout
+        wait(futures.values(), timeout=self.agent_timeout)
+        # Threads cannot be interrupted; a timed-out agent finishes in the background
+        executor.shutdown(wait=False)
+        
+        outcomes = {}
+        for section, future in futures.items():
+            if future.done():
+                outcomes[section] = future.result()
+            else:
+                outcomes[section] = (None, time.perf_counter() - start, f"Timed out after {self.agent_timeout:g}s")
+        return outcomes
         
-        # Initialize agents
-        self.summarizer = summarizer
-        self.decision_extractor = decision_extractor
-        self.action_tracker = action_tracker
-        self.followup_checker = followup_checker
+    @staticmethod
+    def _reporting(section: str, job: Callable[[Dict], object], on_event: Callable[[Dict], None]):
+        """Wrap an agent call to report its section as soon as it is done."""
+        def run(transcript: Dict):
+            result = job(transcript)
+            on_event({"type": "section", "section": section, "value": result})
+            return result
+        return run
         
-    def analyze_meeting(self, transcript: Dict) -> Dict:
+    def analyze_meeting(
+        self,
+        transcript: Dict,
+        on_event: Optional[Callable[[Dict], None]] = None,
+        mode: Optional[str] = None
+    ) -> Dict:
         """Run full meeting analysis using all agents.
         
+        A failing or timed-out agent leaves its section as None and is listed
+        under agent_errors; the other sections are still returned. Seconds
+        spent per agent (or on the fused or hierarchical run) are recorded
+        under agent_timings. Transcripts that do not fit one prompt are
+        analyzed hierarchically unless HIERARCHICAL_FALLBACK is off.
+        
+        Partial results are passed to on_event as they become available: in
+        fused mode each item as the reply streams in, in agents mode each
+        section as its agent finishes. Hierarchical analysis reports nothing
+        before the end, as chunk items are still deduplicated.
+        
         Args:
             transcript: Formatted transcript with speaker turns
+            on_event: Called with {"type": "item" | "section", ...} events
+            mode: Analysis mode for this call (default: the analyzer's)
             
         Returns:
             Complete meeting analysis
         """
-        logger.info("Starting meeting analysis...")
-        
-        # Generate summary
-        logger.info("Generating meeting summary...")
-        summary = self.summarizer.summarize(transcript)
-        
-        # Extract decisions
-        logger.info("Extracting decisions...")
-        decisions = self.decision_extractor.extract_decisions(transcript)
+        start = time.perf_counter()
+        _, encoding_stats = self.encoder.encode_with_stats(transcript)
+        logger.info(
+            f"Transcript prompt: {encoding_stats['encoded_tokens']} tokens, compact encoding "
+            f"saves {encoding_stats['saved_ratio']:.0%} over the segment dict"
+        )
         
-        # Track action items
-        logger.info("Tracking action items...")
-        action_items = self.action_tracker.track_actions(transcript)
+        mode = mode or self.mode
+        if mode != "hierarchical" and encoding_stats["omitted_turns"] and HIERARCHICAL_FALLBACK:
+            logger.info("Transcript does not fit one prompt; switching to hierarchical analysis")
+            mode = "hierarchical"
+        if mode == "agents":
+            logger.info(f"Starting meeting analysis ({'concurrent' if self.concurrent else 'sequential'} agents)...")
+        else:
+            logger.info(f"Starting meeting analysis ({mode})...")
         
-        # Check follow-ups
-        logger.info("Checking follow-up items...")
-        followups = self.followup_checker.check_followups(transcript)
+        jobs = self._agent_jobs()
+        if mode in ("fused", "hierarchical"):
+            if mode == "fused":
+                extract = partial(self.fused_extractor.extract, on_event=on_event)
+            else:
+                extract = self.hierarchical.analyze
+            result, seconds, error = self._timed(extract, transcript)
+            sections = result or {}
+            outcomes = {mode: (None, seconds, error)}
+        else:
+            if on_event:
+                jobs = {section: self._reporting(section, job, on_event) for section, job in jobs.items()}
+            if self.concurrent:
+                outcomes = self._run_concurrent(jobs, transcript)
+            else:
+                outcomes = self._run_sequential(jobs, transcript)
+            sections = {section: result for section, (result, _, _) in outcomes.items()}
         
         # Compile results
-        analysis = {
-            "timestamp": datetime.now().isoformat(),
-            "summary": summary,
-            "decisions": decisions,
-            "action_items": action_items,
-            "follow_ups": followups
-        }
+        analysis = {"timestamp": datetime.now().isoformat()}
+        for section in jobs:
+            analysis[section] = sections.get(section)
+        timings = {}
+        errors = {}
+        for section, (_, seconds, error) in outcomes.items():
+            timings[section] = round(seconds, 3)
+            if error:
+                errors[section] = error
+                logger.error(f"{section} agent failed: {error}")
+        timings["total"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Meeting analysis finished in {timings['total']:.1f}s with {len(errors)} failed agents")
+        
+        analysis["agent_timings"] = timings
+        analysis["prompt_encoding"] = encoding_stats
+        if errors:
+            analysis["agent_errors"] = errors
+        if "llm_usage" in sections:
+            analysis["llm_usage"] = sections["llm_usage"]
+        if "provenance" in sections:
+            analysis["provenance"] = sections["provenance"]
         
         return analysis
+    
+    def reanalyze(
+        self,
+        transcript: Dict,
+        previous_transcript: Optional[Dict] = None,
+        speaker_renames: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """Re-analyze a corrected transcript, recomputing only what the edits touch.
+        
+        The transcript is analyzed hierarchically: chunk results are cached by
+        content, so only chunks containing an edit are extracted again, and
+        only the summary merges above them are redone. Speaker renames are
+        applied to the cached results of the previous transcript instead of
+        re-extracting every chunk the speaker appears in. The first
+        re-analysis of a meeting analyzed in another mode fills the chunk
+        cache; later edits are incremental.
+        
+        Args:
+            transcript: Corrected transcript
+            previous_transcript: Transcript before the edits (needed for renames)
+            speaker_renames: Old speaker label -> new label
+            
+        Returns:
+            Complete meeting analysis, with provenance of every item
+        """
+        if speaker_renames and previous_transcript:
+            self.hierarchical.relabel_speakers(previous_transcript, speaker_renames)
+        return self.analyze_meeting(transcript, mode="hierarchical")
         
     def save_analysis(self, analysis: Dict, filename: str = "meeting_summary.json") -> str:
         """Save analysis results to JSON file.
@@ -133,6 +330,10 @@ def main():
     parser.add_argument("transcript_file", help="Path to formatted transcript JSON file")
     parser.add_argument("--output", default="meeting_summary.json", help="Output filename")
     parser.add_argument("--model", default="gpt-4", help="LLM model to use")
+    parser.add_argument("--sequential", action="store_true", help="Run the agents one after another")
+    parser.add_argument("--refresh-llm-cache", action="store_true", help="Call the model even if a cached response exists")
+    parser.add_argument("--mode", choices=ANALYSIS_MODES, default=ANALYSIS_MODE, help="Per-section agents, one fused request, or chunked map-reduce")
+    parser.add_argument("--agent-timeout", type=float, default=AGENT_TIMEOUT, help="Seconds each agent may take")
     
     args = parser.parse_args()
     
@@ -141,7 +342,14 @@ def main():
         transcript = json.load(f)
     
     # Run analysis
-    analyzer = MeetingAnalyzer(llm_model=args.model)
+    if args.refresh_llm_cache:
+        get_llm_cache().bypass = True
+    analyzer = MeetingAnalyzer(
+        llm_model=args.model,
+        concurrent=not args.sequential,
+        agent_timeout=args.agent_timeout,
+        mode=args.mode
+    )
     analysis = analyzer.analyze_meeting(transcript)
     
     # Save results
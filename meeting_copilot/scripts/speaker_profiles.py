@@ -0,0 +1,314 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Words asked of a profile
+PROFILE_WORDS = 200
+# Characters of contributions sent per request during a full refresh
+REFRESH_CHUNK_CHARS = 12000
+# Incremental updates after which a profile is due a full refresh
+REFRESH_AFTER_UPDATES = int(os.getenv("SPEAKER_PROFILE_REFRESH_AFTER", "10"))
+# Seconds between background refresh passes
+REFRESH_INTERVAL = float(os.getenv("SPEAKER_PROFILE_REFRESH_SECONDS", "3600"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contributions (
+    speaker TEXT,
+    meeting_id TEXT,
+    timestamp TEXT,
+    text TEXT,
+    PRIMARY KEY (speaker, meeting_id, text)
+);
+CREATE INDEX IF NOT EXISTS contributions_meeting ON contributions (meeting_id);
+CREATE TABLE IF NOT EXISTS profiles (
+    speaker TEXT PRIMARY KEY,
+    summary TEXT,
+    updated REAL,
+    refreshed REAL,
+    updates_since_refresh INTEGER DEFAULT 0,
+    stale INTEGER DEFAULT 0
+);
+"""
+
+
+class SpeakerProfiles:
+    def __init__(self, path: str, complete: Callable[[List[Dict]], str]):
+        """Materialized per-speaker profiles.
+
+        A profile is a summary of everything a speaker decided, owns or
+        raised. When a meeting is added, each speaker's profile is revised
+        with that meeting's contributions only; reading a profile is a
+        single row lookup. Incremental revisions can drift, so a profile is
+        marked stale after REFRESH_AFTER_UPDATES of them, or when one of its
+        meetings is removed, and is then rebuilt from all stored
+        contributions by refresh_stale(). Calls that write must not run
+        concurrently; MeetingMemory runs them on one background worker.
+
+        Args:
+            path: SQLite database file
+            complete: Chat completion function taking messages, returning text
+        """
+        self.path = path
+        self.complete = complete
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.refreshes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _revise(self, speaker: str, profile: Optional[str], contributions: List[str], source: str) -> str:
+        items = "\n".join(f"- {text}" for text in contributions)
+        if profile:
+            prompt = f"Current profile of {speaker}:\n{profile}\n\nNew contributions ({source}):\n{items}"
+            task = "Update the profile with the new contributions"
+        else:
+            prompt = f"Contributions of {speaker} ({source}):\n{items}"
+            task = "Write a profile of this speaker"
+        return self.complete([
+            {"role": "system", "content": f"You are a meeting analyst. {task} in at most {PROFILE_WORDS} words, "
+                                          f"covering their key decisions, action items they own and the topics "
+                                          f"they raise across meetings."},
+            {"role": "user", "content": prompt}
+        ])
+
+    def add_meetings(self, meetings: Dict[str, Dict[str, List[str]]], timestamps: Dict[str, str]):
+        """Store meetings' contributions and revise each speaker's profile with them.
+
+        Each speaker's profile is revised once with all their new
+        contributions (in chunks that fit one request), however many of the
+        meetings they spoke in. Contributions already stored (a meeting added
+        again) do not revise the profile a second time. If a revision fails,
+        its contributions are stored but missing from the profile, so the
+        profile is marked stale for refresh_stale() to rebuild.
+
+        Args:
+            meetings: Meeting ID -> speaker -> texts of their items in that meeting
+            timestamps: Meeting ID -> ISO time of the meeting
+        """
+        new = {}
+        for meeting_id, contributions in meetings.items():
+            for speaker, texts in contributions.items():
+                new.setdefault(speaker, []).extend(
+                    self.store_contributions(meeting_id, speaker, texts, timestamps[meeting_id])
+                )
+        source = f"meeting {next(iter(meetings))}" if len(meetings) == 1 else f"{len(meetings)} meetings"
+
+        updated = 0
+        for speaker, texts in new.items():
+            if not texts:
+                continue
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT summary FROM profiles WHERE speaker = ?", (speaker,)).fetchone()
+            finally:
+                conn.close()
+
+            summary = row["summary"] if row else None
+            try:
+                for chunk in self._chunks(texts):
+                    summary = self._revise(speaker, summary, chunk, source)
+            except Exception as e:
+                logger.error(f"Updating the profile of {speaker} failed; marking it stale: {e}")
+                self._mark_stale([speaker])
+                continue
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO profiles (speaker, summary, updated, refreshed, updates_since_refresh, stale) "
+                        "VALUES (?, ?, ?, NULL, 1, 0) ON CONFLICT (speaker) DO UPDATE SET "
+                        "summary = excluded.summary, updated = excluded.updated, "
+                        "updates_since_refresh = updates_since_refresh + 1, "
+                        "stale = stale OR updates_since_refresh + 1 >= ?",
+                        (speaker, summary, time.time(), REFRESH_AFTER_UPDATES)
+                    )
+            finally:
+                conn.close()
+            with self._lock:
+                self.updates += 1
+            updated += 1
+        logger.info(f"Updated {updated} speaker profiles from {source}")
+
+    @staticmethod
+    def _chunks(texts: List[str]) -> List[List[str]]:
+        """Split texts into chunks of about REFRESH_CHUNK_CHARS characters."""
+        chunks = [[]]
+        size = 0
+        for text in texts:
+            if chunks[-1] and size + len(text) > REFRESH_CHUNK_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(text)
+            size += len(text)
+        return chunks
+
+    def store_contributions(self, meeting_id: str, speaker: str, texts: List[str], timestamp: str) -> List[str]:
+        """Store contributions without revising the profile.
+
+        Returns:
+            The texts that were not stored yet
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                return [
+                    text for text in dict.fromkeys(texts)
+                    if conn.execute(
+                        "INSERT OR IGNORE INTO contributions VALUES (?, ?, ?, ?)",
+                        (speaker, meeting_id, timestamp, text)
+                    ).rowcount
+                ]
+        finally:
+            conn.close()
+
+    def _mark_stale(self, speakers: List[str]):
+        """Flag profiles for a full refresh, adding an empty row for speakers without one."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO profiles (speaker, stale) VALUES (?, 1) "
+                    "ON CONFLICT (speaker) DO UPDATE SET stale = 1",
+                    [(speaker,) for speaker in speakers]
+                )
+        finally:
+            conn.close()
+
+    def remove_meeting(self, meeting_id: str):
+        """Drop a meeting's contributions and mark the affected profiles stale."""
+        conn = self._connect()
+        try:
+            with conn:
+                speakers = [row["speaker"] for row in conn.execute(
+                    "SELECT DISTINCT speaker FROM contributions WHERE meeting_id = ?", (meeting_id,)
+                )]
+                conn.execute("DELETE FROM contributions WHERE meeting_id = ?", (meeting_id,))
+                conn.executemany("UPDATE profiles SET stale = 1 WHERE speaker = ?", [(s,) for s in speakers])
+        finally:
+            conn.close()
+
+    def refresh(self, speaker: str):
+        """Rebuild a profile from all of the speaker's stored contributions."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT meeting_id, text FROM contributions WHERE speaker = ? ORDER BY timestamp, meeting_id",
+                (speaker,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        # Fold the history in chunks that fit one request
+        summary = None
+        if rows:
+            for chunk in self._chunks([row["text"] for row in rows]):
+                summary = self._revise(speaker, summary, chunk, "in meeting order")
+
+        conn = self._connect()
+        try:
+            with conn:
+                if summary is None:
+                    # Every meeting with this speaker was removed
+                    conn.execute("DELETE FROM profiles WHERE speaker = ?", (speaker,))
+                else:
+                    now = time.time()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, 0, 0)",
+                        (speaker, summary, now, now)
+                    )
+        finally:
+            conn.close()
+        with self._lock:
+            self.refreshes += 1
+        logger.info(f"Refreshed the profile of {speaker} from {len(rows)} contributions")
+
+    def refresh_stale(self) -> int:
+        """Rebuild every stale profile.
+
+        Returns:
+            Number of profiles refreshed
+        """
+        conn = self._connect()
+        try:
+            speakers = [row["speaker"] for row in conn.execute("SELECT speaker FROM profiles WHERE stale = 1")]
+        finally:
+            conn.close()
+        for speaker in speakers:
+            try:
+                self.refresh(speaker)
+            except Exception as e:
+                logger.error(f"Refreshing the profile of {speaker} failed: {e}")
+        return len(speakers)
+
+    def get(self, speaker: str) -> Optional[Dict]:
+        """Stored profile of a speaker with its staleness metadata, or None.
+
+        A speaker whose first profile failed to build has no profile yet.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM profiles WHERE speaker = ?", (speaker,)).fetchone()
+            if row is None or row["summary"] is None:
+                return None
+            meetings, contributions, last = conn.execute(
+                "SELECT COUNT(DISTINCT meeting_id), COUNT(*), MAX(timestamp) FROM contributions WHERE speaker = ?",
+                (speaker,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            "speaker": speaker,
+            "summary": row["summary"],
+            "meetings": meetings,
+            "contributions": contributions,
+            "last_meeting": last,
+            "updated": row["updated"],
+            "refreshed": row["refreshed"],
+            "updates_since_refresh": row["updates_since_refresh"],
+            "stale": bool(row["stale"])
+        }
+
+    def clear(self):
+        """Remove all contributions and profiles."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM contributions")
+                conn.execute("DELETE FROM profiles")
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """Report stored and stale profiles, and model calls made."""
+        conn = self._connect()
+        try:
+            profiles, stale = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(stale), 0) FROM profiles"
+            ).fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            return {
+                "profiles": profiles,
+                "stale": stale,
+                "incremental_updates": self.updates,
+                "full_refreshes": self.refreshes
+            }
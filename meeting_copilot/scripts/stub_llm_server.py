@@ -0,0 +1,226 @@
+import os
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds before every response
+LATENCY = float(os.getenv("STUB_LLM_LATENCY", "0.5"))
+# Extra seconds per completion token, to mimic generation speed
+SECONDS_PER_TOKEN = float(os.getenv("STUB_LLM_SECONDS_PER_TOKEN", "0.0"))
+# Random +/- share of the latency
+JITTER = float(os.getenv("STUB_LLM_JITTER", "0.0"))
+# Share of requests answered with 429
+ERROR_RATE = float(os.getenv("STUB_LLM_ERROR_RATE", "0.0"))
+EMBEDDING_DIMENSIONS = 256
+
+LINE_PATTERN = re.compile(r"^(?:\[[\d:]+\] )?(\w[\w .'-]*): (.+)$")
+DECISION_PATTERN = re.compile(r"\b(decided|decide|agreed|agree|approved|go with)\b", re.IGNORECASE)
+ACTION_PATTERN = re.compile(r"\b(will|i'll|we'll|going to|need to|by (monday|tuesday|wednesday|thursday|friday|tomorrow|next week))\b", re.IGNORECASE)
+
+app = FastAPI(title="Stub LLM server")
+_random = random.Random(0)
+
+
+def transcript_lines(text: str) -> List[Tuple[str, str]]:
+    """(speaker, text) for every "SPEAKER: text" line of a prompt."""
+    lines = []
+    for line in text.splitlines():
+        match = LINE_PATTERN.match(line.strip())
+        if match:
+            lines.append((match.group(1), match.group(2)))
+    return lines
+
+
+def extract(lines: List[Tuple[str, str]]) -> Dict:
+    """Deterministic stand-in for the model's meeting analysis."""
+    speakers = sorted({speaker for speaker, _ in lines})
+    summary = "## Summary\n" + "\n".join(
+        f"- {speaker}: {sum(1 for s, _ in lines if s == speaker)} turns" for speaker in speakers
+    )
+    if lines:
+        summary += "\n\nOpening: " + lines[0][1] + "\n\nClosing: " + lines[-1][1]
+    return {
+        "summary": summary,
+        "decisions": [
+            {"decision": text, "speaker": speaker, "context": None, "conditions": None}
+            for speaker, text in lines if DECISION_PATTERN.search(text)
+        ],
+        "action_items": [
+            {"task": text, "owner": speaker, "deadline": None, "dependencies": None, "priority": None}
+            for speaker, text in lines if ACTION_PATTERN.search(text)
+        ],
+        "follow_ups": [
+            {"topic": text, "reason": "Left open", "participants": [speaker], "urgency": None, "questions": [text]}
+            for speaker, text in lines if text.rstrip().endswith("?")
+        ]
+    }
+
+
+def reply_for(body: Dict) -> str:
+    """Pick a reply in the shape the request asks for.
+
+    Fused extraction (a JSON schema in the system prompt or response_format)
+    gets the full analysis object, agent tasks expecting JSON get the list
+    for their section, and everything else a markdown summary.
+    """
+    messages = body.get("messages", [])
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    user = str(messages[-1].get("content", "")) if messages else ""
+    analysis = extract(transcript_lines(user))
+
+    if body.get("response_format") or ("json" in system.lower() and "schema" in system.lower()):
+        return json.dumps(analysis)
+    if "JSON" in user.split("Expected output:")[-1]:
+        prompt = (system + " " + user).lower()
+        for keyword, section in (("decision", "decisions"), ("action", "action_items"), ("follow", "follow_ups")):
+            if keyword in prompt:
+                return json.dumps(analysis[section])
+        return "[]"
+    return analysis["summary"]
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count, about 4/3 tokens per word."""
+    return math.ceil(len(text.split()) * 4 / 3)
+
+
+def embed(text: str) -> List[float]:
+    """Hashed bag-of-words vector; texts sharing words get similar vectors."""
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        vector[digest[0] % EMBEDDING_DIMENSIONS] += 1.0 if digest[1] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+async def _delay(completion_tokens: int = 0, latency: float = None):
+    latency = (LATENCY if latency is None else latency) + SECONDS_PER_TOKEN * completion_tokens
+    if JITTER:
+        latency *= 1 + _random.uniform(-JITTER, JITTER)
+    await asyncio.sleep(max(latency, 0.0))
+
+
+def _rate_limited():
+    if ERROR_RATE and _random.random() < ERROR_RATE:
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}},
+            status_code=429,
+            headers={"retry-after": "1"}
+        )
+    return None
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """OpenAI-compatible chat completion with deterministic content."""
+    body = await request.json()
+    limited = _rate_limited()
+    if limited:
+        return limited
+    content = reply_for(body)
+    prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+    completion_tokens = count_tokens(content)
+    response_id = "stub-" + hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:12]
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+    if body.get("stream"):
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+        return StreamingResponse(
+            _stream(response_id, body.get("model", "stub"), content, usage if include_usage else None),
+            media_type="text/event-stream"
+        )
+    await _delay(completion_tokens)
+    return {
+        "id": response_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage
+    }
+
+
+async def _stream(response_id: str, model: str, content: str, usage: Dict = None):
+    """Server-sent chat completion chunks: the latency before the first, then per-token delays."""
+    def chunk(delta: Dict, finish_reason: str = None, chunk_usage: Dict = None) -> str:
+        choices = [] if chunk_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        return "data: " + json.dumps({
+            "id": response_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            "usage": chunk_usage
+        }) + "\n\n"
+
+    await _delay()
+    yield chunk({"role": "assistant", "content": ""})
+    for start in range(0, len(content), 16):
+        piece = content[start:start + 16]
+        await _delay(count_tokens(piece), latency=0.0)
+        yield chunk({"content": piece})
+    yield chunk({}, finish_reason="stop")
+    if usage:
+        yield chunk({}, chunk_usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    """OpenAI-compatible embeddings."""
+    body = await request.json()
+    limited = _rate_limited()
+    if limited:
+        return limited
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    await _delay()
+    tokens = sum(count_tokens(text) for text in inputs)
+    return {
+        "object": "list",
+        "model": body.get("model", "stub"),
+        "data": [{"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(inputs)],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+    }
+
+
+def main():
+    """Run the stub server."""
+    import argparse
+    import uvicorn
+
+    global LATENCY, SECONDS_PER_TOKEN, JITTER, ERROR_RATE
+
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible LLM stub with configurable latency")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=LATENCY, help="Seconds before every response")
+    parser.add_argument("--seconds-per-token", type=float, default=SECONDS_PER_TOKEN, help="Extra seconds per completion token")
+    parser.add_argument("--jitter", type=float, default=JITTER, help="Random +/- share of the latency")
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="Share of requests answered with 429")
+
+    args = parser.parse_args()
+    LATENCY, SECONDS_PER_TOKEN, JITTER, ERROR_RATE = args.latency, args.seconds_per_token, args.jitter, args.error_rate
+    logger.info(f"Stub LLM at http://{args.host}:{args.port}/v1 (latency {LATENCY}s, error rate {ERROR_RATE:.0%})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
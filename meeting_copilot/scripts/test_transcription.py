@@ -2,7 +2,7 @@ import os
 import json
 import logging
 from pathlib import Path
-from whisper_transcribe import WhisperTranscriber
+from scripts.whisper_transcribe import WhisperTranscriber
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
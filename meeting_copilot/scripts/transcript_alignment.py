@@ -0,0 +1,182 @@
+import re
+import math
+import heapq
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "do", "for", "from",
+    "has", "have", "he", "her", "his", "i", "if", "in", "is", "it", "its", "me",
+    "my", "of", "on", "or", "our", "she", "so", "that", "the", "their", "them",
+    "then", "there", "they", "this", "to", "up", "us", "was", "we", "were",
+    "will", "with", "you", "your", "just", "like", "um", "uh", "yeah", "okay"
+}
+
+# Fields of an extracted item that describe what was said
+ITEM_TEXT_FIELDS = ("text", "decision", "task", "action", "topic", "description", "item")
+
+# Analysis sections whose items get time spans
+ALIGNED_SECTIONS = ("decisions", "action_items", "follow_ups")
+
+
+@lru_cache(maxsize=65536)
+def _stem(token: str) -> str:
+    """Strip common English suffixes so inflected forms match."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            break
+    # "move" and "moved" should meet at "mov"
+    if token.endswith("e") and len(token) > 3:
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split and stem text, dropping stopwords."""
+    return [
+        _stem(token.strip("'"))
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def item_text(item) -> str:
+    """Get the text of an extracted decision, action item or follow-up."""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        for field in ITEM_TEXT_FIELDS:
+            if isinstance(item.get(field), str):
+                return item[field]
+        return " ".join(value for value in item.values() if isinstance(value, str))
+    return str(item)
+
+
+class TranscriptAligner:
+    def __init__(self, segments: List[Dict], max_span: int = 3, max_candidates: int = 20):
+        """Index transcript segments for aligning extracted items to them.
+
+        Builds an inverted index from stemmed tokens to the segments containing
+        them. Each item is scored only against segments sharing at least one
+        token, so alignment is near-linear in transcript and item size.
+
+        Args:
+            segments: Transcript segments with text and start/end seconds
+            max_span: Maximum number of consecutive segments an item may span
+            max_candidates: Best single segments expanded into spans per item
+        """
+        self.segments = segments
+        self.max_span = max_span
+        self.max_candidates = max_candidates
+
+        self.segment_tokens = [set(tokenize(segment.get("text", ""))) for segment in segments]
+        self.postings = defaultdict(list)
+        for index, tokens in enumerate(self.segment_tokens):
+            for token in tokens:
+                self.postings[token].append(index)
+
+        n_segments = max(len(segments), 1)
+        self.common_df = max(50, n_segments // 50)
+        self.idf = {
+            token: math.log(1 + n_segments / len(indexes))
+            for token, indexes in self.postings.items()
+        }
+
+    def align(self, text: str) -> Optional[Dict]:
+        """Find the time span of the transcript that best matches text.
+
+        Args:
+            text: Text of an extracted item
+
+        Returns:
+            Dict with start_time, end_time (seconds), segment indexes and a
+            confidence in [0, 1], or None if nothing matches
+        """
+        tokens = set(tokenize(text))
+        query = {token for token in tokens if token in self.postings}
+        if not query:
+            return None
+        # Tokens missing from the transcript still count, so confidence stays honest
+        unseen_idf = math.log(1 + len(self.segments))
+        total = sum(self.idf.get(token, unseen_idf) for token in tokens)
+
+        # Only selective tokens generate candidates; long posting lists of
+        # common words would make every query scan most of the transcript
+        selective = [token for token in query if len(self.postings[token]) <= self.common_df]
+        if not selective:
+            selective = [min(query, key=lambda token: len(self.postings[token]))]
+
+        scores = defaultdict(float)
+        for token in selective:
+            weight = self.idf[token]
+            for index in self.postings[token]:
+                scores[index] += weight
+
+        candidates = heapq.nlargest(self.max_candidates, scores, key=scores.get)
+        best = None
+        for index in candidates:
+            for first in range(max(0, index - self.max_span + 1), index + 1):
+                covered = set()
+                for last in range(first, min(first + self.max_span, len(self.segments))):
+                    covered |= self.segment_tokens[last] & query
+                    if last < index:
+                        continue
+                    coverage = sum(self.idf[token] for token in covered) / total
+                    # Prefer the tightest span with the same coverage
+                    confidence = coverage * (1 - 0.05 * (last - first))
+                    if best is None or confidence > best[0]:
+                        best = (confidence, first, last)
+
+        confidence, first, last = best
+        return {
+            "start_time": self.segments[first].get("start", 0),
+            "end_time": self.segments[last].get("end", 0),
+            "segments": list(range(first, last + 1)),
+            "confidence": round(confidence, 3)
+        }
+
+    def annotate(
+        self,
+        analysis: Dict,
+        sections: Iterable[str] = ALIGNED_SECTIONS,
+        min_confidence: float = 0.3
+    ) -> Dict:
+        """Add start_time, end_time and alignment_confidence to analysis items.
+
+        Items below min_confidence are left without a time span.
+
+        Args:
+            analysis: Meeting analysis; dict items are annotated in place
+            sections: Analysis sections to align
+            min_confidence: Minimum confidence for assigning a time span
+
+        Returns:
+            The annotated analysis
+        """
+        aligned = 0
+        total = 0
+        for section in sections:
+            items = analysis.get(section)
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                total += 1
+                match = self.align(item_text(item))
+                if match is None or match["confidence"] < min_confidence:
+                    continue
+                item["start_time"] = match["start_time"]
+                item["end_time"] = match["end_time"]
+                item["alignment_confidence"] = match["confidence"]
+                aligned += 1
+        logger.info(f"Aligned {aligned}/{total} items to transcript timestamps")
+        return analysis
@@ -0,0 +1,66 @@
+import logging
+from typing import Dict, List, Optional
+
+from scripts.format_transcript import parse_time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def apply_edits(
+    transcript: Dict,
+    edits: Optional[List[Dict]] = None,
+    speaker_renames: Optional[Dict[str, str]] = None
+) -> Dict:
+    """Apply user corrections to a formatted transcript.
+
+    Args:
+        transcript: Formatted transcript
+        edits: Segment corrections, {"index": segment index, "text": ..., "speaker": ...};
+            fields that are left out or None are kept
+        speaker_renames: Old speaker label -> new label, applied to every segment
+
+    Returns:
+        A corrected copy; the original transcript is not modified
+
+    Raises:
+        ValueError: If an edit refers to a segment that does not exist
+    """
+    segments = [dict(segment) for segment in transcript.get("segments", [])]
+    for edit in edits or []:
+        index = edit.get("index")
+        if not isinstance(index, int) or not 0 <= index < len(segments):
+            raise ValueError(f"No segment {index!r} in a transcript of {len(segments)} segments")
+        for field in ("text", "speaker"):
+            if edit.get(field) is not None:
+                segments[index][field] = edit[field]
+
+    renames = speaker_renames or {}
+    if renames:
+        for segment in segments:
+            speaker = segment.get("speaker", "UNKNOWN")
+            segment["speaker"] = renames.get(speaker, speaker)
+
+    speakers = [renames.get(speaker, speaker) for speaker in transcript.get("speakers", [])]
+    for segment in segments:
+        if segment.get("speaker") not in speakers:
+            speakers.append(segment.get("speaker"))
+    logger.info(f"Applied {len(edits or [])} segment edits and {len(renames)} speaker renames")
+    return {
+        **transcript,
+        "segments": segments,
+        "full_text": " ".join(segment.get("text", "").strip() for segment in segments),
+        "speakers": list(dict.fromkeys(speakers))
+    }
+
+
+def timed_segments(segments: List[Dict]) -> List[Dict]:
+    """Segments with start/end in seconds, from formatted H:MM:SS timestamps if needed."""
+    return [
+        {
+            **segment,
+            "start": parse_time(segment.get("start", segment.get("start_time", 0))),
+            "end": parse_time(segment.get("end", segment.get("end_time", 0)))
+        }
+        for segment in segments
+    ]
@@ -0,0 +1,323 @@
+import os
+import re
+import json
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from scripts.format_transcript import parse_time
+from scripts.transcript_store import CompactTranscript
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.getenv("TRANSCRIPT_INDEX_PATH", "output/transcripts.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id TEXT PRIMARY KEY,
+    source TEXT,
+    source_mtime REAL,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS segment_rows (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    speaker TEXT,
+    start REAL,
+    end REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS segment_rows_meeting ON segment_rows (meeting_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text,
+    content='segment_rows',
+    content_rowid='id',
+    tokenize='porter unicode61',
+    prefix='2 3 4'
+);
+CREATE TRIGGER IF NOT EXISTS segment_rows_insert AFTER INSERT ON segment_rows BEGIN
+    INSERT INTO segments (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segment_rows_delete AFTER DELETE ON segment_rows BEGIN
+    INSERT INTO segments (segments, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Transcript files written to the output directory, best source first
+TRANSCRIPT_SUFFIXES = (
+    "_transcript.mct",
+    "_transcript.txt",
+    "_formatted.txt",
+    "_transcript.json",
+    "_formatted.json"
+)
+
+TEXT_LINE = re.compile(r"^\[(?P<start>[\d.]+)s - (?P<end>[\d.]+)s\] (?P<speaker>[^:]*): (?P<text>.*)$")
+QUERY_TERM = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def read_transcript_file(path: Path) -> List[Dict]:
+    """Read segments from any transcript file written to the output directory.
+
+    Args:
+        path: Text (format_transcript), JSON (TranscriptFormatter) or compact file
+
+    Returns:
+        Segments with speaker, text and start/end seconds
+    """
+    if path.suffix == ".mct":
+        with CompactTranscript.load(str(path)) as transcript:
+            return list(transcript)
+
+    if path.suffix == ".json":
+        with open(path) as f:
+            data = json.load(f)
+        return [
+            {
+                "speaker": segment.get("speaker", "UNKNOWN"),
+                "start": parse_time(segment.get("start", segment.get("start_time", 0))),
+                "end": parse_time(segment.get("end", segment.get("end_time", 0))),
+                "text": segment.get("text", "")
+            }
+            for segment in data.get("segments", [])
+        ]
+
+    segments = []
+    with open(path) as f:
+        for line in f:
+            match = TEXT_LINE.match(line.rstrip("\n"))
+            if match:
+                segments.append({
+                    "speaker": match["speaker"],
+                    "start": float(match["start"]),
+                    "end": float(match["end"]),
+                    "text": match["text"]
+                })
+            elif segments and line.strip():
+                # Continuation of a multi-line segment
+                segments[-1]["text"] += " " + line.strip()
+    return segments
+
+
+def to_fts_query(query: str) -> str:
+    """Turn a user query into an FTS5 query.
+
+    Quoted text becomes a phrase, words ending in * become prefix queries,
+    and all other words are matched literally. All terms must match.
+    """
+    terms = []
+    for phrase, word in QUERY_TERM.findall(query):
+        if phrase:
+            terms.append('"' + phrase.replace('"', "") + '"')
+            continue
+        prefix = word.endswith("*")
+        word = re.sub(r"[^\w']", "", word)
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class TranscriptIndex:
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """Initialize the full-text index over transcript segments.
+
+        Args:
+            db_path: SQLite database file holding the index
+        """
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call keeps the index safe to use from any thread
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def index_transcript(
+        self,
+        meeting_id: str,
+        segments: Iterable[Dict],
+        source: Optional[str] = None,
+        source_mtime: Optional[float] = None
+    ) -> int:
+        """Index (or re-index) the segments of one meeting.
+
+        Args:
+            meeting_id: Meeting the segments belong to
+            segments: Segments with text, speaker and start/end seconds
+            source: File the segments were read from, if any
+            source_mtime: Modification time of that file
+
+        Returns:
+            Number of segments indexed
+        """
+        rows = [
+            (
+                meeting_id,
+                segment.get("speaker", "UNKNOWN"),
+                parse_time(segment.get("start", 0)),
+                parse_time(segment.get("end", 0)),
+                segment.get("text", "").strip()
+            )
+            for segment in segments
+        ]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM segment_rows WHERE meeting_id = ?", (meeting_id,))
+                conn.executemany(
+                    "INSERT INTO segment_rows (meeting_id, speaker, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meetings (meeting_id, source, source_mtime, indexed_at) VALUES (?, ?, ?, ?)",
+                    (meeting_id, source, source_mtime, datetime.now().isoformat())
+                )
+        finally:
+            conn.close()
+        logger.info(f"Indexed {len(rows)} transcript segments for {meeting_id}")
+        return len(rows)
+
+    def index_directory(self, output_dir: str = "output") -> int:
+        """Index transcripts in a directory that are new or changed since last time.
+
+        When a meeting has several transcript files, the most precise one
+        (per TRANSCRIPT_SUFFIXES) is used.
+
+        Args:
+            output_dir: Directory with *_transcript.* and *_formatted.* files
+
+        Returns:
+            Number of meetings (re-)indexed
+        """
+        sources = {}
+        for suffix in reversed(TRANSCRIPT_SUFFIXES):
+            for path in Path(output_dir).glob(f"*{suffix}"):
+                sources[path.name[:-len(suffix)]] = path
+
+        conn = self._connect()
+        try:
+            indexed = {
+                row["meeting_id"]: (row["source"], row["source_mtime"])
+                for row in conn.execute("SELECT meeting_id, source, source_mtime FROM meetings")
+            }
+        finally:
+            conn.close()
+
+        count = 0
+        for meeting_id, path in sorted(sources.items()):
+            mtime = path.stat().st_mtime
+            if indexed.get(meeting_id) == (str(path), mtime):
+                continue
+            try:
+                segments = read_transcript_file(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable transcript {path}: {e}")
+                continue
+            self.index_transcript(meeting_id, segments, str(path), mtime)
+            count += 1
+        return count
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        meeting_id: Optional[str] = None,
+        speaker: Optional[str] = None
+    ) -> List[Dict]:
+        """Search transcript segments.
+
+        Args:
+            query: Words, "quoted phrases" and prefix* terms
+            limit: Maximum number of results
+            meeting_id: Only search this meeting
+            speaker: Only search this speaker's segments
+
+        Returns:
+            Matching segments, best first, with meeting, speaker, start/end
+            seconds and a highlighted snippet
+        """
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return []
+
+        sql = """
+            SELECT r.meeting_id, r.speaker, r.start, r.end, r.text,
+                   snippet(segments, 0, '[', ']', '...', 16) AS snippet
+            FROM segments
+            JOIN segment_rows r ON r.id = segments.rowid
+            WHERE segments MATCH ?
+        """
+        params: list = [fts_query]
+        if meeting_id:
+            sql += " AND r.meeting_id = ?"
+            params.append(meeting_id)
+        if speaker:
+            sql += " AND r.speaker = ?"
+            params.append(speaker)
+        sql += " ORDER BY bm25(segments) LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """Report how many meetings and segments are indexed."""
+        conn = self._connect()
+        try:
+            return {
+                "meetings": conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0],
+                "segments": conn.execute("SELECT COUNT(*) FROM segment_rows").fetchone()[0]
+            }
+        finally:
+            conn.close()
+
+
+def main():
+    """Index and search meeting transcripts."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Full-text search over meeting transcripts")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Index database path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Index new and changed transcripts")
+    index_parser.add_argument("output_dir", nargs="?", default="output", help="Directory with transcripts")
+
+    search_parser = subparsers.add_parser("search", help="Search transcripts")
+    search_parser.add_argument("query", help='Words, "phrases" and prefix* terms')
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum results")
+    search_parser.add_argument("--meeting", help="Only search this meeting")
+    search_parser.add_argument("--speaker", help="Only search this speaker")
+
+    args = parser.parse_args()
+    index = TranscriptIndex(args.index)
+
+    if args.command == "index":
+        count = index.index_directory(args.output_dir)
+        print(f"Indexed {count} meetings ({index.stats()['segments']} segments total)")
+    else:
+        start = time.perf_counter()
+        results = index.search(args.query, args.limit, args.meeting, args.speaker)
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results:
+            print(f"{result['meeting_id']} [{result['start']:.1f}s - {result['end']:.1f}s] "
+                  f"{result['speaker']}: {result['snippet']}")
+        print(f"\n{len(results)} results in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import io
+import json
+import mmap
+import struct
+import bisect
+import logging
+from array import array
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCTR"
+VERSION = 1
+
+# magic, version, segment count, speaker table length, text length
+HEADER = struct.Struct("<4sIQQQ")
+
+
+def _pad(length: int) -> int:
+    """Bytes needed to align length to 8."""
+    return -length % 8
+
+
+def _format_time(seconds: float) -> str:
+    """Format seconds like TranscriptFormatter.format_time."""
+    return str(timedelta(seconds=int(seconds)))
+
+
+class CompactTranscript:
+    def __init__(
+        self,
+        starts,
+        ends,
+        speaker_ids,
+        speakers: List[str],
+        text,
+        offsets,
+        buffer: Optional[mmap.mmap] = None
+    ):
+        """Columnar transcript: one array per field and one text buffer.
+
+        Segment i spans starts[i]..ends[i], was said by
+        speakers[speaker_ids[i]] and its UTF-8 text is
+        text[offsets[i]:offsets[i + 1]]. Columns are arrays or memoryviews
+        over a memory-mapped file, so segments are decoded only when read.
+
+        Args:
+            starts: Segment start times in seconds (float64)
+            ends: Segment end times in seconds (float64)
+            speaker_ids: Index into speakers per segment (uint32)
+            speakers: Interned speaker labels
+            text: UTF-8 text of all segments back to back
+            offsets: Byte offset of each segment's text, plus the total length
+            buffer: Memory map backing the columns, if loaded from disk
+        """
+        self.starts = starts
+        self.ends = ends
+        self.speaker_ids = speaker_ids
+        self.speakers = speakers
+        self.text = text
+        self.offsets = offsets
+        self._buffer = buffer
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict]) -> "CompactTranscript":
+        """Build a compact transcript from WhisperX-style segments.
+
+        Args:
+            segments: Segments with start, end, text and optional speaker,
+                in time order; may be a generator
+
+        Returns:
+            Compact transcript
+        """
+        starts = array("d")
+        ends = array("d")
+        speaker_ids = array("I")
+        offsets = array("Q", [0])
+        speakers: List[str] = []
+        speaker_index: Dict[str, int] = {}
+        text = bytearray()
+
+        for segment in segments:
+            speaker = segment.get("speaker", "UNKNOWN")
+            if speaker not in speaker_index:
+                speaker_index[speaker] = len(speakers)
+                speakers.append(speaker)
+            starts.append(float(segment["start"]))
+            ends.append(float(segment["end"]))
+            speaker_ids.append(speaker_index[speaker])
+            text += segment["text"].strip().encode("utf-8")
+            offsets.append(len(text))
+
+        return cls(starts, ends, speaker_ids, speakers, bytes(text), offsets)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for start, end, speaker, text in self.rows():
+            yield {"start": start, "end": end, "speaker": speaker, "text": text}
+
+    def blocks(self, first: int = 0, last: Optional[int] = None, block: int = 4096) -> Iterator[List[Tuple]]:
+        """Yield lists of (start, end, speaker, text) tuples for segments first..last.
+
+        Columns are copied out a block at a time, which is much cheaper than
+        indexing the memory map once per field and segment while still
+        keeping memory use independent of transcript length.
+        """
+        last = len(self) if last is None else last
+        for block_start in range(first, last, block):
+            block_end = min(block_start + block, last)
+            offsets = self.offsets[block_start:block_end + 1].tolist()
+            base = offsets[0]
+            text = bytes(self.text[base:offsets[-1]])
+            yield [
+                (start, end, self.speakers[speaker_id], text[a - base:b - base].decode("utf-8"))
+                for start, end, speaker_id, a, b in zip(
+                    self.starts[block_start:block_end].tolist(),
+                    self.ends[block_start:block_end].tolist(),
+                    self.speaker_ids[block_start:block_end].tolist(),
+                    offsets,
+                    offsets[1:]
+                )
+            ]
+
+    def rows(self, first: int = 0, last: Optional[int] = None) -> Iterator[Tuple]:
+        """Yield (start, end, speaker, text) tuples for segments first..last."""
+        for rows in self.blocks(first, last):
+            yield from rows
+
+    def __getitem__(self, i: int) -> Dict:
+        """Decode a single segment."""
+        return {
+            "start": self.starts[i],
+            "end": self.ends[i],
+            "speaker": self.speakers[self.speaker_ids[i]],
+            "text": self.segment_text(i)
+        }
+
+    def segment_text(self, i: int) -> str:
+        """Decode the text of a single segment."""
+        return bytes(self.text[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def between(self, start_time: float, end_time: float) -> Iterator[Dict]:
+        """Yield the segments that start within [start_time, end_time).
+
+        Uses binary search over the start column, so only the matching
+        segments are touched.
+        """
+        first = bisect.bisect_left(self.starts, start_time)
+        last = bisect.bisect_left(self.starts, end_time)
+        for start, end, speaker, text in self.rows(first, last):
+            yield {"start": start, "end": end, "speaker": speaker, "text": text}
+
+    def save(self, path: str) -> str:
+        """Write the binary format.
+
+        Layout: header, speaker table (JSON), then 8-byte aligned starts,
+        ends, offsets and speaker_ids columns, then the text buffer.
+
+        Args:
+            path: Output path
+
+        Returns:
+            Path to saved file
+        """
+        speakers = json.dumps(self.speakers).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self), len(speakers), len(self.text)))
+            f.write(speakers + b"\0" * _pad(len(speakers)))
+            for column in (self.starts, self.ends, self.offsets):
+                f.write(memoryview(column).cast("B"))
+            ids = memoryview(self.speaker_ids).cast("B")
+            f.write(ids)
+            f.write(b"\0" * _pad(len(ids)))
+            f.write(self.text)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "CompactTranscript":
+        """Memory-map a transcript saved with save().
+
+        Nothing but the header and speaker table is read up front; columns
+        and text are paged in as they are accessed.
+
+        Args:
+            path: Path to a compact transcript file
+
+        Returns:
+            Compact transcript backed by the memory map
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+
+        magic, version, count, speakers_len, text_len = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a compact transcript (version {VERSION}): {path}")
+
+        position = HEADER.size
+        speakers = json.loads(bytes(view[position:position + speakers_len]))
+        position += speakers_len + _pad(speakers_len)
+
+        def column(fmt: str, length: int, item_size: int):
+            nonlocal position
+            size = length * item_size
+            data = view[position:position + size].cast(fmt)
+            position += size + _pad(size)
+            return data
+
+        starts = column("d", count, 8)
+        ends = column("d", count, 8)
+        offsets = column("Q", count + 1, 8)
+        speaker_ids = column("I", count, 4)
+        text = view[position:position + text_len]
+        return cls(starts, ends, speaker_ids, speakers, text, offsets, buffer)
+
+    def close(self):
+        """Release the memory map, if any."""
+        if self._buffer is not None:
+            for column in (self.starts, self.ends, self.offsets, self.speaker_ids, self.text):
+                column.release()
+            self._buffer.close()
+            self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def iter_text(self) -> Iterator[str]:
+        """Render lines in the format of format_transcript(), one block at a time."""
+        for rows in self.blocks():
+            yield "".join([
+                f"[{start:.2f}s - {end:.2f}s] {speaker}: {text}\n"
+                for start, end, speaker, text in rows
+            ])
+
+    def iter_json(self) -> Iterator[str]:
+        """Render TranscriptFormatter's JSON structure as a stream of chunks."""
+        yield '{"segments": ['
+        for i, rows in enumerate(self.blocks()):
+            chunk = json.dumps([
+                {
+                    "speaker": speaker,
+                    "start_time": _format_time(start),
+                    "end_time": _format_time(end),
+                    "text": text
+                }
+                for start, end, speaker, text in rows
+            ])
+            yield ("," if i else "") + chunk[1:-1]
+        yield '], "full_text": "'
+        # Escape the text buffer block by block instead of joining it all
+        for i, rows in enumerate(self.blocks()):
+            yield (" " if i else "") + json.dumps(" ".join(row[3] for row in rows))[1:-1]
+        yield f'", "speakers": {json.dumps(self.speakers)}}}\n'
+
+    def write_text(self, f: io.TextIOBase):
+        """Stream the text rendering into a file object."""
+        f.writelines(self.iter_text())
+
+    def write_json(self, f: io.TextIOBase):
+        """Stream the JSON rendering into a file object."""
+        f.writelines(self.iter_json())
@@ -0,0 +1,160 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("TRANSCRIPTION_CACHE_DIR", ".cache/transcriptions")
+DEFAULT_MAX_SIZE_MB = int(os.getenv("TRANSCRIPTION_CACHE_MB", "1024"))
+
+
+def _to_builtin(value):
+    """Convert numpy scalars left in WhisperX output to JSON types."""
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TranscriptionCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: int = DEFAULT_MAX_SIZE_MB):
+        """Initialize the on-disk transcription cache.
+
+        Entries are stored one JSON file per key. The file modification time
+        doubles as the last access time for LRU eviction.
+
+        Args:
+            cache_dir: Directory to store cached transcriptions in
+            max_size_mb: Maximum total size of the cache in MB
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def hash_audio(audio_path: str) -> str:
+        """Hash the content of an audio file.
+
+        Args:
+            audio_path: Path to audio file
+
+        Returns:
+            Hex SHA-256 digest of the file content
+        """
+        digest = hashlib.sha256()
+        with open(audio_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(audio_hash: str, **params) -> str:
+        """Build a cache key from the audio hash and transcription parameters.
+
+        Args:
+            audio_hash: Content hash of the audio
+            **params: Every parameter that affects the transcription result
+
+        Returns:
+            Cache key
+        """
+        payload = json.dumps({"audio": audio_hash, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Look up a cached transcription.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached transcription, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += entry.get("compute_seconds", 0.0)
+        logger.info(f"Cache hit in {self.cache_dir}, saved {entry.get('compute_seconds', 0.0):.1f}s")
+        return entry["result"]
+
+    def put(self, key: str, result: Dict, compute_seconds: float):
+        """Store a transcription and evict old entries over the size limit.
+
+        Args:
+            key: Cache key from make_key
+            result: Transcription to store
+            compute_seconds: Time it took to compute the transcription
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"result": result, "compute_seconds": compute_seconds},
+                    f,
+                    default=_to_builtin
+                )
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its limit."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            logger.info(f"Evicted cached transcription {path.stem}")
+
+    def stats(self) -> Dict:
+        """Report hit/miss counts, compute time saved and cache size."""
+        sizes = [path.stat().st_size for path in self.cache_dir.glob("*.json")]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 1),
+                "entries": len(sizes),
+                "size_mb": round(sum(sizes) / 1024 / 1024, 2),
+                "max_size_mb": self.max_size_bytes // (1024 * 1024)
+            }
@@ -1,72 +1,345 @@
 import chromadb
-from chromadb.utils import embedding_functions
+from chromadb.api.types import EmbeddingFunction
 import os
+import re
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import json
-from openai import OpenAI
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from scripts.llm_cache import get_llm_cache
+from scripts.llm_scheduler import INTERACTIVE, get_scheduler
+from scripts.llm_backend import get_llm_client
+from scripts.embeddings import OPENAI_EMBEDDING_MODEL, ScheduledEmbeddingFunction, create_embedding_function
+from scripts.meeting_rollup import MeetingRollup
+from scripts.speaker_profiles import REFRESH_INTERVAL, SpeakerProfiles
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keys MeetingAnalyzer adds to an analysis that describe the run, not the meeting
+RUN_METADATA_KEYS = ("agent_timings", "agent_errors", "llm_usage", "prompt_encoding", "provenance")
+# Documents per collection insert
+ADD_BATCH_SIZE = int(os.getenv("MEMORY_ADD_BATCH_SIZE", "4096"))
+# Directory of the on-disk store (documents in SQLite, HNSW index files per collection)
+MEMORY_DIR = os.getenv("MEMORY_DIR", "output/memory")
+COLLECTION_NAME = "meeting_memories"
+
+
+def document_id(meeting_id: str, section: str, text: str) -> str:
+    """Stable ID of a stored document, the same in every process."""
+    digest = hashlib.sha256(f"{meeting_id}\0{section}\0{text}".encode("utf-8")).hexdigest()
+    return f"{meeting_id}_{section}_{digest[:32]}"
+
+
+def meeting_time(meeting_id: str, analysis: Dict) -> Optional[str]:
+    """When a meeting took place, from its analysis or its ID (meeting_YYYYMMDD_HHMMSS).
+
+    Returns:
+        ISO timestamp, or None if neither records it
+    """
+    candidates = [analysis.get("timestamp")]
+    match = re.search(r"(\d{8}_\d{6})", meeting_id)
+    if match:
+        candidates.append(match.group(1))
+    for value in candidates:
+        if not isinstance(value, str):
+            continue
+        for parse in (datetime.fromisoformat, lambda text: datetime.strptime(text, "%Y%m%d_%H%M%S")):
+            try:
+                return parse(value).isoformat()
+            except ValueError:
+                pass
+    return None
+
+
+def collection_name(embedding_function: EmbeddingFunction) -> str:
+    """Collection holding the vectors of an embedding function.
+
+    Each embedding model, and each LLM backend serving one, gets its own
+    collection, as vectors of different models cannot be compared; the
+    OpenAI default keeps the original name.
+    """
+    space = getattr(embedding_function, "space", None) or getattr(embedding_function, "model_name", "")
+    if isinstance(embedding_function, ScheduledEmbeddingFunction) and space == OPENAI_EMBEDDING_MODEL:
+        return COLLECTION_NAME
+    # Chroma allows 3-63 characters of [a-zA-Z0-9._-]
+    return f"{COLLECTION_NAME}_{re.sub(r'[^a-zA-Z0-9._-]+', '-', space)}"[:63].rstrip("._-")
+
+
 class MeetingMemory:
-    def __init__(self):
-        """Initialize the meeting memory with ChromaDB."""
-        self.client = chromadb.Client()
-        self.embedding_function = embedding_functions.OpenAIEmbeddingFunction(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            model_name="text-embedding-ada-002"
+    def __init__(
+        self,
+        persist_directory: Optional[str] = MEMORY_DIR,
+        embedding_function: Optional[EmbeddingFunction] = None
+    ):
+        """Initialize the meeting memory with ChromaDB.
+
+        The store is opened on first use, so creating a MeetingMemory is
+        cheap; Chroma then loads the collection's HNSW index from disk the
+        first time it is queried.
+
+        Args:
+            persist_directory: Directory of the on-disk store, or None to keep
+                memory in-process only
+            embedding_function: Embedding function (default: the EMBEDDING_BACKEND one)
+        """
+        self.persist_directory = persist_directory
+        self.scheduler = get_scheduler()
+        # Chat and embedding requests go to the LLM_BACKEND backend
+        self.openai_client = get_llm_client()
+        self.embedding_function = embedding_function or create_embedding_function(
+            client=self.openai_client,
+            scheduler=self.scheduler
         )
-        self.collection = self.client.get_or_create_collection(
-            name="meeting_memories",
-            embedding_function=self.embedding_function
+        self.llm_cache = get_llm_cache()
+        self._client = None
+        self._collection = None
+        self._lock = threading.Lock()
+        # Day/week/month summaries and speaker profiles, updated in order by one background worker
+        state_dir = persist_directory or tempfile.mkdtemp(prefix="meeting_memory_")
+        self.rollup = MeetingRollup(os.path.join(state_dir, "rollup.db"), self._complete)
+        self.profiles = SpeakerProfiles(os.path.join(state_dir, "speaker_profiles.db"), self._complete)
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-update")
+        self._refresher = None
+        self._stop_refresher = threading.Event()
+
+    @property
+    def client(self):
+        """The Chroma client, opening the store on first access."""
+        with self._lock:
+            if self._client is None:
+                if self.persist_directory is None:
+                    self._client = chromadb.Client()
+                else:
+                    Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
+                    self._client = chromadb.PersistentClient(path=self.persist_directory)
+                    logger.info(f"Opened meeting memory in {self.persist_directory}")
+            return self._client
+
+    @property
+    def collection(self):
+        """The collection of the embedding function, created if needed."""
+        client = self.client
+        with self._lock:
+            if self._collection is None:
+                self._collection = client.get_or_create_collection(
+                    name=collection_name(self.embedding_function),
+                    embedding_function=self.embedding_function
+                )
+            return self._collection
+
+    def _complete(self, messages: List[Dict], model: str = "gpt-4", temperature: float = 0.3) -> str:
+        """Chat completion, reusing the cached response to identical messages."""
+        return self.llm_cache.cached_call(
+            model,
+            messages,
+            temperature,
+            lambda: self.scheduler.chat(
+                self.openai_client,
+                model=model,
+                messages=messages,
+                temperature=temperature
+            ).choices[0].message.content
         )
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-    def add_meeting(self, summary_json, meeting_id=None):
-        """Add a meeting summary to memory."""
-        if meeting_id is None:
-            meeting_id = f"meeting_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+    @staticmethod
+    def _documents(summary_json: Dict, meeting_id: str, timestamp: Optional[str] = None) -> List[Tuple[str, str, Dict]]:
+        """(id, document, metadata) for each stored part of a meeting analysis."""
+        timestamp = timestamp or datetime.now().isoformat()
+        documents = []
         # Process each section of the summary
         for section, content in summary_json.items():
-            if isinstance(content, list):
-                for item in content:
-                    text = str(item)
-                    # Extract speaker/owner information
-                    speaker = item.get("speaker") or item.get("owner") or "Unknown"
-                    self.collection.add(
-                        documents=[text],
-                        metadatas=[{
-                            "meeting_id": meeting_id,
-                            "section": section,
-                            "speaker": speaker,
-                            "timestamp": datetime.now().isoformat()
-                        }],
-                        ids=[f"{meeting_id}_{section}_{hash(text) % 100000}"]
-                    )
-            else:
-                self.collection.add(
-                    documents=[str(content)],
-                    metadatas=[{
+            # Skip run metadata and sections whose agent failed
+            if section in RUN_METADATA_KEYS or content is None:
+                continue
+            items = content if isinstance(content, list) else [content]
+            for item in items:
+                text = str(item)
+                # Extract speaker/owner information
+                if isinstance(content, list):
+                    speaker = (item.get("speaker") or item.get("owner") if isinstance(item, dict) else None) or "Unknown"
+                else:
+                    speaker = "general"
+                documents.append((
+                    document_id(meeting_id, section, text),
+                    text,
+                    {
                         "meeting_id": meeting_id,
                         "section": section,
-                        "speaker": "general",
-                        "timestamp": datetime.now().isoformat()
-                    }],
-                    ids=[f"{meeting_id}_{section}_{hash(str(content)) % 100000}"]
-                )
-        
+                        "speaker": speaker,
+                        "timestamp": timestamp
+                    }
+                ))
+        return documents
+
+    def add_meetings(
+        self,
+        meetings: Dict[str, Dict],
+        batch_size: int = ADD_BATCH_SIZE,
+        timestamps: Optional[Dict[str, str]] = None
+    ) -> int:
+        """Add many meeting analyses to memory with bulk embedding and insertion.
+
+        Documents of all meetings are gathered, embedded EMBEDDING_BATCH_SIZE
+        texts per request and inserted batch_size at a time, instead of one
+        request and one write per item. Documents are upserted under content
+        hashes, so adding a meeting again replaces its documents instead of
+        duplicating them.
+
+        Args:
+            meetings: Meeting ID -> analysis
+            batch_size: Documents per insert (and per embedding call made by it)
+            timestamps: Meeting ID -> ISO time to store instead of now
+
+        Returns:
+            Number of documents stored
+        """
+        documents = {}
+        for meeting_id, summary_json in meetings.items():
+            timestamp = (timestamps or {}).get(meeting_id)
+            for doc_id, text, metadata in self._documents(summary_json, meeting_id, timestamp):
+                # Identical items of a section are stored once
+                documents.setdefault(doc_id, (text, metadata))
+        ids = list(documents)
+        if hasattr(self.client, "get_max_batch_size"):
+            # Chroma rejects larger inserts (chromadb < 0.4.10 has no limit to ask for)
+            batch_size = min(batch_size, self.client.get_max_batch_size())
+        for offset in range(0, len(ids), batch_size):
+            batch = ids[offset:offset + batch_size]
+            self.collection.upsert(
+                ids=batch,
+                documents=[documents[doc_id][0] for doc_id in batch],
+                metadatas=[documents[doc_id][1] for doc_id in batch]
+            )
+        logger.info(f"Upserted {len(ids)} documents from {len(meetings)} meetings to memory")
+        self._in_background(self.rollup.update, meetings, timestamps)
+        self._in_background(self._update_profiles, documents, timestamps)
+        return len(ids)
+
+    def _update_profiles(self, documents: Dict[str, Tuple[str, Dict]], timestamps: Optional[Dict[str, str]]):
+        """Revise the profiles of the speakers of newly added documents."""
+        contributions = {}
+        for text, metadata in documents.values():
+            if metadata["speaker"] in ("general", "Unknown"):
+                continue
+            contributions.setdefault(metadata["meeting_id"], {}).setdefault(metadata["speaker"], []).append(text)
+        if contributions:
+            now = datetime.now().isoformat()
+            self.profiles.add_meetings(
+                contributions,
+                {meeting_id: (timestamps or {}).get(meeting_id) or now for meeting_id in contributions}
+            )
+
+    def add_meeting(self, summary_json, meeting_id=None):
+        """Add a meeting summary to memory."""
+        if meeting_id is None:
+            meeting_id = f"meeting_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.add_meetings({meeting_id: summary_json})
         logger.info(f"Added meeting {meeting_id} to memory")
         return meeting_id
 
+    def remove_meeting(self, meeting_id):
+        """Remove everything stored for a meeting, e.g. before storing a re-analysis."""
+        self.collection.delete(where={"meeting_id": meeting_id})
+        self._in_background(self.rollup.remove, meeting_id)
+        self._in_background(self.profiles.remove_meeting, meeting_id)
+        logger.info(f"Removed meeting {meeting_id} from memory")
+
+    def _in_background(self, update, *args) -> Future:
+        """Queue a rollup or profile update; their model calls do not hold up ingestion."""
+        def run():
+            try:
+                return update(*args)
+            except Exception as e:
+                logger.error(f"Memory update {update.__name__} failed: {e}")
+                raise
+
+        return self._worker.submit(run)
+
+    def wait_for_background(self):
+        """Block until queued rollup and profile updates are done."""
+        self._worker.submit(lambda: None).result()
+
+    def start_profile_refresher(self, interval: float = REFRESH_INTERVAL):
+        """Rebuild stale speaker profiles every interval seconds, in the background."""
+        if self._refresher is not None:
+            return
+
+        def run():
+            while not self._stop_refresher.wait(interval):
+                # On the update worker, so a refresh never races an incremental update
+                self._in_background(self.profiles.refresh_stale)
+
+        self._refresher = threading.Thread(target=run, name="speaker-profile-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_profile_refresher(self):
+        """Stop the background profile refresh."""
+        self._stop_refresher.set()
+
+    def clear(self):
+        """Delete everything in memory."""
+        # Make sure it exists: deleting a missing collection raises, with a
+        # different exception type depending on the chromadb version
+        self.collection
+        with self._lock:
+            self._client.delete_collection(self._collection.name)
+            self._collection = None
+        self._in_background(self.rollup.clear)
+        self._in_background(self.profiles.clear)
+        logger.info("Cleared meeting memory")
+
+    def rebuild(self, output_dir: str = "output") -> int:
+        """Replace memory with the analyses saved in a directory.
+
+        Meetings are re-ingested in bulk through add_meetings, dated by the
+        time in their analysis or meeting ID, else by when their analysis
+        file was last written.
+
+        Args:
+            output_dir: Directory with *_analysis.json files
+
+        Returns:
+            Number of meetings added
+        """
+        suffix = "_analysis.json"
+        meetings = {}
+        timestamps = {}
+        for path in sorted(Path(output_dir).glob(f"*{suffix}")):
+            try:
+                with open(path) as f:
+                    analysis = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable analysis {path}: {e}")
+                continue
+            if not isinstance(analysis, dict):
+                logger.warning(f"Skipping {path}: not a meeting analysis")
+                continue
+            meeting_id = path.name[:-len(suffix)]
+            meetings[meeting_id] = analysis
+            timestamps[meeting_id] = (
+                meeting_time(meeting_id, analysis) or datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            )
+
+        self.clear()
+        documents = self.add_meetings(meetings, timestamps=timestamps)
+        self.wait_for_background()
+        logger.info(f"Rebuilt meeting memory from {len(meetings)} analyses ({documents} documents)")
+        return len(meetings)
+
     def search_meetings(self, query, n_results=5):
         """Search through meeting memories."""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
+        # Someone is waiting on the query embedding; let it ahead of bulk work
+        with self.scheduler.priority(INTERACTIVE):
+            results = self.collection.query(
+                query_texts=[query],
+                n_results=n_results
+            )
         
         formatted_results = []
         for i in range(len(results["documents"][0])):
@@ -107,60 +380,107 @@ class MeetingMemory:
         
         return formatted_results
 
-    def summarize_all_meetings(self):
-        """Generate a summary of all meetings."""
-        results = self.collection.get()
-        if not results["documents"]:
-            return "No meetings found in memory."
+    def _backfill_rollup(self):
+        """Roll up meetings missing from the rollup now, from their documents.
 
-        # Combine all meeting content
-        all_text = "\n".join(results["documents"])
-        
-        # Generate summary using GPT-4
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a meeting analyst. Create a comprehensive summary of the following meeting content, highlighting key decisions, action items, and important discussions."},
-                {"role": "user", "content": f"Summarize the following meeting content:\n{all_text}"}
-            ],
-            temperature=0.3
-        )
-        
-        return response.choices[0].message.content
+        Runs on the calling thread at INTERACTIVE priority instead of queuing
+        behind background updates.
+        """
+        digested = set(self.rollup.meeting_ids())
+        results = self.collection.get(include=["documents", "metadatas"])
+        meetings = {}
+        timestamps = {}
+        for text, metadata in zip(results["documents"], results["metadatas"]):
+            meeting_id = metadata["meeting_id"]
+            if meeting_id in digested:
+                continue
+            meetings.setdefault(meeting_id, {}).setdefault(metadata["section"], []).append(text)
+            timestamps[meeting_id] = metadata.get("timestamp")
+        if meetings:
+            logger.info(f"Rolling up {len(meetings)} meetings missing from the rollup")
+            with self.scheduler.priority(INTERACTIVE):
+                self.rollup.update(meetings, timestamps)
+
+    def summarize_all_meetings(self, period: str = "all"):
+        """Return the summary of all meetings, or of one period.
+
+        Summaries are kept up to date as meetings are added (see
+        scripts/meeting_rollup.py), so this reads a stored row instead of
+        sending the whole history to the model.
+
+        Args:
+            period: "all", or a key such as "month:2024-05", "week:2024-W19"
+                or "day:2024-05-07"
+        """
+        summary = self.rollup.summary(period)
+        if summary is None and period == "all" and self.collection.count():
+            # The store predates the rollup, or its first update is still queued
+            self._backfill_rollup()
+            summary = self.rollup.summary(period)
+        return summary or "No meetings found in memory."
+
+    def _backfill_profile(self, speaker_name: str):
+        """Build a speaker's profile now from their stored documents.
+
+        Runs on the calling thread at INTERACTIVE priority instead of queuing
+        behind background updates. Contributions a queued update stores later
+        are already there, so they do not revise the profile twice.
+        """
+        history = self.get_speaker_history(speaker_name)
+        if not history:
+            return
+        for item in history:
+            metadata = item["metadata"]
+            self.profiles.store_contributions(
+                metadata["meeting_id"], speaker_name, [item["text"]], metadata.get("timestamp") or ""
+            )
+        logger.info(f"Building the profile of {speaker_name} from {len(history)} stored contributions")
+        with self.scheduler.priority(INTERACTIVE):
+            self.profiles.refresh(speaker_name)
+
+    def get_speaker_profile(self, speaker_name) -> Optional[Dict]:
+        """Return the stored profile of a speaker with its staleness metadata.
+
+        Profiles are revised as meetings are added (see
+        scripts/speaker_profiles.py), so this reads a stored row instead of
+        sending the speaker's whole history to the model. A speaker with
+        stored documents but no profile (the store predates profiles, or
+        their first update is still queued or failed) is profiled on the
+        spot; an unknown speaker costs one lookup.
+
+        Returns:
+            Dict with summary, meetings, contributions, last_meeting,
+            updated/refreshed times, updates_since_refresh and stale; None
+            if the speaker has no contributions
+        """
+        profile = self.profiles.get(speaker_name)
+        if profile is None:
+            self._backfill_profile(speaker_name)
+            profile = self.profiles.get(speaker_name)
+        return profile
 
     def get_speaker_summary(self, speaker_name):
-        """Generate a summary of all contributions from a specific speaker."""
-        speaker_history = self.get_speaker_history(speaker_name)
-        if not speaker_history:
+        """Return the summary of all contributions from a specific speaker."""
+        profile = self.get_speaker_profile(speaker_name)
+        if profile is None:
             return f"No contributions found for {speaker_name}."
-
-        # Combine all speaker contributions
-        all_text = "\n".join([item["text"] for item in speaker_history])
-        
-        # Generate summary using GPT-4
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": f"You are a meeting analyst. Create a comprehensive summary of {speaker_name}'s contributions across all meetings, highlighting their key decisions, action items, and important discussions."},
-                {"role": "user", "content": f"Summarize the following contributions:\n{all_text}"}
-            ],
-            temperature=0.3
-        )
-        
-        return response.choices[0].message.content
+        return profile["summary"]
 
 def main():
     """Example usage of the MeetingMemory class."""
     import argparse
     
     parser = argparse.ArgumentParser(description="Meeting Memory Management")
-    parser.add_argument("--action", choices=["add", "search", "history", "summary", "speaker"], required=True)
+    parser.add_argument("--action", choices=["add", "search", "history", "summary", "speaker", "rebuild", "refresh-profiles"], required=True)
     parser.add_argument("--query", help="Search query or meeting ID")
     parser.add_argument("--file", help="JSON file containing meeting summary")
     parser.add_argument("--speaker", help="Speaker name for speaker-specific operations")
+    parser.add_argument("--period", default="all", help='Period to summarize, e.g. "month:2024-05" or "week:2024-W19"')
+    parser.add_argument("--output-dir", default="output", help="Directory with *_analysis.json files to rebuild from")
+    parser.add_argument("--data-dir", default=MEMORY_DIR, help="Directory of the on-disk store")
     
     args = parser.parse_args()
-    memory = MeetingMemory()
+    memory = MeetingMemory(args.data_dir)
     
     if args.action == "add" and args.file:
         with open(args.file, "r") as f:
@@ -168,6 +488,14 @@ def main():
         meeting_id = memory.add_meeting(summary)
         print(f"Added meeting with ID: {meeting_id}")
     
+    elif args.action == "refresh-profiles":
+        count = memory.profiles.refresh_stale()
+        print(f"Refreshed {count} stale speaker profiles")
+    
+    elif args.action == "rebuild":
+        count = memory.rebuild(args.output_dir)
+        print(f"Rebuilt memory from {count} meetings ({memory.collection.count()} documents)")
+    
     elif args.action == "search" and args.query:
         results = memory.search_meetings(args.query)
         print("\nSearch Results:")
@@ -186,8 +514,8 @@ def main():
             print(f"Speaker: {result['metadata']['speaker']}")
     
     elif args.action == "summary":
-        summary = memory.summarize_all_meetings()
-        print("\nAll Meetings Summary:")
+        summary = memory.summarize_all_meetings(args.period)
+        print(f"\nMeetings Summary ({args.period}):")
         print(summary)
     
     elif args.action == "speaker" and args.speaker:
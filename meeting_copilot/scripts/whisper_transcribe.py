@@ -1,33 +1,190 @@
 import os
+import time
 import torch
 import whisperx
 import logging
-from typing import Dict, List, Optional
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
+from scripts.inference_profile import resolve_settings
+from scripts.audio_io import SAMPLE_RATE, iter_audio_windows, load_audio
+from scripts.model_registry import ModelRegistry, get_registry
+from scripts.transcription_cache import TranscriptionCache
+
 # Load environment variables
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def build_transcription(segments: Iterable[Dict]) -> Dict:
+    """Assemble the transcription dict returned by the transcriber.
+    
+    Args:
+        segments: Diarized WhisperX segments
+        
+    Returns:
+        Dict with segments, the ordered list of speakers and the full text
+    """
+    segments = list(segments)
+    speakers = []
+    for segment in segments:
+        speaker = segment.get("speaker")
+        if speaker and speaker not in speakers:
+            speakers.append(speaker)
+    return {
+        "segments": segments,
+        "speakers": speakers,
+        "text": " ".join(segment["text"].strip() for segment in segments)
+    }
+
+class SpeakerTracker:
+    def __init__(self, context_seconds: float = 30.0):
+        """Keep diarization speaker labels stable across audio windows.
+        
+        Each window is diarized together with the tail of the previous one.
+        Local labels are mapped to global labels by how much they overlap the
+        already-labelled turns in that shared tail.
+        
+        Args:
+            context_seconds: Length of the audio shared between windows
+        """
+        self.context_seconds = context_seconds
+        self.turns = []
+        self.next_id = 0
+        
+    def _new_label(self) -> str:
+        label = f"SPEAKER_{self.next_id:02d}"
+        self.next_id += 1
+        return label
+        
+    def relabel(self, diarize_segments, context_start: float, window_start: float):
+        """Rewrite local diarization labels as global ones.
+        
+        Args:
+            diarize_segments: Diarization DataFrame with start, end and speaker
+                columns, relative to context_start
+            context_start: Absolute start time of the diarized audio
+            window_start: Absolute start time of the new (non-shared) audio
+            
+        Returns:
+            Relabelled copy of diarize_segments
+        """
+        diarize_segments = diarize_segments.copy()
+        local_turns = [
+            (context_start + start, context_start + end, speaker)
+            for start, end, speaker in zip(
+                diarize_segments["start"],
+                diarize_segments["end"],
+                diarize_segments["speaker"]
+            )
+        ]
+        
+        # Overlap between local and global speakers inside the shared tail
+        overlaps = {}
+        for start, end, local in local_turns:
+            if start >= window_start:
+                continue
+            for g_start, g_end, global_label in self.turns:
+                overlap = min(end, g_end, window_start) - max(start, g_start)
+                if overlap > 0:
+                    pair = (local, global_label)
+                    overlaps[pair] = overlaps.get(pair, 0.0) + overlap
+        
+        mapping = {}
+        used = set()
+        for (local, global_label), _ in sorted(overlaps.items(), key=lambda kv: -kv[1]):
+            if local not in mapping and global_label not in used:
+                mapping[local] = global_label
+                used.add(global_label)
+        for _, _, local in local_turns:
+            if local not in mapping:
+                mapping[local] = self._new_label()
+        
+        diarize_segments["speaker"] = diarize_segments["speaker"].map(mapping)
+        
+        # Only turns that can fall into the next shared tail are kept
+        self.turns = [
+            (start, end, mapping[local])
+            for start, end, local in local_turns
+            if end > window_start
+        ]
+        return diarize_segments
+
 class WhisperTranscriber:
-    def __init__(self, model_name: str = "large-v2", device: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = "large-v2",
+        device: Optional[str] = None,
+        align: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        language: str = "en",
+        batch_size: Optional[int] = None,
+        compute_type: Optional[str] = None,
+        cpu_threads: Optional[int] = None,
+        min_speakers: int = 1,
+        max_speakers: int = 10,
+        cache: Optional[TranscriptionCache] = None,
+        use_cache: bool = True
+    ):
         """Initialize the WhisperX transcriber.
         
         Args:
             model_name: Whisper model to use
             device: Device to run inference on (cuda/cpu)
+            align: Whether to align words to audio before speaker assignment
+            registry: Model registry to share loaded models through
+                (defaults to the process-wide registry)
+            language: Language of the audio
+            batch_size: Batch size for Whisper inference
+            compute_type: CTranslate2 compute type (float16, int8, int8_float32, ...)
+            cpu_threads: Threads used for CPU inference
+                (batch_size, compute_type and cpu_threads default to this
+                host's calibrated inference profile, see inference_profile.py)
+            min_speakers: Minimum number of speakers for diarization
+            max_speakers: Maximum number of speakers for diarization
+            cache: Transcription cache to use (defaults to the on-disk cache
+                configured by TRANSCRIPTION_CACHE_DIR)
+            use_cache: Whether to cache transcriptions at all
         """
+        self.model_name = model_name
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        logger.info(f"Using device: {self.device}")
+        self.align = align
+        self.registry = registry or get_registry()
+        self.language = language
+        
+        settings = resolve_settings(model_name, self.device, compute_type, batch_size, cpu_threads)
+        self.compute_type = settings["compute_type"]
+        self.batch_size = settings["batch_size"]
+        self.cpu_threads = settings["cpu_threads"]
+        if self.device == "cpu" and self.cpu_threads:
+            torch.set_num_threads(self.cpu_threads)
+        self.min_speakers = min_speakers
+        self.max_speakers = max_speakers
+        self.cache = (cache or TranscriptionCache()) if use_cache else None
+        logger.info(
+            f"Using device: {self.device} (compute_type={self.compute_type}, "
+            f"batch_size={self.batch_size}, cpu_threads={self.cpu_threads})"
+        )
+        
+        # Load WhisperX model up front (shared with other transcribers in this process)
+        self.load_model()
+        
+    def load_model(self):
+        """Fetch the WhisperX ASR model from the registry.
         
-        # Load WhisperX model
-        self.model = whisperx.load_model(
-            model_name,
+        Each transcription call fetches the model once and holds it until it
+        returns; no reference is kept between calls, so a model evicted from
+        the registry is released once the calls using it return.
+        """
+        return self.registry.get_asr_model(
+            self.model_name,
             self.device,
-            compute_type="float16" if self.device == "cuda" else "float32"
+            self.compute_type,
+            cpu_threads=self.cpu_threads
         )
         
     def transcribe(self, audio_path: str) -> Dict:
@@ -42,42 +199,211 @@ class WhisperTranscriber:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
             
+        # Reuse an earlier result for the same audio and settings
+        audio_hash = TranscriptionCache.hash_audio(audio_path)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(audio_hash, **self.cache_params())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
         logger.info(f"Transcribing {audio_path}")
+        start = time.perf_counter()
         
-        # Transcribe audio
-        result = self.model.transcribe(
-            audio_path,
-            batch_size=16,
-            language="en"
-        )
-        
-        # Get Hugging Face token from environment
-        hf_token = os.getenv("HUGGINGFACE_TOKEN")
-        if not hf_token:
-            logger.warning("No Hugging Face token found. Diarization may not work.")
-            logger.warning("Set HUGGINGFACE_TOKEN in .env file or environment variables.")
+        # Decode once; ASR and diarization share the same samples
+        audio = load_audio(audio_path, audio_hash=audio_hash)
         
-        # Load diarization model
-        diarize_model = whisperx.DiarizationPipeline(
-            use_auth_token=hf_token,
-            device=self.device
+        # Load models (cached after the first call), held until this call returns
+        model = self.load_model()
+        diarize_model = self.registry.get_diarization_model(
+            self.device,
+            self._get_hf_token()
         )
         
-        # Get diarization results
-        diarize_segments = diarize_model(
-            audio_path,
-            min_speakers=1,
-            max_speakers=10
-        )
+        # Run ASR and diarization concurrently; they only meet for speaker assignment
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            asr_future = pool.submit(self.recognize, audio, model)
+            diarize_future = pool.submit(
+                diarize_model,
+                audio,
+                min_speakers=self.min_speakers,
+                max_speakers=self.max_speakers
+            )
+            result = asr_future.result()
+            diarize_segments = diarize_future.result()
         
         # Assign speaker labels
         result = whisperx.assign_word_speakers(diarize_segments, result)
         
+        transcription = build_transcription(result["segments"])
+        if cache_key is not None:
+            self.cache.put(cache_key, transcription, time.perf_counter() - start)
+        return transcription
+        
+    def recognize(self, audio: np.ndarray, model=None) -> Dict:
+        """Run Whisper on decoded samples, aligning words if enabled.
+        
+        Args:
+            audio: 16 kHz mono float32 samples
+            model: ASR model already held by the caller (fetched from the
+                registry if not given)
+            
+        Returns:
+            WhisperX result with segments relative to the start of audio
+        """
+        model = model or self.load_model()
+        result = model.transcribe(
+            audio,
+            batch_size=self.batch_size,
+            language=self.language
+        )
+        
+        # Optionally align words to the audio for finer speaker assignment
+        if self.align and result["segments"]:
+            align_model, align_metadata = self.registry.get_alignment_model(
+                result.get("language", self.language),
+                self.device
+            )
+            result = whisperx.align(
+                result["segments"],
+                align_model,
+                align_metadata,
+                audio,
+                self.device
+            )
+        return result
+        
+    def cache_params(self) -> Dict:
+        """Parameters that determine the transcription of a given audio file."""
         return {
-            "segments": result["segments"],
-            "speakers": result["speakers"],
-            "text": result["text"]
+            "model": self.model_name,
+            "compute_type": self.compute_type,
+            "language": self.language,
+            "batch_size": self.batch_size,
+            "min_speakers": self.min_speakers,
+            "max_speakers": self.max_speakers,
+            "align": self.align
         }
+        
+    def transcribe_stream(
+        self,
+        audio_path: str,
+        window_seconds: float = 300.0,
+        context_seconds: float = 30.0
+    ) -> Iterator[Dict]:
+        """Transcribe a long recording window by window.
+        
+        Audio is decoded incrementally and cut at pauses, so memory stays
+        bounded by the window length. Segments are yielded as soon as their
+        window has been transcribed and diarized, with absolute timestamps and
+        speaker labels that stay stable across windows.
+        
+        A recording transcribed before by transcribe() with the same settings
+        is replayed from the transcription cache. Streamed results are not
+        stored there: they are diarized window by window, so they differ from
+        what transcribe() caches under the same key, and keeping them would
+        mean holding every segment of the recording in memory.
+        
+        Args:
+            audio_path: Path to audio file
+            window_seconds: Target length of each window
+            context_seconds: Audio from the previous window diarized along
+                with each window to carry speaker labels over
+            
+        Yields:
+            Diarized segments in WhisperX format
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            
+        if self.cache is not None:
+            cache_key = self.cache.make_key(TranscriptionCache.hash_audio(audio_path), **self.cache_params())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield from cached["segments"]
+                return
+            
+        logger.info(f"Streaming transcription of {audio_path}")
+        
+        # Held for the whole stream, so an eviction cannot force a reload mid-recording
+        model = self.load_model()
+        diarize_model = self.registry.get_diarization_model(
+            self.device,
+            self._get_hf_token()
+        )
+        tracker = SpeakerTracker(context_seconds)
+        context = np.zeros(0, dtype=np.float32)
+        context_len = int(context_seconds * SAMPLE_RATE)
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            for offset, window in iter_audio_windows(audio_path, window_seconds):
+                # Diarize with the previous tail so labels can be matched up,
+                # concurrently with ASR on the new audio
+                shift = len(context) / SAMPLE_RATE
+                diarize_future = pool.submit(
+                    diarize_model,
+                    np.concatenate([context, window]),
+                    min_speakers=self.min_speakers,
+                    max_speakers=self.max_speakers
+                )
+                result = self.recognize(window, model)
+                diarize_segments = diarize_future.result()
+                context = window[-context_len:].copy()
+                
+                diarize_segments = tracker.relabel(diarize_segments, offset - shift, offset)
+                diarize_segments["start"] -= shift
+                diarize_segments["end"] -= shift
+                if not result["segments"]:
+                    continue
+                
+                result = whisperx.assign_word_speakers(diarize_segments, result)
+                for segment in result["segments"]:
+                    yield shift_segment(segment, offset)
+            
+    def diarize(self, audio: np.ndarray):
+        """Run speaker diarization on decoded samples.
+        
+        Args:
+            audio: 16 kHz mono float32 samples
+            
+        Returns:
+            Diarization DataFrame with start, end and speaker columns
+        """
+        diarize_model = self.registry.get_diarization_model(
+            self.device,
+            self._get_hf_token()
+        )
+        return diarize_model(
+            audio,
+            min_speakers=self.min_speakers,
+            max_speakers=self.max_speakers
+        )
+        
+    def _get_hf_token(self) -> Optional[str]:
+        """Get the Hugging Face token used for diarization."""
+        hf_token = os.getenv("HUGGINGFACE_TOKEN")
+        if not hf_token:
+            logger.warning("No Hugging Face token found. Diarization may not work.")
+            logger.warning("Set HUGGINGFACE_TOKEN in .env file or environment variables.")
+        return hf_token
+
+def shift_segment(segment: Dict, offset: float) -> Dict:
+    """Move a segment and its words from window time to recording time."""
+    segment = dict(segment)
+    segment["start"] += offset
+    segment["end"] += offset
+    if "words" in segment:
+        words = []
+        for word in segment["words"]:
+            word = dict(word)
+            if "start" in word:
+                word["start"] += offset
+            if "end" in word:
+                word["end"] += offset
+            words.append(word)
+        segment["words"] = words
+    return segment
 
 def main():
     """Example usage of WhisperTranscriber."""
@@ -87,14 +413,25 @@ def main():
     parser.add_argument("audio_path", help="Path to audio file")
     parser.add_argument("--model", default="large-v2", help="Whisper model to use")
     parser.add_argument("--device", help="Device to run inference on (cuda/cpu)")
+    parser.add_argument("--compute-type", help="Compute type (default: from inference profile)")
+    parser.add_argument("--batch-size", type=int, help="Batch size (default: from inference profile)")
+    parser.add_argument("--stream", action="store_true", help="Print segments as each window finishes")
     
     args = parser.parse_args()
     
-    transcriber = WhisperTranscriber(model_name=args.model, device=args.device)
-    result = transcriber.transcribe(args.audio_path)
+    transcriber = WhisperTranscriber(
+        model_name=args.model,
+        device=args.device,
+        compute_type=args.compute_type,
+        batch_size=args.batch_size
+    )
+    if args.stream:
+        segments = transcriber.transcribe_stream(args.audio_path)
+    else:
+        segments = transcriber.transcribe(args.audio_path)["segments"]
     
     # Print transcription with speaker labels
-    for segment in result["segments"]:
+    for segment in segments:
         speaker = segment.get("speaker", "UNKNOWN")
         print(f"[{speaker}] {segment['text']}")
 
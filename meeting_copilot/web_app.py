@@ -1,13 +1,34 @@
-from fastapi import FastAPI, File, UploadFile, Request
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import FastAPI, File, UploadFile, Request, WebSocket
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 import os
+import wave
+import queue
+import asyncio
 import logging
+import threading
 from datetime import datetime
+from typing import Dict, List, Optional
 import json
-from scripts.transcribe import WhisperTranscriber
-from scripts.vector_memory import MeetingMemory
+from pydantic import BaseModel
+from scripts.whisper_transcribe import WhisperTranscriber, build_transcription
+from scripts.format_transcript import TranscriptFormatter, format_transcript
+from scripts.run_crewai_agents import MeetingAnalyzer
+from scripts.model_registry import get_registry
+from scripts.audio_io import PCM16Decoder, StreamDecoder
+from scripts.live_session import LiveTranscriptionSession
+from scripts.transcript_alignment import TranscriptAligner
+from scripts.vector_memory import MeetingMemory, collection_name
+from scripts.transcript_index import TranscriptIndex
+from scripts.llm_cache import get_llm_cache
+from scripts.embedding_cache import get_embedding_cache
+from scripts.embeddings import EMBEDDING_BACKEND
+from scripts.llm_scheduler import get_scheduler
+from scripts.llm_backend import backend_stats
+from scripts.transcript_edits import apply_edits, timed_segments
+from scripts.transcript_store import CompactTranscript
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,80 +43,85 @@ templates = Jinja2Templates(directory="web/templates")
 
 # Initialize components
 transcriber = WhisperTranscriber()
+formatter = TranscriptFormatter(output_dir="output")
+analyzer = MeetingAnalyzer(output_dir="output")
 memory = MeetingMemory()
+# Rebuild speaker profiles that drifted or lost a meeting
+memory.start_profile_refresher()
+transcript_index = TranscriptIndex()
 
 # Create necessary directories
 os.makedirs("audio", exist_ok=True)
 os.makedirs("output", exist_ok=True)
 
+# Pick up transcripts saved before the index existed
+transcript_index.index_directory("output")
+
 @app.get("/", response_class=HTMLResponse)
 async def upload_form(request: Request):
     """Render the upload form."""
     return templates.TemplateResponse("upload.html", {"request": request})
 
+async def _save_upload(file: UploadFile):
+    """Save an uploaded file and generate its meeting ID."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    file_path = f"audio/{timestamp}_{file.filename}"
+    with open(file_path, "wb") as buffer:
+        content = await file.read()
+        buffer.write(content)
+    return f"meeting_{timestamp}", file_path
+
+def _analyze_transcript(meeting_id: str, transcript: dict, on_event=None, mode: Optional[str] = None) -> dict:
+    """Save, analyze and store a finished transcript.
+    
+    on_event receives partial analysis results as they become available;
+    mode overrides the analyzer's analysis mode.
+    """
+    # Save transcript, readable and in the compact format it is read back from
+    with open(f"output/{meeting_id}_transcript.txt", "w") as f:
+        f.write(format_transcript(transcript["segments"]))
+    compact_path = formatter.save_compact(transcript["segments"], f"{meeting_id}_transcript.mct")
+    
+    # Make the raw transcript searchable before the slower analysis
+    transcript_index.index_transcript(
+        meeting_id, transcript["segments"], compact_path, os.path.getmtime(compact_path)
+    )
+    
+    # Format transcript
+    formatted_transcript = formatter.format_transcript(transcript)
+    formatter.save_transcript(formatted_transcript, f"{meeting_id}_formatted.json")
+    
+    # Analyze meeting
+    logger.info("Analyzing meeting content")
+    analysis = analyzer.analyze_meeting(formatted_transcript, on_event=on_event, mode=mode)
+    
+    # Add timestamps to decisions, action items and follow-ups
+    TranscriptAligner(transcript.get("segments", [])).annotate(analysis)
+    
+    # Save analysis
+    analyzer.save_analysis(analysis, f"{meeting_id}_analysis.json")
+    
+    # Store in memory
+    memory.add_meeting(analysis, meeting_id)
+    return analysis
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     """Handle file upload and processing."""
     try:
-        # Save uploaded file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = f"audio/{timestamp}_{file.filename}"
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Generate meeting ID
-        meeting_id = f"meeting_{timestamp}"
+        meeting_id, file_path = await _save_upload(file)
         
         # Transcribe audio
         logger.info(f"Transcribing {file_path}")
-        transcript = transcriber.transcribe(file_path)
-        
-        # Save transcript
-        transcript_path = f"output/{meeting_id}_transcript.txt"
-        with open(transcript_path, "w") as f:
-            f.write(transcript)
-        
-        # Format transcript
-        formatted_transcript = transcriber.format_transcript(transcript)
-        formatted_path = f"output/{meeting_id}_formatted.txt"
-        with open(formatted_path, "w") as f:
-            f.write(formatted_transcript)
-        
-        # Analyze meeting
-        logger.info("Analyzing meeting content")
-        analysis = transcriber.analyze_meeting(formatted_transcript)
-        
-        # Add timestamps to decisions and action items
-        for segment in transcript.get("segments", []):
-            start_time = segment.get("start", 0)
-            end_time = segment.get("end", 0)
-            text = segment.get("text", "").lower()
-            
-            # Match decisions
-            for decision in analysis.get("decisions", []):
-                if decision["text"].lower() in text:
-                    decision["start_time"] = start_time
-                    decision["end_time"] = end_time
-            
-            # Match action items
-            for item in analysis.get("action_items", []):
-                if item["text"].lower() in text:
-                    item["start_time"] = start_time
-                    item["end_time"] = end_time
-        
-        # Save analysis
-        analysis_path = f"output/{meeting_id}_analysis.json"
-        with open(analysis_path, "w") as f:
-            json.dump(analysis, f, indent=2)
+        transcript = await run_in_threadpool(transcriber.transcribe, file_path)
         
-        # Store in memory
-        memory.add_meeting(analysis, meeting_id)
+        analysis = await run_in_threadpool(_analyze_transcript, meeting_id, transcript)
         
         return JSONResponse({
             "status": "success",
             "message": "File processed successfully",
             "meeting_id": meeting_id,
+            "audio_url": f"/{file_path}",
             "analysis": analysis
         })
     
@@ -106,6 +132,164 @@ async def upload_file(file: UploadFile = File(...)):
             "message": str(e)
         }, status_code=500)
 
+@app.post("/upload/stream")
+async def upload_file_stream(file: UploadFile = File(...)):
+    """Handle file upload and stream transcript segments as they are ready.
+    
+    The response is newline-delimited JSON: a "started" event, one "segment"
+    event per diarized segment, "item" and "section" events with partial
+    analysis results as the model produces them, then an "analysis" (or
+    "error") event with the complete, timestamped analysis.
+    """
+    meeting_id, file_path = await _save_upload(file)
+    
+    def events():
+        yield json.dumps({
+            "type": "started",
+            "meeting_id": meeting_id,
+            "audio_url": f"/{file_path}"
+        }) + "\n"
+        try:
+            logger.info(f"Streaming transcription of {file_path}")
+            segments = []
+            for segment in transcriber.transcribe_stream(file_path):
+                segments.append(segment)
+                formatted = formatter.format_segment(segment)
+                formatted["start"] = segment["start"]
+                formatted["end"] = segment["end"]
+                yield json.dumps({"type": "segment", "segment": formatted}) + "\n"
+            
+            # Analysis runs in its own thread and hands partial results over as they arrive
+            partial_results = queue.Queue()
+            finished = object()
+            
+            def analyze():
+                try:
+                    analysis = _analyze_transcript(meeting_id, build_transcription(segments), partial_results.put)
+                    partial_results.put({"type": "analysis", "analysis": analysis})
+                except Exception as e:
+                    logger.error(f"Error processing file: {str(e)}")
+                    partial_results.put({"type": "error", "message": str(e)})
+                partial_results.put(finished)
+            
+            threading.Thread(target=analyze, name=f"analyze-{meeting_id}", daemon=True).start()
+            while (event := partial_results.get()) is not finished:
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Error processing file: {str(e)}")
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.websocket("/ws/live")
+async def live_meeting(websocket: WebSocket, format: str = "pcm16"):
+    """Transcribe a meeting while it is happening.
+    
+    The client sends binary frames of 16 kHz mono s16le PCM (format=pcm16) or
+    a WebM/Ogg Opus stream (format=opus), then a text message "end". Finalized
+    segments are pushed back as {"type": "segment"} messages; once the stream
+    ends the analysis follows as {"type": "analysis"}.
+    
+    The meeting is analyzed hierarchically: transcript chunks are extracted
+    in the background as soon as they are finalized, so when the stream ends
+    only the last chunk and the summary merge are left.
+    """
+    await websocket.accept()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    meeting_id = f"meeting_{timestamp}"
+    audio_path = f"audio/{timestamp}_live.wav"
+    
+    session = LiveTranscriptionSession(transcriber)
+    decoder = StreamDecoder() if format == "opus" else PCM16Decoder()
+    stream_closed = asyncio.Event()
+    connected = True
+    finalized = []
+    prefetch = None
+    
+    async def send(message: dict):
+        nonlocal connected
+        if not connected:
+            return
+        try:
+            await websocket.send_json(message)
+        except Exception:
+            connected = False
+    
+    async def send_segments(segments):
+        for segment in segments:
+            formatted = formatter.format_segment(segment)
+            formatted["start"] = segment["start"]
+            formatted["end"] = segment["end"]
+            await send({"type": "segment", "segment": formatted})
+    
+    def prefetch_chunks(segments):
+        try:
+            analyzer.hierarchical.prefetch({"segments": segments})
+        except Exception as e:
+            logger.warning(f"Analyzing finished chunks of {meeting_id} failed: {str(e)}")
+    
+    def analyze_finalized(segments):
+        """Start extracting finished chunks unless the previous pass is still running."""
+        nonlocal prefetch
+        finalized.extend(formatter.format_segment(segment) for segment in segments)
+        if segments and (prefetch is None or prefetch.done()):
+            prefetch = asyncio.create_task(run_in_threadpool(prefetch_chunks, list(finalized)))
+    
+    async def receive(recording):
+        nonlocal connected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    connected = False
+                    break
+                if message.get("text") == "end":
+                    break
+                if message.get("bytes"):
+                    data = message["bytes"]
+                    samples = decoder.decode(data)
+                    recording.writeframes((samples * 32767).astype("<i2").tobytes())
+                    session.feed(samples)
+            samples = await run_in_threadpool(decoder.close)
+            recording.writeframes((samples * 32767).astype("<i2").tobytes())
+            session.feed(samples)
+        finally:
+            stream_closed.set()
+    
+    async def transcribe():
+        while not stream_closed.is_set():
+            if session.ready():
+                segments = await run_in_threadpool(session.process)
+                await send_segments(segments)
+                analyze_finalized(segments)
+            else:
+                try:
+                    await asyncio.wait_for(stream_closed.wait(), timeout=0.2)
+                except asyncio.TimeoutError:
+                    pass
+    
+    await send({"type": "started", "meeting_id": meeting_id, "audio_url": f"/{audio_path}"})
+    try:
+        with wave.open(audio_path, "wb") as recording:
+            recording.setnchannels(1)
+            recording.setsampwidth(2)
+            recording.setframerate(16000)
+            await asyncio.gather(receive(recording), transcribe())
+        
+        await send_segments(await run_in_threadpool(session.finish))
+        if prefetch:
+            await prefetch
+        analysis = await run_in_threadpool(
+            _analyze_transcript, meeting_id, session.transcription(), None, "hierarchical"
+        )
+        await send({"type": "analysis", "analysis": analysis})
+    except Exception as e:
+        logger.error(f"Error processing live meeting: {str(e)}")
+        await send({"type": "error", "message": str(e)})
+    
+    if connected:
+        await websocket.close()
+
 @app.get("/audio/{filename}")
 async def get_audio(filename: str):
     """Serve audio files."""
@@ -126,7 +310,7 @@ async def get_audio(filename: str):
 async def search_meetings(query: str, n_results: int = 5):
     """Search through meeting memories."""
     try:
-        results = memory.search_meetings(query, n_results)
+        results = await run_in_threadpool(memory.search_meetings, query, n_results)
         return JSONResponse({
             "status": "success",
             "results": results
@@ -138,6 +322,22 @@ async def search_meetings(query: str, n_results: int = 5):
             "message": str(e)
         }, status_code=500)
 
+@app.get("/transcripts/search")
+async def search_transcripts(query: str, limit: int = 20, meeting_id: str = None, speaker: str = None):
+    """Search the raw transcripts of all meetings for words, "phrases" or prefix* terms."""
+    try:
+        results = await run_in_threadpool(transcript_index.search, query, limit, meeting_id, speaker)
+        return JSONResponse({
+            "status": "success",
+            "results": results
+        })
+    except Exception as e:
+        logger.error(f"Error searching transcripts: {str(e)}")
+        return JSONResponse({
+            "status": "error",
+            "message": str(e)
+        }, status_code=500)
+
 @app.get("/meeting/{meeting_id}")
 async def get_meeting(meeting_id: str):
     """Get meeting history."""
@@ -154,11 +354,92 @@ async def get_meeting(meeting_id: str):
             "message": str(e)
         }, status_code=500)
 
+class SegmentEdit(BaseModel):
+    index: int
+    text: Optional[str] = None
+    speaker: Optional[str] = None
+
+class TranscriptCorrection(BaseModel):
+    edits: List[SegmentEdit] = []
+    rename_speakers: Dict[str, str] = {}
+
+def _corrected_segments(meeting_id: str, corrected: dict) -> list:
+    """Corrected segments with the exact times of the saved compact transcript.
+    
+    The formatted transcript only keeps whole seconds; meetings saved
+    without a compact transcript fall back to those.
+    """
+    compact_path = f"output/{meeting_id}_transcript.mct"
+    if os.path.exists(compact_path):
+        with CompactTranscript.load(compact_path) as saved:
+            if len(saved) == len(corrected["segments"]):
+                return [
+                    {**segment, "start": start, "end": end}
+                    for segment, (start, end, _, _) in zip(corrected["segments"], saved.rows())
+                ]
+    return timed_segments(corrected["segments"])
+
+def _reanalyze_meeting(meeting_id: str, correction: TranscriptCorrection) -> dict:
+    """Apply transcript corrections and update the analysis incrementally."""
+    formatted_path = f"output/{meeting_id}_formatted.json"
+    with open(formatted_path) as f:
+        previous = json.load(f)
+    corrected = apply_edits(
+        previous,
+        [edit.model_dump() for edit in correction.edits],
+        correction.rename_speakers
+    )
+    formatter.save_transcript(corrected, f"{meeting_id}_formatted.json")
+    
+    segments = _corrected_segments(meeting_id, corrected)
+    with open(f"output/{meeting_id}_transcript.txt", "w") as f:
+        f.write(format_transcript(segments))
+    compact_path = formatter.save_compact(segments, f"{meeting_id}_transcript.mct")
+    transcript_index.index_transcript(meeting_id, segments, compact_path, os.path.getmtime(compact_path))
+    
+    analysis = analyzer.reanalyze(corrected, previous, correction.rename_speakers)
+    TranscriptAligner(segments).annotate(analysis)
+    analyzer.save_analysis(analysis, f"{meeting_id}_analysis.json")
+    
+    memory.remove_meeting(meeting_id)
+    memory.add_meeting(analysis, meeting_id)
+    return analysis
+
+@app.post("/meeting/{meeting_id}/transcript")
+async def correct_transcript(meeting_id: str, correction: TranscriptCorrection):
+    """Correct segment texts or speaker labels and re-analyze what they affect.
+    
+    Only transcript chunks containing an edit are sent to the model again.
+    """
+    if not os.path.exists(f"output/{meeting_id}_formatted.json"):
+        return JSONResponse({
+            "status": "error",
+            "message": "Meeting not found"
+        }, status_code=404)
+    try:
+        analysis = await run_in_threadpool(_reanalyze_meeting, meeting_id, correction)
+        return JSONResponse({
+            "status": "success",
+            "meeting_id": meeting_id,
+            "analysis": analysis
+        })
+    except ValueError as e:
+        return JSONResponse({
+            "status": "error",
+            "message": str(e)
+        }, status_code=400)
+    except Exception as e:
+        logger.error(f"Error re-analyzing meeting: {str(e)}")
+        return JSONResponse({
+            "status": "error",
+            "message": str(e)
+        }, status_code=500)
+
 @app.get("/summary")
 async def get_summary():
     """Get summary of all meetings."""
     try:
-        summary = memory.summarize_all_meetings()
+        summary = await run_in_threadpool(memory.summarize_all_meetings)
         return JSONResponse({
             "status": "success",
             "summary": summary
@@ -170,14 +451,40 @@ async def get_summary():
             "message": str(e)
         }, status_code=500)
 
+@app.get("/stats")
+async def get_stats():
+    """Report model load times, cache hit rates and LLM request queues."""
+    return JSONResponse({
+        "status": "success",
+        "models": get_registry().summary(),
+        "transcription_cache": transcriber.cache.stats() if transcriber.cache else None,
+        "llm_cache": get_llm_cache().stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "llm_scheduler": get_scheduler().stats(),
+        "llm_backend": backend_stats(),
+        "embedding_backend": {
+            "backend": EMBEDDING_BACKEND,
+            "model": memory.embedding_function.model_name,
+            "collection": collection_name(memory.embedding_function)
+        },
+        "memory_rollup": memory.rollup.stats(),
+        "speaker_profiles": memory.profiles.stats()
+    })
+
 @app.get("/speaker/{speaker_name}")
 async def get_speaker_summary(speaker_name: str):
-    """Get summary of speaker's contributions."""
+    """Get the stored profile of a speaker's contributions."""
     try:
-        summary = memory.get_speaker_summary(speaker_name)
+        profile = await run_in_threadpool(memory.get_speaker_profile, speaker_name)
+        if profile is None:
+            return JSONResponse({
+                "status": "success",
+                "summary": f"No contributions found for {speaker_name}."
+            })
         return JSONResponse({
             "status": "success",
-            "summary": summary
+            "summary": profile.pop("summary"),
+            "profile": profile
         })
     except Exception as e:
         logger.error(f"Error generating speaker summary: {str(e)}")